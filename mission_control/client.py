@@ -1,22 +1,39 @@
+import os
+import sys
 import socket
 import threading
-import json
 import queue
 import time
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '../onboard_software'))
+from library import protocol
+from library import retransmit
+from library import telemetry_codec
+
 class Client: # Laptop Client robot controller
     def __init__(self, server_ip):
         self.host = server_ip
         self.port = 8080
         self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) # Latest-value axis stream
         self.input_queue = queue.Queue() # For incoming telemetry and ACKs
         self.output_queue = queue.Queue() # For outgoing commands and ACKs
         self.telemetry_queue = queue.Queue() # Queue to send incoming telemetry
+        self.profile_queue = queue.Queue() # Loop timing profiles returned by the robot
         self.running = True
         self.connected = threading.Event() # Signals when connection is established
         self.message_id = 1
-        self.pending_acks = {}
         self.ack_timeout = 0.5 # seconds
+        self.retransmit = retransmit.RetransmitScheduler(base_timeout=self.ack_timeout, name="Client")
+        self.sack = retransmit.SackTracker() # Which telemetry sequences have arrived
+        self.telemetry_decoders = {} # topic -> MotorTelemetryDecoder
+        self.sack_interval = 0.1 # seconds between cumulative telemetry ACKs
+        self._sack_pending = False
+        self._last_sack_time = 0.0
+        self.wire_format = protocol.FORMAT_JSON
+        self._stream = None
+        self.udp_port = None # Set when the robot accepts axis datagrams
+        self.axis_seq = 0
 
     def connect(self):
         try:
@@ -26,6 +43,7 @@ class Client: # Laptop Client robot controller
             return
 
         print("[Client] Connected to server at : " + self.host)
+        self._negotiate_format()
         self.connected.set()
 
         threading.Thread(target=self._sender_thread).start()
@@ -33,83 +51,181 @@ class Client: # Laptop Client robot controller
         threading.Thread(target=self._ack_monitor_thread).start()
 
         while self.running:
+            self._maybe_send_sack()
             try:
-                msg = self.input_queue.get(timeout=1)  # Wait up to 1 second for a message
-                if msg.get('type') == 'telemetry':
+                msg = self.input_queue.get(timeout=self.sack_interval)
+                if msg.get('type') == 'telemetry_batch':
+                    first = msg.get('seq')
+                    samples = msg.get('data')
+                    if self.sack.add(first, first + len(samples) - 1, msg.get('base')):
+                        for i, (topic, sample) in enumerate(samples):
+                            if isinstance(sample, telemetry_codec.EncodedMotorFrame):
+                                decoder = self.telemetry_decoders.setdefault(topic, telemetry_codec.MotorTelemetryDecoder())
+                                try:
+                                    sample = decoder.decode(sample)
+                                except protocol.DECODE_ERRORS as e:
+                                    print(f"[Client] Skipping bad motor telemetry sample: {e}")
+                                    continue
+                                if sample is None: # Delta against a keyframe we never got
+                                    continue
+                            self.telemetry_queue.put({"type": "telemetry", "seq": first + i, "topic": topic, "data": sample})
+                    self._sack_pending = True # Duplicates still need an ACK in case ours was lost
+                elif msg.get('type') == 'telemetry': # Servers without batching
                     self.telemetry_queue.put(msg)
                     # Send ACK for telemetry
                     ack = {"type": "ack", "id": msg.get('id')}
                     self.output_queue.put(ack)
+                elif msg.get('type') == 'profile':
+                    if msg.get('error'):
+                        print(f"[Client] Robot could not send its profile: {msg['error']}")
+                    else:
+                        self.profile_queue.put(msg.get('data'))
                 elif msg.get('type') == 'ack':
-                    # Handle ACK: Remove from pending
-                    msg_id = msg.get('id')
-                    if msg_id in self.pending_acks:
-                        del self.pending_acks[msg_id]
+                    # Handle ACK: Remove from pending, which may free window space for queued commands
+                    for queued in self.retransmit.ack(msg.get('id')):
+                        self.output_queue.put(queued)
             except queue.Empty:
                 continue
 
+    def _negotiate_format(self):
+        self.client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.client_socket.sendall(protocol.encode_line(protocol.hello_request()))
+        self.client_socket.settimeout(protocol.HANDSHAKE_TIMEOUT)
+        self._stream = self.client_socket.makefile('rb')
+        try:
+            reply = protocol.read_message(self._stream, protocol.FORMAT_JSON)
+            if reply is not None and reply.get('type') == 'hello':
+                self.wire_format = reply.get('format', protocol.FORMAT_JSON)
+                self.udp_port = reply.get('udp_port')
+        except protocol.MalformedMessage as e:
+            print(f"[Client] Ignoring unreadable hello reply: {e}")
+        except socket.timeout:
+            # Old servers don't answer the hello, stay on JSON
+            self._stream = self.client_socket.makefile('rb')
+        self.client_socket.settimeout(None)
+        print(f"[Client] Using {self.wire_format} wire format" + (" with UDP axes" if self.udp_enabled else ""))
+
+    @property
+    def udp_enabled(self):
+        return self.udp_port is not None
+
+    def _maybe_send_sack(self):
+        # One cumulative/selective ACK covers every batch received since the last one
+        now = time.monotonic()
+        if not self._sack_pending or now - self._last_sack_time < self.sack_interval:
+            return
+        self.output_queue.put({"type": "sack", "cum": self.sack.cum, "ranges": self.sack.ranges()})
+        self._sack_pending = False
+        self._last_sack_time = now
+
     def get_telemetry(self):
         try:
             msg = self.telemetry_queue.get_nowait()  # Get the full message
-            print(f"[Client] Sent to control: {msg}")
+            #print(f"[Client] Sent to control: {msg}")
             return msg.get('data')  # Return only the 'data' part
         except queue.Empty:
             return None
 
+    def get_topic_telemetry(self):
+        """Like get_telemetry but returns (topic, data), or None if nothing is queued."""
+        try:
+            msg = self.telemetry_queue.get_nowait()
+            return msg.get('topic'), msg.get('data')
+        except queue.Empty:
+            return None
+
 
     def _receiver_thread(self):
-        stream = self.client_socket.makefile('r')
         try:
             while self.running:
-                raw = stream.readline()  # Read a line from the stream
-                if not raw:  # If no data is read (connection closed)
+                try:
+                    msg = protocol.read_message(self._stream, self.wire_format)
+                except ConnectionError:
+                    msg = None
+                except protocol.MalformedMessage as e:
+                    print(f"[Client] Skipping message: {e}")
+                    continue
+                if msg is None:  # If no data is read (connection closed)
                     print("[Client] Connection closed by robot server.")
                     self.stop()
                     break
-                raw = raw.strip()  # Remove leading/trailing whitespace
-                if not raw:  # If the string is empty
-                    continue
-                msg = json.loads(raw)  # Parse the string as JSON
                 self.input_queue.put(msg)
                 #print(f"[Client] Received: {msg}")
         finally:
-            stream.close()
+            self._stream.close()
+
+    def subscribe(self, topic, rate_hz=None, decimation=1):
+        """Ask the robot to stream a telemetry topic, at most rate_hz and/or every Nth sample."""
+        self._send_tracked({"type": "subscribe", "topic": topic, "rate_hz": rate_hz, "decimation": decimation})
+
+    def unsubscribe(self, topic):
+        self._send_tracked({"type": "unsubscribe", "topic": topic})
 
-    def send_command(self, data):
+    def request_profile(self):
+        """Ask the robot for its control-loop timing profile. The reply shows up in get_profile()."""
+        self._send_tracked({"type": "get_profile"})
+
+    def get_profile(self, timeout=None):
+        """Returns the next profile the robot sent back, or None if none arrived within timeout."""
+        try:
+            return self.profile_queue.get(timeout=timeout) if timeout else self.profile_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _send_tracked(self, msg):
+        msg["id"] = self.message_id
+        self.message_id += 1
+        for m in self.retransmit.track(msg):
+            self.output_queue.put(m)
+
+    def send_command(self, data, droppable=False):
         msg = {"type": "command", "id": self.message_id, "data": data}
-        self.output_queue.put(msg)
-        self.pending_acks[self.message_id] = (msg, time.time())
         self.message_id += 1
+        for m in self.retransmit.track(msg, droppable=droppable):
+            self.output_queue.put(m)
 
-    def _sender_thread(self):
-        stream = self.client_socket.makefile('w')
+    def send_axes(self, data):
+        # Axis state goes over UDP when available: no id, no ACK, no resend
+        if not self.udp_enabled:
+            self.send_command(data, droppable=True) # A newer sample replaces a lost one
+            return
+        self.axis_seq += 1
         try:
-            while self.running:
-                try:
-                    msg = self.output_queue.get(timeout=1)  # Wait up to 1 second for a message
-                    json_str = json.dumps(msg) + '\n'  # Convert the message to JSON string
-                    stream.write(json_str)  # Write the JSON string to the stream
-                    stream.flush()  # Flush the stream to ensure data is sent immediately
-                    #print(f"[Client] Sent: {msg}")
-                except queue.Empty:
-                    continue
-        finally:
-            stream.close()
+            self.udp_socket.sendto(protocol.encode_axis_datagram(self.axis_seq, data), (self.host, self.udp_port))
+        except OSError as e:
+            print(f"[Client] Failed to send axes: {e}")
+
+    def _sender_thread(self):
+        while self.running:
+            try:
+                msg = self.output_queue.get(timeout=1)  # Wait up to 1 second for a message
+            except queue.Empty:
+                continue
+            try:
+                data = protocol.encode_message(msg, self.wire_format)
+            except protocol.ENCODE_ERRORS as e:
+                # It would fail the same way on every resend, so stop tracking it as well
+                print(f"[Client] Dropping unsendable {msg.get('type')} message {msg.get('id')}: {type(e).__name__}: {e}")
+                if msg.get('type') not in ('ack', 'sack'):
+                    for queued in self.retransmit.ack(msg.get('id')):
+                        self.output_queue.put(queued)
+                continue
+            try:
+                self.client_socket.sendall(data)
+                #print(f"[Client] Sent: {msg}")
+            except OSError:
+                break
 
     def _ack_monitor_thread(self):
         while self.running:
-            current_time = time.time()
-            to_resend = []
-            for msg_id, (msg, sent_time) in self.pending_acks.items():
-                if current_time - sent_time > self.ack_timeout:
-                    to_resend.append(msg)
-            for msg in to_resend:
+            for msg in self.retransmit.due():
                 print(f"[Client] Resending unacknowledged message: {msg}")
                 self.output_queue.put(msg)
-                self.pending_acks[msg['id']] = (msg, time.time())  # Update the timestamp in pending ACKs
-            time.sleep(0.5)  # Check every 0.5 seconds
+            # Sleep until the earliest resend deadline instead of rescanning every message
+            time.sleep(min(self.retransmit.time_until_next(default=self.ack_timeout), self.ack_timeout))
 
     def stop(self):
         self.running = False
         self.client_socket.shutdown(socket.SHUT_RDWR)
         self.client_socket.close()
+        self.udp_socket.close()
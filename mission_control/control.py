@@ -21,6 +21,7 @@ Button 4 - LB
 Button 5 - RB
 Button 6 - Options
 Button 7 - Start
+Button 8 - Left Stick press (request loop timing profile)
 
 Hat 0 - D-Pad (x: L = -1, R = 1 | y: D = -1, U = 1)
 '''
@@ -30,6 +31,7 @@ class Control:
         self.running = True
         self.mode = None
         self.client = client.Client(server_ip) # Start the TCP server
+        self.telemetry_topics = {"auger": 5} # topic -> rate (Hz) to request from the robot
 
         # Initialize the controller
         pygame.init()
@@ -44,9 +46,26 @@ class Control:
         print("[Control] 🎮 Controller connected!")
 
     def print_telemetry(self):
-        telemetry = self.client.get_telemetry()
-        if telemetry is not None:
-            print(f"[Control] \033[35mTelemetry\033[0m: {telemetry}")
+        # Telemetry can arrive faster than this loop runs, so only show the newest sample per topic
+        latest = {}
+        while (item := self.client.get_topic_telemetry()) is not None:
+            topic, data = item
+            latest[topic] = data
+        for topic, data in latest.items():
+            print(f"[Control] \033[35mTelemetry\033[0m {topic}: {data}")
+
+    def print_profile(self):
+        profile = self.client.get_profile()
+        if profile is None:
+            return
+        print("[Control] \033[36mLoop profile\033[0m")
+        print(f"  {'phase':<24}{'count':>8}{'mean us':>10}{'p99':>8}{'max us':>9}{'over':>6}")
+        for name, s in profile.get("phases", {}).items():
+            print(f"  {name:<24}{s['count']:>8}{s['mean_us']:>10.1f}{s['p99_us']:>8}{s['max_us']:>9}{s['overruns']:>6}")
+        loop = profile.get("loop")
+        if loop:
+            print(f"  jitter p99 {loop['jitter_p99_ms']:.3f} ms, max {loop['jitter_max_ms']:.3f} ms, "
+                  f"{loop['overruns']} overruns, {loop['skipped']} skipped ticks")
 
     def run(self):
         self.client_t = threading.Thread(target=self.client.connect)
@@ -55,6 +74,8 @@ class Control:
             print("[Control] Failed to connect to robot within 10 seconds")
             return
         self.client.send_command("READY") # Notify robot that client is ready
+        for topic, rate_hz in self.telemetry_topics.items():
+            self.client.subscribe(topic, rate_hz)
 
         print("[Control] Waiting for mode selection: \n Press A for TELEOP \n Press B for AUTO\n")
         while self.mode is None:
@@ -125,6 +146,9 @@ class Control:
                         self.mode = "TELEOP" if self.mode != "TELEOP" else "AUTO"
                         print(f"[Control] Switching to {self.mode} mode")
 
+                    if event.button == 8:
+                        self.client.request_profile()
+
                     for name, btn in button_map.items():
                         if event.button == btn:
                             # Button just pressed
@@ -153,11 +177,16 @@ class Control:
                     prev_hat = curr_hat
 
             commands = (self.mode, x, y, yaw_rate, pitch_rate, lt, rt)
-            if commands != last_command and self.mode == "TELEOP": # For now only TELEOP uses axes
-                self.client.send_command(commands)
+            if self.mode == "TELEOP": # For now only TELEOP uses axes
+                if self.client.udp_enabled:
+                    # Datagrams can be lost, so keep streaming the current state every tick
+                    self.client.send_axes(commands)
+                elif commands != last_command:
+                    self.client.send_axes(commands)
                 last_command = commands
                 #print(commands)
             self.print_telemetry()
+            self.print_profile()
             time.sleep(0.05) # 20 Hz loop
 
     def stop(self):
@@ -0,0 +1,162 @@
+import asyncio
+import socket
+from library import protocol
+import server
+
+class _AxisDatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        self.server._on_axis_datagram(data, addr)
+
+class AsyncServer(server.Server): # Robot Server on a single asyncio event loop
+    """
+    Same message semantics as Server (commands, ACKs, telemetry, resends) but all
+    socket work runs as coroutines on one event-loop thread instead of a receiver,
+    sender, ACK-monitor and dispatcher thread each competing with the control loop.
+
+    The control loop hands data across with get_commands() (reads the thread-safe
+    CommandMailbox filled by the loop) and flush_telemetry() (schedules the write on
+    the loop with call_soon_threadsafe).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._loop = None
+        self._reader = None
+        self._writer = None
+        self._udp_transport = None
+        self._tasks = []
+
+    def start(self):
+        # Blocks like Server.start, so robot.py can keep running it in a thread
+        try:
+            asyncio.run(self._serve())
+        except asyncio.CancelledError:
+            pass # stop() cancelled the server
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._tasks.append(asyncio.current_task())
+        self.server_socket.setblocking(False)
+
+        print("[Server] Waiting for client...")
+        try:
+            self.client_socket, addr = await self._loop.sock_accept(self.server_socket)
+        except OSError:
+            return # stop() closed the listening socket
+        print("[Server] Got connection from", addr)
+        self.client_ip = addr[0]
+        self.client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader, self._writer = await asyncio.open_connection(sock=self.client_socket)
+
+        if not await self._negotiate():
+            self.stop()
+            return
+
+        if self.udp_enabled:
+            self.udp_socket.setblocking(False)
+            self._udp_transport, _ = await self._loop.create_datagram_endpoint(
+                lambda: _AxisDatagramProtocol(self), sock=self.udp_socket)
+
+        self._tasks.append(asyncio.ensure_future(self._ack_monitor()))
+        await self._receive()
+
+    async def _negotiate(self):
+        try:
+            first = await self._read_line()
+        except protocol.MalformedMessage as e:
+            print(f"[Server] Skipping message: {e}")
+            first = {} # Not a hello, so an old client: stay on JSON
+        if first is None:
+            return False
+        reply = self._handle_hello(first)
+        if reply is not None:
+            self._writer.write(reply)
+        else:
+            self._handle(first)
+        return True
+
+    async def _read_line(self):
+        while True:
+            raw = await self._reader.readline()
+            if not raw:
+                return None
+            raw = raw.strip()
+            if raw:
+                return protocol.decode_line(raw)
+
+    async def _read_frame(self):
+        try:
+            header = await self._reader.readexactly(protocol.FRAME_HEADER_SIZE)
+            length, code = protocol.parse_header(header)
+            body = await self._reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return None
+        return protocol.decode_body(code, body)
+
+    async def _receive(self):
+        read = self._read_frame if self.wire_format == protocol.FORMAT_BINARY else self._read_line
+        while self.running:
+            try:
+                msg = await read()
+            except (ConnectionError, asyncio.CancelledError):
+                msg = None
+            except protocol.MalformedMessage as e:
+                print(f"[Server] Skipping message: {e}")
+                continue
+            if msg is None: # Connection closed
+                if self.running:
+                    print("[Server] Connection closed by controller.")
+                    self.stop()
+                break
+            self._handle(msg)
+
+    def _handle(self, msg):
+        for reply in self._dispatch(msg):
+            self._write(reply)
+
+    def _write(self, msg):
+        # Only ever called on the event loop thread
+        if self._writer is None or self._writer.is_closing():
+            return
+        try:
+            data = protocol.encode_message(msg, self.wire_format)
+        except protocol.ENCODE_ERRORS as e:
+            self._drop_unencodable(msg, e)
+            return
+        self._writer.write(data)
+
+    def _enqueue(self, msg):
+        # Messages sent before the client connects go out with the first resend pass
+        if self._loop is not None and self._writer is not None:
+            self._loop.call_soon_threadsafe(self._write, msg)
+
+    async def _ack_monitor(self):
+        while self.running:
+            # Sleep until the earliest resend deadline instead of rescanning every message
+            await asyncio.sleep(min(self.retransmit.time_until_next(default=self.ack_timeout), self.ack_timeout))
+            for msg in self.retransmit.due():
+                print(f"[Server] Resending unacknowledged message: {msg}")
+                self._write(msg)
+
+    def _shutdown(self):
+        # Runs on the event loop thread so sockets are never closed under a pending await
+        for task in self._tasks:
+            task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        if self._udp_transport is not None:
+            self._udp_transport.close()
+        super().stop()
+
+    def stop(self):
+        self.running = False
+        if self._loop is None or self._loop.is_closed():
+            super().stop()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._shutdown)
+        except RuntimeError:
+            super().stop() # Loop already shut down
@@ -0,0 +1,85 @@
+"""
+Decode a flight recorder file (written by library/flight_recorder.py while the robot runs)
+into a timeline of the last seconds before the robot stopped, crashed or was killed.
+
+Usage:
+    python decode_flight_recorder.py logs/flight_recorder.frec
+    python decode_flight_recorder.py logs/flight_recorder_2026-03-02_19-30-55.frec --seconds 5
+    python decode_flight_recorder.py logs/flight_recorder.frec --csv crash.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+
+import robot_params
+from library import flight_recorder
+
+FEEDBACK_FIELDS = ("duty_cycle", "velocity", "position", "current", "temperature", "voltage")
+
+
+def timeline_lines(header, records):
+    motor_ids = header["motor_ids"]
+    for record in records:
+        axes = " ".join(f"{name}={value:+.2f}" for name, value in zip(flight_recorder.AXIS_FIELDS, record["axes"].tolist()))
+        line = (f"{robot_params.RobotTimer.format(float(record['time']))} #{int(record['seq'])} "
+                f"{record['mode'].decode() or '-':<6} {float(record['tick_ms']):6.2f} ms  "
+                f"{'axes' if record['axes_received'] else 'held'} {axes}")
+        count = int(record["event_count"])
+        if count:
+            events = [event.decode(errors="replace") for event in record["events"][:min(count, flight_recorder.MAX_EVENTS)].tolist()]
+            if count > flight_recorder.MAX_EVENTS:
+                events.append(f"+{count - flight_recorder.MAX_EVENTS} more")
+            line += f"\n    events: {', '.join(events)}"
+        for motor_id, setpoint, fb in zip(motor_ids, record["setpoints"].tolist(), record["feedback"]):
+            line += (f"\n    motor {motor_id:>2}: set {setpoint:+.3f} duty {float(fb['duty_cycle']):+.3f} "
+                     f"vel {float(fb['velocity']):8.1f} pos {float(fb['position']):9.2f} "
+                     f"cur {float(fb['current']):5.1f} A temp {float(fb['temperature']):4.1f} C volt {float(fb['voltage']):5.2f} V")
+        yield line
+
+
+def write_csv(path, header, records):
+    motor_ids = header["motor_ids"]
+    columns = ["Timestamp", "Seq", "Mode", "Tick (ms)", "Axes Received", "Events"]
+    columns += [f"Axis {name}" for name in flight_recorder.AXIS_FIELDS]
+    for motor_id in motor_ids:
+        columns += [f"Motor {motor_id} Setpoint"] + [f"Motor {motor_id} {field}" for field in FEEDBACK_FIELDS]
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for record in records:
+            count = min(int(record["event_count"]), flight_recorder.MAX_EVENTS)
+            row = [robot_params.RobotTimer.format(float(record["time"])), int(record["seq"]), record["mode"].decode(),
+                   f"{float(record['tick_ms']):.3f}", int(record["axes_received"]),
+                   "; ".join(event.decode(errors="replace") for event in record["events"][:count].tolist())]
+            row += record["axes"].tolist()
+            for setpoint, fb in zip(record["setpoints"].tolist(), record["feedback"]):
+                row += [setpoint] + [float(fb[field]) for field in FEEDBACK_FIELDS]
+            writer.writerow(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", help=".frec file")
+    parser.add_argument("-s", "--seconds", type=float, default=10.0, help="How far back from the last record to decode (default: 10)")
+    parser.add_argument("--csv", help="Write the window as CSV to this path instead of printing it")
+    args = parser.parse_args()
+
+    header, records = flight_recorder.read_flight_recorder(args.recording)
+    if not len(records):
+        print(f"[Decode] {args.recording}: no complete records")
+        sys.exit(1)
+    last_ns = records["monotonic_ns"][-1]
+    window = records[records["monotonic_ns"] >= last_ns - int(args.seconds * 1e9)]
+    print(f"[Decode] {args.recording}: started {header['started']}, motors {header['motor_ids']}, "
+          f"{len(records)} records, showing the last {len(window)} ({args.seconds:g} s)")
+
+    if args.csv:
+        write_csv(args.csv, header, window)
+        print(f"[Decode] -> {args.csv}")
+    else:
+        for line in timeline_lines(header, window):
+            print(line)
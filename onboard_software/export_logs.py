@@ -0,0 +1,43 @@
+"""
+Export telemetry logs of one run (CSV or .tlog segments, compressed or not) into merged,
+time-aligned NumPy columns for analysis. Logs are streamed in bounded blocks, so memory
+use stays flat however long the run was.
+
+Output ending in .npz is a single archive; anything else is a directory of .npy files
+that np.load(..., mmap_mode="r") can map. Both hold "time" (robot timer seconds), one
+"<log>.<column>" array per column and a JSON map of array names to column names.
+
+Usage:
+    python export_logs.py logs/auger_2026-03-02_19-30-55*.csv* logs/drivetrain_2026-03-02_19-30-55* -o run.npz
+    python export_logs.py logs/*_2026-03-02_19-30-55* -o run_npy --rate 50 --method linear
+    python export_logs.py logs/auger_2026-03-02_19-30-55.tlog.gz -o window.npz --start 190 --end 200
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+
+from library import log_export
+from library import log_index
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="+", help="Log segments (.csv, .tlog, .gz); index sidecars are ignored")
+    parser.add_argument("-o", "--output", required=True, help=".npz file, or a directory for .npy files")
+    parser.add_argument("--rate", type=float, help="Resample every log onto a common grid at this rate (Hz)")
+    parser.add_argument("--method", choices=("hold", "linear"), default="hold",
+                        help="How a log's values are taken at output times (default: hold the last sample)")
+    parser.add_argument("--start", type=float, help="First time to export (s)")
+    parser.add_argument("--end", type=float, help="Last time to export (s)")
+    parser.add_argument("--block-rows", type=int, default=65536, help="Rows per streamed block (bounds memory)")
+    parser.add_argument("--compress", action="store_true", help="Deflate the .npz (not memory-mappable)")
+    args = parser.parse_args()
+
+    logs = [path for path in args.logs if not path.endswith(log_index.INDEX_SUFFIX)]
+    try:
+        log_export.export_logs(logs, args.output, rate_hz=args.rate, method=args.method, start_s=args.start,
+                               end_s=args.end, block_rows=args.block_rows, compress=args.compress)
+    except ValueError as e:
+        parser.error(str(e))
@@ -0,0 +1,73 @@
+import threading
+from collections import deque
+from library import protocol
+
+
+class CommandMailbox:
+    """
+    Hand-off point between the network threads and the control loop.
+
+    Axis samples are state, not events: they go into a single latest-value slot
+    that every new sample overwrites, so the control loop never works through a
+    backlog of stale stick positions. Everything else (button presses, mode
+    changes, READY, SHUTDOWN) is an event and is kept in arrival order in a queue
+    that the control loop drains completely each cycle. SHUTDOWN jumps to the front.
+
+    Every new event also sets the wakeup Event so a sleeping control loop can handle
+    it right away instead of at its next tick.
+
+    Usage:
+        mailbox.put(cmd)                 # network side
+        events, axes = mailbox.drain()   # control loop, once per tick
+    """
+
+    def __init__(self):
+        self.wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._events = deque()
+        self._axes = None
+        self._axes_seq = None
+
+    @staticmethod
+    def is_axes(cmd):
+        # Same test Controller.process_controller_inputs uses for axis commands
+        return isinstance(cmd, (list, tuple)) and len(cmd) > 4
+
+    def put(self, cmd):
+        if self.is_axes(cmd):
+            self.put_axes(cmd)
+            return
+        with self._lock:
+            if cmd == "SHUTDOWN":
+                self._events.appendleft(cmd)
+            else:
+                self._events.append(cmd)
+        self.wakeup.set()
+
+    def put_axes(self, axes, seq=None):
+        """Overwrite the axis slot. With a sequence number, older samples are ignored."""
+        with self._lock:
+            if seq is not None:
+                if not protocol.seq_newer(seq, self._axes_seq):
+                    return False
+                self._axes_seq = seq
+            self._axes = axes
+            return True
+
+    def drain(self):
+        """Returns (events in order, newest axis sample or None) and empties the mailbox."""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            axes = self._axes
+            self._axes = None
+        return events, axes
+
+    def get(self):
+        """Pop a single command: the next event if any, otherwise the newest axis sample."""
+        with self._lock:
+            if self._events:
+                return self._events.popleft()
+            axes = self._axes
+            self._axes = None
+            return axes
@@ -0,0 +1,223 @@
+import datetime
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+# Flight recorder file (.frec):
+#   MAGIC, <H version, <I header length, JSON header {"dtype", "capacity", "motor_ids", "started", "rate_hz"}
+#   padded to DATA_ALIGN, then `capacity` fixed-size records in a ring.
+# A record's seq is zeroed before its fields are written and set last, so a record torn by
+# a crash mid-write reads back as seq 0 and is skipped by the decoder.
+FREC_MAGIC = b"FREC"
+FREC_VERSION = 1
+DATA_ALIGN = 4096
+_FILE_HEADER = struct.Struct("<HI")
+
+MAX_EVENTS = 4 # Command events kept per tick; event_count still counts the rest
+EVENT_BYTES = 24
+
+AXIS_FIELDS = ("x", "y", "yaw_rate", "pitch_rate", "lt", "rt")
+
+
+def record_dtype(motor_count, feedback_dtype):
+    """One tick; feedback_dtype is the motor_controller feedback view's FEEDBACK_DTYPE."""
+    return np.dtype([
+        ("seq", "<u8"),               # 1, 2, 3... in write order; 0 = empty or torn
+        ("time", "<f8"),              # Robot timer seconds
+        ("monotonic_ns", "<i8"),
+        ("tick_ms", "<f4"),           # Duration of the previous tick
+        ("mode", "S8"),
+        ("axes_received", "u1"),      # A fresh axis sample arrived this tick
+        ("event_count", "u1"),
+        ("events", f"S{EVENT_BYTES}", (MAX_EVENTS,)),
+        ("axes", "<f4", (len(AXIS_FIELDS),)),
+        ("setpoints", "<f4", (motor_count,)),
+        ("feedback", feedback_dtype, (motor_count,)),
+    ])
+
+
+def _event_text(cmd):
+    text = " ".join(str(part) for part in cmd) if isinstance(cmd, (list, tuple)) else str(cmd)
+    return text.encode("utf-8", "replace")[:EVENT_BYTES]
+
+
+class FlightRecorder:
+    """
+    Black-box recorder: the last `seconds` of robot ticks in a memory-mapped ring file.
+
+    Every tick gets one fixed-size record with the commands received, the axis values,
+    each motor's commanded duty cycle and its full feedback row (the TelemetrySampler's
+    newest sample). Records are written in
+    place into a MAP_SHARED mapping, so nothing is allocated per tick and the data lives
+    in the page cache the moment it is written: it survives a Python exception, a
+    segfault in native code or SIGKILL (not a power cut, unless flush() ran). The file is
+    decoded afterwards with decode_flight_recorder.py.
+
+    On open, a recording left by the previous run is renamed to a timestamped file
+    instead of being overwritten.
+
+    Usage:
+        recorder = FlightRecorder("logs/flight_recorder.frec", sampler, mc, seconds=60, rate_hz=100)
+        recorder.command(("TELEOP", "A", "PRESSED"))
+        recorder.record(timer.elapsed(), "TELEOP", axis_values, axes_received=True)
+        recorder.close()
+    """
+
+    def __init__(self, path, sampler, mc, seconds=60, rate_hz=100, maintenance=None, name="Flight recorder"):
+        self.path = path
+        self.maintenance = maintenance # Optional LogMaintenance, so the disk budget never evicts the open ring
+        self.sampler = sampler # Feedback comes from its newest sample; mc is only asked for setpoints
+        self.mc = mc
+        self.name = name
+        self.capacity = max(1, int(seconds * rate_hz))
+        self.motor_ids = sampler.motor_ids
+        self.dtype = record_dtype(len(self.motor_ids), sampler.samples.dtype)
+
+        self.preserved = preserve_previous(path)
+        header = json.dumps({
+            "dtype": np.lib.format.dtype_to_descr(self.dtype),
+            "capacity": self.capacity,
+            "motor_ids": self.motor_ids,
+            "started": datetime.datetime.now().isoformat(),
+            "rate_hz": rate_hz,
+        }).encode()
+        prefix = FREC_MAGIC + _FILE_HEADER.pack(FREC_VERSION, len(header)) + header
+        data_offset = -(-len(prefix) // DATA_ALIGN) * DATA_ALIGN
+        size = data_offset + self.capacity * self.dtype.itemsize
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w+b") as f:
+            f.truncate(size) # Sparse zeros: every record starts as seq 0
+            f.write(prefix)
+            f.flush()
+            self._map = mmap.mmap(f.fileno(), size)
+        if maintenance is not None:
+            maintenance.opened(path)
+        self._records = np.ndarray(self.capacity, dtype=self.dtype, buffer=self._map, offset=data_offset)
+
+        # Field views are made once; the per-tick writes are plain item assignments
+        self._seq = self._records["seq"]
+        self._time = self._records["time"]
+        self._monotonic_ns = self._records["monotonic_ns"]
+        self._tick_ms = self._records["tick_ms"]
+        self._mode = self._records["mode"]
+        self._axes_received = self._records["axes_received"]
+        self._event_count = self._records["event_count"]
+        self._events = self._records["events"]
+        self._axes = self._records["axes"]
+        self._setpoints = self._records["setpoints"]
+        self._feedback = self._records["feedback"]
+
+        self._next_seq = 1
+        self._slot = 0
+        self._pending_events = 0
+        self._last_record = None
+        self._open_slot()
+        print(f"[{self.name}] Recording {self.capacity} ticks of {len(self.motor_ids)} motors -> {path}")
+        if self.preserved:
+            print(f"[{self.name}] Previous recording kept as {self.preserved}")
+
+    def _open_slot(self):
+        slot = self._slot
+        self._seq[slot] = 0 # Invalidate first: a half-written record must not look valid
+        self._event_count[slot] = 0
+        self._pending_events = 0
+
+    def command(self, cmd):
+        """Note a command event received this tick (button, mode change or text command)."""
+        if self._map is None:
+            return
+        if self._pending_events < MAX_EVENTS:
+            self._events[self._slot, self._pending_events] = _event_text(cmd)
+        self._pending_events += 1
+        self._event_count[self._slot] = min(self._pending_events, 255)
+
+    def record(self, elapsed_s, mode, axis_values, axes_received=False):
+        """Finish this tick's record with the axes, motor setpoints and motor feedback."""
+        if self._map is None:
+            return
+        slot = self._slot
+        now = time.monotonic_ns()
+        self._time[slot] = elapsed_s
+        self._monotonic_ns[slot] = now
+        self._tick_ms[slot] = 0.0 if self._last_record is None else (now - self._last_record) / 1e6
+        self._mode[slot] = mode.encode() if mode else b""
+        self._axes_received[slot] = axes_received
+        axes = self._axes[slot]
+        axes[0] = axis_values.x
+        axes[1] = axis_values.y
+        axes[2] = axis_values.yaw_rate
+        axes[3] = axis_values.pitch_rate
+        axes[4] = axis_values.lt
+        axes[5] = axis_values.rt
+        setpoints = self._setpoints[slot]
+        for i, motor_id in enumerate(self.motor_ids):
+            setpoints[i] = self.mc.get_current_duty_cycle(motor_id)
+        self._feedback[slot] = self.sampler.latest()
+        self._seq[slot] = self._next_seq # Last: marks the record complete
+
+        self._last_record = now
+        self._next_seq += 1
+        self._slot = (slot + 1) % self.capacity
+        self._open_slot()
+
+    def flush(self):
+        """msync the ring to disk (only needed to survive a power cut; it can stall, so not per tick)."""
+        if self._map is not None:
+            self._map.flush()
+
+    def close(self):
+        if self._map is None:
+            return
+        self.flush()
+        records = self._next_seq - 1
+        # Drop the numpy views before closing the mapping they point into
+        self._records = self._seq = self._time = self._monotonic_ns = self._tick_ms = None
+        self._mode = self._axes_received = self._event_count = self._events = None
+        self._axes = self._setpoints = self._feedback = None
+        self._map.close()
+        self._map = None
+        if self.maintenance is not None:
+            self.maintenance.closed(self.path, compress=False) # Kept raw so it decodes as is
+        print(f"[{self.name}] Closed after {records} ticks -> {self.path}")
+
+
+def preserve_previous(path):
+    """Rename a recording left at path to <name>_<started>.frec. Returns the new path or None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        header, records = read_flight_recorder(path)
+    except (OSError, ValueError, KeyError):
+        return None # Not a readable recording; it is overwritten
+    if not len(records):
+        return None
+    started = datetime.datetime.fromisoformat(header["started"]).strftime("%Y-%m-%d_%H-%M-%S")
+    base, ext = os.path.splitext(path)
+    target = f"{base}_{started}{ext}"
+    os.replace(path, target)
+    return target
+
+
+def read_flight_recorder(path):
+    """
+    Read a .frec file. Returns (header, records): the complete records in the order they
+    were written, as a structured array (see record_dtype()).
+    """
+    with open(path, "rb") as f:
+        if f.read(len(FREC_MAGIC)) != FREC_MAGIC:
+            raise ValueError(f"{path} is not a flight recorder file")
+        version, header_len = _FILE_HEADER.unpack(f.read(_FILE_HEADER.size))
+        if version != FREC_VERSION:
+            raise ValueError(f"{path}: unsupported flight recorder version {version}")
+        header = json.loads(f.read(header_len))
+        dtype = np.lib.format.descr_to_dtype(header["dtype"])
+        data_offset = -(-(len(FREC_MAGIC) + _FILE_HEADER.size + header_len) // DATA_ALIGN) * DATA_ALIGN
+        f.seek(data_offset)
+        records = np.frombuffer(f.read(header["capacity"] * dtype.itemsize), dtype=dtype)
+    records = records[records["seq"] > 0]
+    return header, records[np.argsort(records["seq"], kind="stable")]
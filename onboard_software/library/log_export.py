@@ -0,0 +1,223 @@
+import json
+import math
+import os
+import re
+import shutil
+import struct
+import tempfile
+import zipfile
+
+import numpy as np
+
+from library import log_maintenance
+from library import telemetry_logger
+
+_NPY_HEADER_BYTES = 128 # Fixed size, so the shape can be rewritten in place once the row count is known
+TIME_KEY = "time"
+COLUMNS_KEY = "columns" # JSON {key: "<log>/<column>"} stored next to the arrays
+
+
+def group_segments(paths):
+    """{log name: [segment paths in order]} for TelemetryLogger segments of one run per log."""
+    groups = {}
+    for path in paths:
+        match = log_maintenance.SEGMENT_NAME.match(os.path.basename(path))
+        if match is None:
+            raise ValueError(f"{path} is not a telemetry log segment (<name>_<date>_<time>[_partN].csv/.tlog)")
+        groups.setdefault(match["name"], []).append((match["run"], int(match["part"] or 1), path))
+    ordered = {}
+    for name, segments in groups.items():
+        runs = sorted({run for run, _, _ in segments})
+        if len(runs) > 1:
+            raise ValueError(f"{name}: segments of several runs ({', '.join(runs)}); export one run at a time")
+        ordered[name] = [path for _, _, path in sorted(segments)]
+    return ordered
+
+
+def column_key(log_name, column):
+    """Array name of a column, e.g. ("auger", "Current (A)") -> "auger.current_a"."""
+    slug = re.sub(r"[^0-9a-z]+", "_", column.lower()).strip("_")
+    return f"{log_name}.{slug}"
+
+
+class _LogStream:
+    """One log's segments as a single time-ordered stream, buffered a bounded number of rows at a time."""
+
+    def __init__(self, name, paths, block_rows):
+        self.name = name
+        self.columns = None
+        self._blocks = self._chain(paths, block_rows)
+        self.times = np.empty(0)
+        self.values = None
+        self.exhausted = False
+
+    def _chain(self, paths, block_rows):
+        for path in paths:
+            columns, blocks = telemetry_logger.iter_segment(path, block_rows)
+            if self.columns is None:
+                self.columns = columns
+            elif columns != self.columns:
+                raise ValueError(f"{path}: columns differ from the earlier segments of {self.name}")
+            yield from blocks
+
+    def start(self):
+        """Read the first block, which also sets columns."""
+        self.fill(-math.inf, 1)
+        if self.values is None:
+            self.values = np.empty((0, len(self.columns or [])), dtype=np.float32)
+
+    def fill(self, after, rows):
+        """Buffer until at least `rows` samples are newer than `after`, or the log ends."""
+        pieces_t, pieces_v = [self.times], [] if self.values is None else [self.values]
+        have = len(self.times) - int(np.searchsorted(self.times, after, side="right"))
+        while not self.exhausted and have < rows:
+            block = next(self._blocks, None)
+            if block is None:
+                self.exhausted = True
+                break
+            times, values = block
+            pieces_t.append(times)
+            pieces_v.append(values.astype(np.float32, copy=False))
+            have += len(times)
+        if len(pieces_t) > 1:
+            self.times = np.concatenate(pieces_t)
+            self.values = np.concatenate(pieces_v)
+
+    def last_time(self):
+        return self.times[-1] if len(self.times) else -math.inf
+
+    def sample(self, times, method):
+        """Values at times: the latest sample at or before each time ("hold") or linear
+        interpolation ("linear"). NaN before the first sample and after the last."""
+        out = np.full((len(times), len(self.columns)), np.nan, dtype=np.float32)
+        if not len(self.times):
+            return out
+        inside = (times >= self.times[0]) & (times <= self.times[-1])
+        if method == "linear":
+            for i in range(len(self.columns)):
+                out[inside, i] = np.interp(times[inside], self.times, self.values[:, i])
+        else:
+            index = np.searchsorted(self.times, times[inside], side="right") - 1
+            out[inside] = self.values[index]
+        return out
+
+    def trim(self, before):
+        """Drop samples older than the last one before `before`, which later output may still need."""
+        keep = max(int(np.searchsorted(self.times, before, side="left")) - 1, 0)
+        self.times = self.times[keep:]
+        self.values = self.values[keep:]
+
+
+class _NpyWriter:
+    """A 1-D .npy file written in appended pieces; the header gets the final length on close."""
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self._file = open(path, "wb")
+        self._file.write(self._header())
+
+    def _header(self):
+        header = repr({"descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": (self.rows,)})
+        header = header.ljust(_NPY_HEADER_BYTES - 10 - 1) + "\n"
+        return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+    def append(self, values):
+        self._file.write(np.ascontiguousarray(values, dtype=self.dtype).tobytes())
+        self.rows += len(values)
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+
+
+def export_logs(paths, output, rate_hz=None, method="hold", start_s=None, end_s=None,
+                block_rows=65536, compress=False, name="Export"):
+    """
+    Merge telemetry log segments of one run into time-aligned columns.
+
+    Every log (e.g. auger, drivetrain) is streamed block by block. The output timeline is
+    either the union of all logs' timestamps or, with rate_hz, a regular grid from the
+    first sample to the last. Each log's columns are sampled onto it with `method`
+    ("hold" or "linear"), NaN where that log has no data. Memory use depends on
+    block_rows, not on the length of the run.
+
+    output ending in .npz writes one archive (arrays "time", "<log>.<column>", and
+    "columns", a JSON map of keys to original names); any other output is a directory
+    of memory-mappable .npy files plus columns.json. Returns the number of rows.
+    """
+    if method not in ("hold", "linear"):
+        raise ValueError(f"Unknown method {method!r}, expected hold or linear")
+    streams = [_LogStream(log, segments, block_rows) for log, segments in group_segments(paths).items()]
+    for stream in streams:
+        stream.start()
+
+    keys = {TIME_KEY: "Time (s)"}
+    for stream in streams:
+        for column in stream.columns:
+            keys[column_key(stream.name, column)] = f"{stream.name}/{column}"
+
+    to_npz = output.endswith(".npz")
+    directory = tempfile.mkdtemp(prefix="export_", dir=os.path.dirname(os.path.abspath(output))) if to_npz else output
+    os.makedirs(directory, exist_ok=True)
+    writers = {key: _NpyWriter(os.path.join(directory, key + ".npy"), np.float64 if key == TIME_KEY else np.float32)
+               for key in keys}
+
+    first = min((stream.times[0] for stream in streams if len(stream.times)), default=None)
+    grid_step = 1.0 / rate_hz if rate_hz else None
+    next_tick = 0 # Grid point k is at first + k * grid_step
+    if grid_step and start_s is not None and first is not None:
+        next_tick = max(0, math.ceil((start_s - first) / grid_step - 1e-9))
+    cursor = -math.inf # Output is complete up to and including this time
+    try:
+        while first is not None:
+            # Every log that goes on gets ahead of the next output time, so each pass makes progress
+            after = first + next_tick * grid_step if grid_step else cursor
+            for stream in streams:
+                stream.fill(after, block_rows)
+            live = [stream.last_time() for stream in streams if not stream.exhausted]
+            bound = min(live) if live else max(stream.last_time() for stream in streams)
+
+            if grid_step:
+                last_tick = math.floor((bound - first) / grid_step + 1e-9)
+                last_tick = min(last_tick, next_tick + block_rows - 1)
+                times = first + np.arange(next_tick, last_tick + 1) * grid_step
+                next_tick = last_tick + 1
+            else:
+                times = np.unique(np.concatenate([stream.times[(stream.times > cursor) & (stream.times <= bound)]
+                                                  for stream in streams]))
+            if len(times):
+                window = np.ones(len(times), dtype=bool)
+                if start_s is not None:
+                    window &= times >= start_s
+                if end_s is not None:
+                    window &= times <= end_s
+                writers[TIME_KEY].append(times[window])
+                for stream in streams:
+                    values = stream.sample(times[window], method)
+                    for i, column in enumerate(stream.columns):
+                        writers[column_key(stream.name, column)].append(values[:, i])
+                cursor = times[-1]
+                for stream in streams:
+                    stream.trim(cursor)
+            if not live and (not len(times) or cursor >= bound) or (end_s is not None and cursor >= end_s):
+                break
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    rows = writers[TIME_KEY].rows
+    if to_npz:
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for key in keys:
+                archive.write(os.path.join(directory, key + ".npy"), key + ".npy")
+            with archive.open(COLUMNS_KEY + ".npy", "w") as f:
+                np.save(f, np.array(json.dumps(keys)))
+        shutil.rmtree(directory)
+    else:
+        with open(os.path.join(directory, COLUMNS_KEY + ".json"), "w", encoding="utf-8") as f:
+            json.dump(keys, f, indent=1, ensure_ascii=False)
+    print(f"[{name}] {len(streams)} logs, {len(keys) - 1} columns, {rows} rows -> {output}")
+    return rows
@@ -0,0 +1,99 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+
+# Sparse time index sidecar (<log file>.idx) of a telemetry log segment:
+#   MAGIC, <H version, then one <d first timestamp, <Q byte offset entry per block of rows.
+# A block runs from its offset to the next entry's offset (the last one to the end of
+# the file); everything before the first entry is the file header. Entries are appended
+# as the log is written, so a crash can only lose the newest block's entry.
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"TIDX"
+INDEX_VERSION = 1
+_HEADER = struct.Struct("<H")
+_ENTRY = struct.Struct("<dQ")
+_GZIP_WBITS = 31 # zlib wbits for gzip framing
+
+
+def index_path(log_path):
+    return log_path + INDEX_SUFFIX
+
+
+class IndexWriter:
+    """
+    Appends (first timestamp, byte offset) entries for a log segment as its blocks are written.
+
+    Usage:
+        index = IndexWriter("logs/auger_2026-03-02_19-30-55.csv")
+        index.add(190.0, 40961)
+        index.close()
+    """
+
+    def __init__(self, log_path):
+        self.path = index_path(log_path)
+        self._file = open(self.path, 'wb')
+        self._file.write(INDEX_MAGIC + _HEADER.pack(INDEX_VERSION))
+
+    def add(self, time_s, offset):
+        self._file.write(_ENTRY.pack(time_s, offset))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_index(log_path):
+    """(times, offsets) of the blocks of a log segment, or None if it has no readable index."""
+    try:
+        with open(index_path(log_path), 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    prefix = len(INDEX_MAGIC) + _HEADER.size
+    if data[:len(INDEX_MAGIC)] != INDEX_MAGIC or _HEADER.unpack_from(data, len(INDEX_MAGIC))[0] != INDEX_VERSION:
+        return None
+    count = (len(data) - prefix) // _ENTRY.size # A torn last entry is dropped
+    entries = np.frombuffer(data, dtype=[("time", "<f8"), ("offset", "<u8")], count=count, offset=prefix)
+    return entries["time"].copy(), entries["offset"].astype(np.int64)
+
+
+def write_index(log_path, times, offsets):
+    """Write a complete index (e.g. for a compressed copy of a segment), atomically."""
+    path = index_path(log_path)
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(INDEX_MAGIC + _HEADER.pack(INDEX_VERSION))
+        for time_s, offset in zip(times, offsets):
+            f.write(_ENTRY.pack(float(time_s), int(offset)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def block_range(times, start_s=None, end_s=None):
+    """[first, last) block numbers whose rows can fall in [start_s, end_s]."""
+    first = 0 if start_s is None else max(int(np.searchsorted(times, start_s, side="right")) - 1, 0)
+    last = len(times) if end_s is None else int(np.searchsorted(times, end_s, side="right"))
+    return first, max(first, last)
+
+
+def read_span(f, begin, end, compressed):
+    """
+    Bytes of the file between offsets begin and end (None = end of file). In a compressed
+    segment every block is its own gzip member, so a span of blocks decompresses on its own.
+    """
+    f.seek(begin)
+    data = f.read() if end is None else f.read(end - begin)
+    if not compressed:
+        return data
+    out = []
+    while data:
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        try:
+            out.append(decompressor.decompress(data))
+        except zlib.error:
+            break # Torn member at the end of a segment
+        data = decompressor.unused_data
+    return b"".join(out)
@@ -0,0 +1,199 @@
+import gzip
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+
+from library import log_index
+
+COMPRESSED_SUFFIX = ".gz"
+COMPRESSIBLE = (".csv", ".tlog") # Closed log segments; flight recordings stay raw so they decode as they are
+COMPRESS_LEVEL = 6
+# <name>_<YYYY-MM-DD_HH-MM-SS>[_partN].<csv|tlog>[.gz], as TelemetryLogger names its segments
+SEGMENT_NAME = re.compile(r"^(?P<name>.+)_(?P<run>\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})(?:_part(?P<part>\d+))?\.(?:csv|tlog)(?:\.gz)?$")
+# <name>_<YYYY-MM-DD_HH-MM-SS>.frec, a flight recording kept by flight_recorder.preserve_previous()
+RECORDING_NAME = re.compile(r"^.+_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.frec$")
+_ONBOARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+class LogMaintenance:
+    """
+    Compresses closed log segments and keeps log directories within a disk budget.
+
+    Loggers report the files they open and close. Closed segments are gzipped by a child
+    process at the lowest CPU priority (nice 19, SCHED_IDLE where allowed), so compression
+    runs on idle CPU time and never holds the control thread's GIL. After each segment,
+    and once per directory when it is first seen, the oldest files in the directory are
+    deleted until it fits in budget_bytes. Files still open are never compressed or
+    deleted. Only files the robot wrote are touched: TelemetryLogger segments (SEGMENT_NAME)
+    with their indexes, and kept flight recordings (RECORDING_NAME). Anything else copied
+    into a log directory stays as it is and does not count against the budget.
+
+    A segment closed just before the robot exits is picked up on the next start: the
+    first time a directory is seen, every uncompressed segment in it that isn't open
+    is queued.
+
+    Usage:
+        maintenance = LogMaintenance(budget_bytes=1 << 30)
+        maintenance.opened("logs/auger_2026-03-02_19-30-55.csv")
+        ...
+        maintenance.closed("logs/auger_2026-03-02_19-30-55.csv")
+    """
+
+    def __init__(self, budget_bytes=None, compress=True, name="Logs"):
+        self.budget_bytes = budget_bytes
+        self.compress = compress
+        self.name = name
+        self.compressed = 0
+        self.evicted = 0
+        self._active = set()
+        self._directories = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        # Started at import, before the realtime profile pins the control thread, so it and
+        # its child processes end up on the network CPUs
+        self._thread = threading.Thread(target=self._run, name="log-maintenance", daemon=True)
+        self._thread.start()
+
+    def opened(self, path):
+        path = os.path.abspath(path)
+        directory = os.path.dirname(path)
+        with self._lock:
+            self._active.add(path)
+            new_directory = directory not in self._directories
+            self._directories.add(directory)
+        if new_directory:
+            self._queue.put(("sweep", directory))
+
+    def closed(self, path, compress=True):
+        path = os.path.abspath(path)
+        with self._lock:
+            self._active.discard(path)
+        self._queue.put(("compress" if compress and self.compress else "budget", path))
+
+    def wait_idle(self):
+        """Block until every queued compression and eviction is done (tools and tests)."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            action, path = self._queue.get()
+            try:
+                if action == "sweep":
+                    self._sweep(path)
+                    self._enforce_budget(path)
+                else:
+                    if action == "compress":
+                        self._compress(path)
+                    self._enforce_budget(os.path.dirname(path))
+            except Exception as e: # Maintenance must never take the robot down
+                print(f"[{self.name}] Maintenance of {path} failed: {type(e).__name__}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _sweep(self, directory):
+        if not self.compress:
+            return
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if (entry.is_file() and entry.name.endswith(COMPRESSIBLE) and SEGMENT_NAME.match(entry.name)
+                    and not self._is_active(entry.path)):
+                self._compress(entry.path)
+
+    def _is_active(self, path):
+        with self._lock:
+            return os.path.abspath(path) in self._active
+
+    def _compress(self, path):
+        if not path.endswith(COMPRESSIBLE) or not os.path.exists(path):
+            return
+        result = subprocess.run([sys.executable, "-m", "library.log_maintenance", os.path.abspath(path)],
+                                cwd=_ONBOARD_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            print(f"[{self.name}] Compressing {path} failed: {result.stderr.strip()}")
+            return
+        self.compressed += 1
+
+    def _enforce_budget(self, directory):
+        if self.budget_bytes is None:
+            return
+        files = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and _managed(entry.name) and not self._is_active(entry.path):
+                stat = entry.stat()
+                index = log_index.index_path(entry.path) # Evicted together with its log
+                size = stat.st_size + (os.path.getsize(index) if os.path.exists(index) else 0)
+                files.append((stat.st_mtime, size, entry.path))
+        total = sum(size for _, size, _ in files)
+        with self._lock:
+            active = [path for path in self._active if os.path.dirname(path) == directory]
+        total += sum(os.path.getsize(path) for path in active + [log_index.index_path(path) for path in active]
+                     if os.path.exists(path))
+        for _, size, path in sorted(files):
+            if total <= self.budget_bytes:
+                break
+            for victim in (path, log_index.index_path(path)):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            self.evicted += 1
+            print(f"[{self.name}] Disk budget: removed {os.path.basename(path)}")
+
+    def report(self):
+        return f"[{self.name}] {self.compressed} segments compressed, {self.evicted} files evicted"
+
+
+def _managed(name):
+    return SEGMENT_NAME.match(name) is not None or RECORDING_NAME.match(name) is not None
+
+
+def compress_file(path):
+    """
+    gzip path to path.gz (written to a temp file and renamed, so it is never torn), then remove path.
+
+    A segment with a time index is compressed one gzip member per indexed block and gets a
+    new index of the member offsets, so range reads still seek straight to their blocks.
+    """
+    target = path + COMPRESSED_SUFFIX
+    tmp = target + ".tmp"
+    index = log_index.read_index(path)
+    with open(path, "rb") as src, open(tmp, "wb") as raw:
+        if index is None:
+            with gzip.GzipFile(filename=os.path.basename(path), mode="wb", fileobj=raw, compresslevel=COMPRESS_LEVEL) as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+        else:
+            times, offsets = index
+            size = os.path.getsize(path)
+            bounds = [0] + [min(offset, size) for offset in offsets.tolist()] + [size] # Header, then each block
+            member_offsets = []
+            for begin, end in zip(bounds, bounds[1:]):
+                member_offsets.append(raw.tell())
+                src.seek(begin)
+                raw.write(gzip.compress(src.read(end - begin), COMPRESS_LEVEL))
+            log_index.write_index(target, times, member_offsets[1:])
+        raw.flush()
+        os.fsync(raw.fileno())
+    shutil.copystat(path, tmp) # Keep the segment's mtime so budget eviction stays oldest-first
+    os.replace(tmp, target)
+    os.remove(path)
+    if index is not None:
+        os.remove(log_index.index_path(path))
+
+
+def _lower_priority():
+    os.nice(19)
+    if hasattr(os, "sched_setscheduler"):
+        try:
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except (AttributeError, OSError):
+            pass # nice 19 alone still yields to the robot
+
+
+if __name__ == "__main__":
+    # Child process of LogMaintenance: python -m library.log_maintenance <segment>
+    _lower_priority()
+    compress_file(sys.argv[1])
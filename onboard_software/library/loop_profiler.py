@@ -0,0 +1,177 @@
+import datetime
+import json
+import os
+import time
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram with a fixed relative error.
+
+    Values are recorded in whole microseconds. Below 2**SUB_BUCKET_BITS every value has
+    its own bucket; above that each power of two is split into half as many linear
+    sub-buckets, so every bucket is within ~3% of the values it holds and recording
+    is a bit_length() plus a list increment, with no allocation on the hot path.
+    """
+
+    SUB_BUCKET_BITS = 6
+    MAX_VALUE_US = 60_000_000 # Anything slower than a minute lands in the top bucket
+
+    _SUB_COUNT = 1 << SUB_BUCKET_BITS
+    _HALF = _SUB_COUNT >> 1
+
+    def __init__(self):
+        self._buckets = [0] * (self._index(self.MAX_VALUE_US) + 1)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self._buckets)):
+            self._buckets[i] = 0
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    @classmethod
+    def _index(cls, value):
+        if value < cls._SUB_COUNT:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        return cls._SUB_COUNT + (shift - 1) * cls._HALF + ((value >> shift) - cls._HALF)
+
+    @classmethod
+    def _highest_equivalent(cls, index):
+        # Largest value that maps to this bucket
+        if index < cls._SUB_COUNT:
+            return index
+        k = index - cls._SUB_COUNT
+        shift = k // cls._HALF + 1
+        return ((k % cls._HALF + cls._HALF + 1) << shift) - 1
+
+    def record(self, value_us):
+        value_us = min(max(int(value_us), 0), self.MAX_VALUE_US)
+        self._buckets[self._index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+
+    def percentile(self, q):
+        """Value (us) at or below which q percent of the samples fall."""
+        if self.count == 0:
+            return 0
+        target = max(1, -(-self.count * q // 100))
+        seen = 0
+        for index, n in enumerate(self._buckets):
+            seen += n
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_us)
+        return self.max_us
+
+    def buckets(self):
+        """Non-empty buckets as [highest equivalent value (us), count] pairs."""
+        return [[self._highest_equivalent(i), n] for i, n in enumerate(self._buckets) if n]
+
+
+class _Phase:
+    def __init__(self, budget_s):
+        self.histogram = LatencyHistogram()
+        self.budget_us = None if budget_s is None else budget_s * 1e6
+        self.overruns = 0
+
+
+class LoopProfiler:
+    """
+    Per-phase timing of the control loop.
+
+    Each phase of a tick (command handling, every scheduled task, the telemetry
+    flush, the tick as a whole) records its duration into its own latency histogram,
+    along with the worst case and how many times it went over its budget. Timing is
+    taken with time.perf_counter() by the caller, so a phase costs two clock reads
+    and one record() call.
+
+    The snapshot is plain JSON-able data so it can be sent to mission control on
+    request and dumped to logs/ at shutdown.
+
+    Usage:
+        profiler = LoopProfiler()
+        profiler.set_budget("tick", 0.01)
+        start = time.perf_counter()
+        handle_commands()
+        profiler.record("commands", time.perf_counter() - start)
+        print(profiler.report())
+    """
+
+    PERCENTILES = (50, 90, 99, 99.9)
+
+    def __init__(self, name="Profiler"):
+        self.name = name
+        self.started = time.time()
+        self._phases = {}
+
+    def set_budget(self, phase, budget_s):
+        self._phase(phase).budget_us = None if budget_s is None else budget_s * 1e6
+
+    def _phase(self, name):
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(None)
+        return phase
+
+    def record(self, name, elapsed_s):
+        phase = self._phases.get(name) or self._phase(name)
+        elapsed_us = elapsed_s * 1e6
+        phase.histogram.record(elapsed_us)
+        if phase.budget_us is not None and elapsed_us > phase.budget_us:
+            phase.overruns += 1
+
+    def reset(self):
+        self.started = time.time()
+        for phase in self._phases.values():
+            phase.histogram.reset()
+            phase.overruns = 0
+
+    def snapshot(self, include_buckets=True):
+        phases = {}
+        for name, phase in list(self._phases.items()):
+            h = phase.histogram
+            entry = {
+                "count": h.count,
+                "mean_us": h.total_us / h.count if h.count else 0.0,
+                "min_us": h.min_us or 0,
+                "max_us": h.max_us,
+                "budget_us": phase.budget_us,
+                "overruns": phase.overruns,
+            }
+            for q in self.PERCENTILES:
+                entry[f"p{q:g}_us"] = h.percentile(q)
+            if include_buckets:
+                entry["buckets"] = h.buckets()
+            phases[name] = entry
+        return {"started": self.started, "duration_s": time.time() - self.started, "phases": phases}
+
+    def report(self):
+        lines = [f"[{self.name}] {'phase':<24}{'count':>8}{'mean us':>10}{'p50':>8}{'p99':>8}"
+                 f"{'p99.9':>8}{'max us':>9}{'budget':>8}{'over':>6}"]
+        for name, s in self.snapshot(include_buckets=False)["phases"].items():
+            budget = f"{s['budget_us']:.0f}" if s["budget_us"] is not None else "-"
+            lines.append(f"[{self.name}] {name:<24}{s['count']:>8}{s['mean_us']:>10.1f}{s['p50_us']:>8}"
+                         f"{s['p99_us']:>8}{s['p99.9_us']:>8}{s['max_us']:>9}{budget:>8}{s['overruns']:>6}")
+        return "\n".join(lines)
+
+    def dump(self, log_dir=None, extra=None):
+        """Write the snapshot (plus any extra sections) as JSON into logs/. Returns the file path."""
+        if log_dir is None:
+            log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
+        os.makedirs(log_dir, exist_ok=True)
+        file_tag = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(log_dir, f"loop_profile_{file_tag}.json")
+        data = self.snapshot()
+        if extra:
+            data.update(extra)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=1)
+        print(f"[{self.name}] Loop profile written to {path}")
+        return path
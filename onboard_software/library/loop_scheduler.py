@@ -0,0 +1,103 @@
+import math
+import time
+from collections import deque
+
+
+class LoopScheduler:
+    """
+    Fixed-rate scheduler for the control loop.
+
+    Sleeps until absolute deadlines (start + n * period) so the period doesn't drift
+    with the time spent doing work, and the CPU is idle between ticks instead of
+    spinning on time.monotonic(). An optional threading.Event wakes the loop early
+    (e.g. when a button command arrives) without counting as a tick.
+
+    If a tick's work runs past the following deadline the overrun is counted and any
+    whole periods that were missed are skipped instead of run back to back.
+
+    Usage:
+        scheduler = LoopScheduler(50, wakeup=mailbox.wakeup)
+        while running:
+            tick = scheduler.wait()   # False when woken early by the event
+            handle_commands()
+            if tick:
+                periodic_loop()
+    """
+
+    def __init__(self, rate_hz, wakeup=None, name="Loop", history=3000):
+        self.period = 1.0 / rate_hz
+        self.wakeup = wakeup
+        self.name = name
+        self._next_deadline = None
+
+        # Statistics
+        self.ticks = 0
+        self.early_wakeups = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.max_lateness = 0.0
+        self._lateness_total = 0.0
+        self._lateness = deque(maxlen=history) # Recent lateness samples (s) for percentiles
+
+    def reset(self):
+        self._next_deadline = None
+
+    def wait(self):
+        """Block until the next tick deadline or the wakeup event. Returns True when a tick is due."""
+        now = time.monotonic()
+        if self._next_deadline is None:
+            self._next_deadline = now
+
+        if now < self._next_deadline:
+            timeout = self._next_deadline - now
+            if self.wakeup is not None:
+                if self.wakeup.wait(timeout):
+                    self.wakeup.clear()
+                    if time.monotonic() < self._next_deadline:
+                        self.early_wakeups += 1
+                        return False
+            else:
+                time.sleep(timeout)
+        elif self.ticks > 0:
+            self.overruns += 1 # Previous tick's work ran past this deadline
+
+        now = time.monotonic()
+        lateness = now - self._next_deadline
+        missed = int(lateness // self.period)
+        if missed > 0:
+            self.skipped += missed
+            lateness -= missed * self.period
+            self._next_deadline += missed * self.period
+        self._next_deadline += self.period
+
+        self.ticks += 1
+        self._lateness_total += lateness
+        self._lateness.append(lateness)
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+        return True
+
+    def time_until_deadline(self):
+        """Seconds left before the next tick is due (negative once it's late)."""
+        if self._next_deadline is None:
+            return 0.0
+        return self._next_deadline - time.monotonic()
+
+    def stats(self):
+        recent = sorted(self._lateness)
+        p99 = recent[min(len(recent) - 1, math.ceil(0.99 * len(recent)) - 1)] if recent else 0.0
+        return {
+            "ticks": self.ticks,
+            "early_wakeups": self.early_wakeups,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "jitter_mean_ms": 1000.0 * self._lateness_total / self.ticks if self.ticks else 0.0,
+            "jitter_p99_ms": 1000.0 * p99,
+            "jitter_max_ms": 1000.0 * self.max_lateness,
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"[{self.name}] {s['ticks']} ticks at {1.0 / self.period:.0f} Hz, "
+                f"jitter mean {s['jitter_mean_ms']:.3f} ms / p99 {s['jitter_p99_ms']:.3f} ms / max {s['jitter_max_ms']:.3f} ms, "
+                f"{s['overruns']} overruns, {s['skipped']} skipped ticks, {s['early_wakeups']} early wakeups")
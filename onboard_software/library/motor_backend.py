@@ -0,0 +1,42 @@
+"""
+Selects the motor_controller implementation.
+
+    MOTOR_BACKEND=sim       simulated motors (library/sim_motor_controller.py)
+    MOTOR_BACKEND=hardware  the compiled pybind module driving SPARK MAXes on CAN
+    unset                   robot_params.RobotConfig.useSimulatedMotors decides
+
+Usage:
+    from library.motor_backend import motor_controller
+    mc = motor_controller.MotorController.get_instance("can0")
+"""
+
+import os
+import sys
+import robot_params
+
+BACKEND_ENV = "MOTOR_BACKEND"
+
+def _use_simulation():
+    backend = os.environ.get(BACKEND_ENV, "").strip().lower()
+    if backend in ("sim", "simulated"):
+        return True
+    if backend in ("hw", "hardware"):
+        return False
+    if backend:
+        raise ValueError(f"{BACKEND_ENV} must be 'sim' or 'hardware', got '{backend}'")
+    return robot_params.RobotConfig.useSimulatedMotors
+
+SIMULATED = _use_simulation()
+
+if SIMULATED:
+    from library import sim_motor_controller as motor_controller
+    sim = robot_params.SimConfig
+    motor_controller.settings.update(
+        can_latency_s=sim.CAN_LATENCY_S,
+        update_cost_s=sim.UPDATE_COST_S,
+        bus_voltage=sim.BUS_VOLTAGE,
+    )
+    print(f"[Motors] Using simulated motors (CAN latency {sim.CAN_LATENCY_S * 1000:.1f} ms)")
+else:
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'motor_controller/build'))
+    import motor_controller  # type: ignore
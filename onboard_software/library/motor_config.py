@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import time
+
+import robot_params
+from library import motor_backend
+
+FINGERPRINT_VERSION = 1 # Bump when the fingerprint inputs change, so every motor is flashed once
+REFLASH_ENV = "MOTOR_REFLASH" # MOTOR_REFLASH=1 flashes every motor regardless of the cache
+REBOOT_S = 0.0 if motor_backend.SIMULATED else 1.0 # A SPARK MAX is back on the bus within this after BurnFlash
+
+# MotorConfig attributes checked against the SPARK MAX, with the tolerance of each
+# (None = must match exactly; current limits are stored as whole amps)
+CONFIG_FIELDS = {
+    "idle_mode": None,
+    "motor_type": None,
+    "sensor_type": None,
+    "ramp_rate": 0.001,
+    "inverted": None,
+    "motor_kv": None,
+    "encoder_counts_per_rev": None,
+    "smart_current_free_limit": 0.5,
+    "smart_current_stall_limit": 0.5,
+}
+
+
+def _number(value):
+    # Enums (pybind or IntEnum) and bools compare as ints
+    return value if isinstance(value, float) else int(value)
+
+
+def config_mismatches(expected, actual, skip=()):
+    """(field, expected, actual) for every CONFIG_FIELDS attribute that differs."""
+    mismatches = []
+    for field, tolerance in CONFIG_FIELDS.items():
+        if field in skip:
+            continue
+        want, got = _number(getattr(expected, field)), _number(getattr(actual, field))
+        if (want != got) if tolerance is None else (abs(want - got) > tolerance):
+            mismatches.append((field, getattr(expected, field), getattr(actual, field)))
+    return mismatches
+
+
+def config_fingerprint(config):
+    """Short stable hash of the CONFIG_FIELDS values of a MotorConfig."""
+    values = ";".join(f"{field}={round(float(_number(getattr(config, field))), 6)!r}" for field in CONFIG_FIELDS)
+    return hashlib.sha1(f"v{FINGERPRINT_VERSION};{values}".encode()).hexdigest()[:16]
+
+
+class ConfigCache:
+    """
+    Remembers the fingerprint of the configuration last flashed on each motor ID.
+
+    Configuring a SPARK MAX means nine parameter writes and a BurnFlash (which reboots it)
+    per motor. When the cached fingerprint of a motor matches the config a subsystem asks
+    for, the motor is only connected (initialize_motor(configure=False)) and keeps what
+    is already flashed. Motors are flashed on a mismatch, on a missing entry, or on every
+    motor when force is set. The boot-time ConfigVerifier catches a motor that was swapped
+    or reset behind the cache's back: it gets reflashed and its entry rewritten. Without the
+    verifier nothing would, so the shared cache is only enabled together with it.
+
+    path=None keeps the cache in memory only (used for simulated motors, whose "flash"
+    does not outlive the process).
+
+    Usage:
+        cache = ConfigCache("state/motor_config_cache.json")
+        cache.initialize_motors(mc, [7, 1], config)
+        print(cache.report())
+    """
+
+    def __init__(self, path, enabled=True, force=False, name="Config cache"):
+        self.path = path
+        self.enabled = enabled
+        self.force = force
+        self.name = name
+        self.skipped = [] # Motors initialized without reconfiguring this boot
+        self.flashed = []
+        self.last_flash = None # time.monotonic() of the newest BurnFlash, tracked even when disabled
+        self._fingerprints = self._load() if enabled and not force else {}
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == FINGERPRINT_VERSION:
+                return {int(motor_id): fingerprint for motor_id, fingerprint in data["motors"].items()}
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            print(f"[{self.name}] Ignoring unreadable cache {self.path}: {e}")
+        return {}
+
+    def save(self):
+        if self.path is None or not self.enabled:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": FINGERPRINT_VERSION,
+                       "motors": {str(motor_id): fp for motor_id, fp in sorted(self._fingerprints.items())}}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path) # A brownout mid-write leaves the old cache, never a torn one
+
+    def initialize_motor(self, mc, motor_id, config):
+        self.initialize_motors(mc, [motor_id], config)
+
+    def initialize_motors(self, mc, motor_ids, config):
+        """initialize_motors() that only configures motors whose flashed config may differ."""
+        fingerprint = config_fingerprint(config)
+        changed = False
+        initialized = set(mc.get_initialized_motor_ids())
+        for motor_id in motor_ids:
+            if motor_id in initialized:
+                mc.initialize_motor(motor_id, config) # Only warns; whoever connected it owns its config
+                continue
+            if self.enabled and self._fingerprints.get(motor_id) == fingerprint:
+                mc.initialize_motor(motor_id, config, configure=False)
+                self.skipped.append(motor_id)
+                continue
+            mc.initialize_motor(motor_id, config)
+            self.last_flash = time.monotonic()
+            self.flashed.append(motor_id)
+            self._fingerprints[motor_id] = fingerprint
+            changed = True
+        if changed:
+            self.save()
+
+    def reflash(self, mc, motor_id, config):
+        """Configure an already initialized motor and record it. The BurnFlash reboot restarts
+        the encoder, so the position is zeroed again once the motor is back."""
+        mc.configure_motor(motor_id, config)
+        self.last_flash = time.monotonic()
+        time.sleep(REBOOT_S)
+        mc.reset_motor_position(motor_id)
+        self._fingerprints[motor_id] = config_fingerprint(config)
+        if motor_id in self.skipped:
+            self.skipped.remove(motor_id)
+        self.flashed.append(motor_id)
+        self.save()
+
+    def wait_for_reboot(self):
+        """Sleep until every motor flashed so far is back from its BurnFlash reboot.
+        Returns the seconds slept."""
+        if self.last_flash is None:
+            return 0.0
+        remaining = self.last_flash + REBOOT_S - time.monotonic()
+        if remaining <= 0:
+            return 0.0
+        time.sleep(remaining)
+        return remaining
+
+    def invalidate(self, motor_id):
+        """Forget a motor, so it is flashed on the next boot."""
+        if self._fingerprints.pop(motor_id, None) is not None:
+            self.save()
+
+    def report(self):
+        if not self.enabled:
+            return f"[{self.name}] Disabled, flashed motors {self.flashed}"
+        return (f"[{self.name}] {len(self.skipped)} motors unchanged {self.skipped}, "
+                f"{len(self.flashed)} flashed {self.flashed}" + (" (forced)" if self.force else ""))
+
+
+class ConfigVerifier:
+    """
+    Checks the configuration flashed on every motor against what the subsystems intended.
+
+    All motors are read back in one pipelined read_motor_configs() call, so verifying
+    the whole robot takes a few CAN round trips instead of ~225 ms per motor.
+
+    With a ConfigCache, motors that were skipped because of the cache are repaired: a
+    mismatching one is reflashed, one that doesn't answer is forgotten by the cache so it
+    is flashed on the next boot. Freshly flashed motors are still rebooting from their
+    BurnFlash, so the read back waits until REBOOT_S after the last flash. A fresh motor
+    that then still doesn't answer or mismatches did not take its flash; it is reported
+    and forgotten by the cache, so the next boot flashes it again.
+
+    Usage:
+        verifier = ConfigVerifier(mc, cache)
+        ok = verifier.verify({**drivetrain.motor_configs, **auger.motor_configs})
+    """
+
+    def __init__(self, mc, cache=None, name="Motor config"):
+        self.mc = mc
+        self.cache = cache
+        self.name = name
+
+    def verify(self, expected):
+        """Read back every motor in expected ({motor_id: MotorConfig}) and print any problem.
+        Returns True when every parameter was read and matched."""
+        if self.cache is not None:
+            waited = self.cache.wait_for_reboot()
+            if waited > 0:
+                print(f"[{self.name}] Waited {waited * 1000.0:.0f} ms for flashed motors {self.cache.flashed} to reboot")
+        start = time.monotonic()
+        readbacks = self.mc.read_motor_configs(list(expected))
+        elapsed_ms = (time.monotonic() - start) * 1000.0
+
+        ok = True
+        for motor_id, config in expected.items():
+            readback = readbacks[motor_id]
+            trusted = self.cache is not None and motor_id in self.cache.skipped
+            fresh = self.cache is not None and motor_id in self.cache.flashed
+            if readback.missing:
+                ok = False
+                print(f"[{self.name}] Motor {motor_id}: no response for {', '.join(readback.missing)}")
+            mismatches = config_mismatches(config, readback.config, skip=readback.missing)
+            for field, want, got in mismatches:
+                ok = False
+                print(f"[{self.name}] Motor {motor_id}: {field} is {got}, expected {want}")
+            if mismatches and trusted:
+                print(f"[{self.name}] Motor {motor_id}: cached config is stale, reflashing")
+                self.cache.reflash(self.mc, motor_id, config)
+            elif (readback.missing or mismatches) and (trusted or fresh):
+                self.cache.invalidate(motor_id)
+        status = "all match" if ok else "MISMATCH"
+        print(f"[{self.name}] Verified {len(expected)} motors in {elapsed_ms:.1f} ms: {status}")
+        return ok
+
+
+def _default_cache():
+    config = robot_params.RobotConfig
+    force = config.forceMotorReflash or os.environ.get(REFLASH_ENV, "").strip() not in ("", "0")
+    path = None if motor_backend.SIMULATED else os.path.join(os.path.dirname(__file__), '..', 'state', 'motor_config_cache.json')
+    enabled = config.useMotorConfigCache and config.verifyMotorConfigs
+    if config.useMotorConfigCache and not enabled:
+        print("[Config cache] Disabled: it needs verifyMotorConfigs to catch swapped or reset motors")
+    return ConfigCache(path, enabled=enabled, force=force)
+
+# Shared by the subsystems and Robot's boot-time verification
+cache = _default_cache()
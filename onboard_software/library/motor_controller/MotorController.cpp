@@ -1,14 +1,25 @@
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 
+#include <algorithm>
+#include <cmath>
+#include <atomic>
 #include <chrono>
+#include <cstdint>
+#include <deque>
 #include <iostream>
 #include <map>
+#include <mutex>
 #include <thread>
 #include <vector>
 #include <string>
 #include <memory>
 
+#include <linux/can/raw.h>
+#include <poll.h>
+#include <sys/socket.h>
+
 #include "SparkMax.hpp"
 
 namespace py = pybind11;
@@ -24,6 +35,19 @@ struct MotorFeedback
     float voltage;       // Bus voltage (Volts)
 };
 
+// One row of the feedback table exposed to Python by get_feedback_view()
+struct FeedbackRecord
+{
+    int32_t motorId;
+    float dutyCycle;
+    float velocity;
+    float position;
+    float current;
+    float temperature;
+    float voltage;
+    double timestamp;    // Monotonic clock (seconds) when the motor was read, 0 until the first update
+};
+
 // Configuration structure for motor initialization
 struct MotorConfig 
 {
@@ -38,6 +62,108 @@ struct MotorConfig
     float smartCurrentStallLimit = 80.0;
 };
 
+// Result of reading one motor's configuration back over CAN
+struct ConfigReadback
+{
+    int motorId = 0;
+    MotorConfig config;                 // Parameters without a response keep their defaults
+    std::vector<std::string> missing;   // Parameters that got no response
+};
+
+// Parameters read back by ReadMotorConfigs(), named like the MotorConfig Python attributes
+struct ConfigParameter
+{
+    Parameter id;
+    const char* name;
+};
+
+static const ConfigParameter kConfigParameters[] = {
+    {Parameter::kIdleMode, "idle_mode"},
+    {Parameter::kMotorType, "motor_type"},
+    {Parameter::kSensorType, "sensor_type"},
+    {Parameter::kRampRate, "ramp_rate"},
+    {Parameter::kInverted, "inverted"},
+    {Parameter::kMotorKv, "motor_kv"},
+    {Parameter::kEncoderCountsPerRev, "encoder_counts_per_rev"},
+    {Parameter::kSmartCurrentFreeLimit, "smart_current_free_limit"},
+    {Parameter::kSmartCurrentStallLimit, "smart_current_stall_limit"},
+};
+
+// Readback defaults; one parameter round trip normally takes about a millisecond
+static constexpr double kConfigReadTimeoutS = 0.02;
+static constexpr int kConfigReadRetries = 2;
+static constexpr size_t kConfigReadsInFlight = 8;
+
+static void ApplyConfigParameter(MotorConfig& config, Parameter id, double value)
+{
+    switch (id)
+    {
+        case Parameter::kIdleMode:               config.idleMode = static_cast<IdleMode>(static_cast<int>(value)); break;
+        case Parameter::kMotorType:              config.motorType = static_cast<MotorType>(static_cast<int>(value)); break;
+        case Parameter::kSensorType:             config.sensorType = static_cast<SensorType>(static_cast<int>(value)); break;
+        case Parameter::kRampRate:               config.rampRate = static_cast<float>(value); break;
+        case Parameter::kInverted:               config.inverted = value != 0.0; break;
+        case Parameter::kMotorKv:                config.motorKv = static_cast<int>(value); break;
+        case Parameter::kEncoderCountsPerRev:    config.encoderCountsPerRev = static_cast<int>(value); break;
+        case Parameter::kSmartCurrentFreeLimit:  config.smartCurrentFreeLimit = static_cast<float>(value); break;
+        case Parameter::kSmartCurrentStallLimit: config.smartCurrentStallLimit = static_cast<float>(value); break;
+        default: break;
+    }
+}
+
+// Value of a parameter response frame (same encoding as SparkBase::ReadParameter)
+static bool DecodeParameterResponse(const can_frame& frame, double& value)
+{
+    if (frame.can_dlc < 5)
+    {
+        return false; // e.g. another host's request for the same parameter
+    }
+    switch (frame.data[4])
+    {
+        case 0x01:
+        {
+            uint32_t raw = 0;
+            for (int i = 0; i < 4; ++i)
+            {
+                raw |= static_cast<uint32_t>(frame.data[i]) << (8 * i);
+            }
+            value = raw;
+            return true;
+        }
+        case 0x02:
+        {
+            float raw;
+            std::memcpy(&raw, frame.data, sizeof(float));
+            value = raw;
+            return true;
+        }
+        case 0x03:
+            value = frame.data[0] != 0 ? 1.0 : 0.0;
+            return true;
+    }
+    return false;
+}
+
+// Statistics of the background update thread
+struct UpdateThreadStats
+{
+    uint64_t cycles = 0;
+    uint64_t overruns = 0;       // Cycles that ran past the next deadline
+    float lastCycleUs = 0.0f;
+    float maxCycleUs = 0.0f;
+    uint64_t errors = 0;         // Motor passes that threw (CAN send failure, rejected duty cycle)
+    std::string lastError;
+};
+
+// Feedback of every motor from one update cycle, in motor slot order
+struct FeedbackSnapshot
+{
+    std::vector<MotorFeedback> feedback;
+    std::vector<float> rawPositions;
+    std::vector<double> timestamps;
+    uint64_t cycle = 0;
+};
+
 class MotorController 
 {
 private:
@@ -47,14 +173,301 @@ private:
     std::map<int, MotorFeedback> motorFeedback;
     std::map<int, float> positionOffsets;
 
+    // update(), initialize_motor(s), configure_motor() and read_motor_config(s) run without the GIL, so Python threads
+    // can call in concurrently: busMutex serializes CAN work and every access to connectedMotors
+    // outside the update thread, stateMutex guards the command/feedback maps (feedbackRows is
+    // what ID checks use) and is only held for quick copies.
+    std::mutex busMutex;
+    mutable std::mutex stateMutex;
+
+    // Background update thread. While it runs the set of motors is fixed: each motor has
+    // a slot index into the atomic command/offset mailboxes and the feedback snapshots.
+    std::thread updateThread;
+    std::atomic<bool> updateThreadRunning{false};
+    std::vector<int> slotMotorIDs;
+    std::map<int, size_t> motorSlots;
+    std::unique_ptr<std::atomic<float>[]> dutyCycleMailbox;
+    std::unique_ptr<std::atomic<float>[]> positionOffsetMailbox;
+
+    // Triple buffer: the update thread fills its back buffer and swaps it with the shared
+    // middle one, readers swap a fresh middle buffer into their front one. Neither side
+    // ever waits for the other and a reader never sees a half-written snapshot.
+    static constexpr int kFreshBit = 4;
+    FeedbackSnapshot snapshots[3];
+    std::atomic<int> middleSnapshot{1};
+    int backSnapshot = 0;    // Owned by the update thread
+    int frontSnapshot = 2;   // Owned by readers, under readerMutex
+    std::mutex readerMutex;  // Only serializes readers against each other
+
+    std::mutex statsMutex;
+    UpdateThreadStats threadStats;
+    std::string pendingError;    // Update thread error not yet raised to Python (under statsMutex)
+
+    // Feedback table behind get_feedback_view(). Rows are assigned in initialization order and the
+    // storage is allocated once, so a NumPy view of it stays valid for the life of the process.
+    // Rows are only rewritten inside Update().
+    static constexpr size_t kMaxMotors = 64;
+    std::unique_ptr<FeedbackRecord[]> feedbackTable;
+    std::map<int, size_t> feedbackRows;
+
     // Private constructor for singleton
-    MotorController(std::string canbus_name) : canbus(canbus_name) {}
+    MotorController(std::string canbus_name) : canbus(canbus_name), feedbackTable(new FeedbackRecord[kMaxMotors]()) {}
+
+    // Same layout as SparkBase::CreateParamArbId: parameter requests and responses share it
+    static uint32_t ParameterArbId(int motor_ID, Parameter param)
+    {
+        return (static_cast<uint32_t>(DEVICE_TYPE) << 24) | (static_cast<uint32_t>(MANUFACTURER) << 16) |
+               (static_cast<uint32_t>(48) << 10) | (static_cast<uint32_t>(param) << 6) | static_cast<uint32_t>(motor_ID);
+    }
+
+    // Non-blocking CAN socket of its own for parameter readback. Each SparkBase reads its socket
+    // from a background thread that would race ReadParameter for responses; this one is read only
+    // by ReadMotorConfigs() and the kernel filters out status frames before they reach it.
+    class ParameterSocket
+    {
+    public:
+        explicit ParameterSocket(const std::string& interfaceName)
+        {
+            fd = socket(PF_CAN, SOCK_RAW, CAN_RAW);
+            if (fd < 0)
+            {
+                throw std::system_error(errno, std::generic_category(), "Parameter socket creation failed");
+            }
+            // Parameter IDs overlap the API class bits of the arbitration ID, so the filter can only
+            // pin the device type, manufacturer and the two class bits every parameter frame sets
+            can_filter filter;
+            filter.can_id = ParameterArbId(0, static_cast<Parameter>(0)) | CAN_EFF_FLAG;
+            filter.can_mask = 0x1FFFC000 | CAN_EFF_FLAG | CAN_RTR_FLAG;
+            int flags = fcntl(fd, F_GETFL, 0);
+            sockaddr_can addr = {};
+            addr.can_family = AF_CAN;
+            addr.can_ifindex = if_nametoindex(interfaceName.c_str());
+            if (setsockopt(fd, SOL_CAN_RAW, CAN_RAW_FILTER, &filter, sizeof(filter)) < 0 ||
+                fcntl(fd, F_SETFL, flags | O_NONBLOCK) < 0 ||
+                addr.can_ifindex == 0 ||
+                bind(fd, reinterpret_cast<sockaddr*>(&addr), sizeof(addr)) < 0)
+            {
+                int error = errno;
+                close(fd);
+                throw std::system_error(error, std::generic_category(), "Parameter socket setup on " + interfaceName + " failed");
+            }
+        }
+
+        ~ParameterSocket()
+        {
+            close(fd);
+        }
+
+        ParameterSocket(const ParameterSocket&) = delete;
+        ParameterSocket& operator=(const ParameterSocket&) = delete;
+
+        // Send a parameter read request; false if the TX queue is full
+        bool SendRequest(uint32_t arbId)
+        {
+            can_frame request = {};
+            request.can_id = arbId | CAN_EFF_FLAG;
+            request.can_dlc = 0;
+            if (write(fd, &request, sizeof(request)) == sizeof(request))
+            {
+                return true;
+            }
+            if (errno == ENOBUFS || errno == EAGAIN)
+            {
+                return false;
+            }
+            throw std::system_error(errno, std::generic_category(), "Sending parameter request failed");
+        }
+
+        // Next frame received before deadline; false once the deadline has passed
+        bool Receive(can_frame& frame, std::chrono::steady_clock::time_point deadline)
+        {
+            while (true)
+            {
+                if (read(fd, &frame, sizeof(frame)) == sizeof(frame))
+                {
+                    return true;
+                }
+                auto remaining = std::chrono::duration_cast<std::chrono::microseconds>(deadline - std::chrono::steady_clock::now());
+                if (remaining.count() <= 0)
+                {
+                    return false;
+                }
+                pollfd pfd = {fd, POLLIN, 0};
+                poll(&pfd, 1, static_cast<int>((remaining.count() + 999) / 1000));
+            }
+        }
+
+    private:
+        int fd;
+    };
+
+    static void Configure(SparkMax& motor, const MotorConfig& config)
+    {
+        motor.SetIdleMode(config.idleMode);
+        motor.SetMotorType(config.motorType);
+        motor.SetSensorType(config.sensorType);
+        motor.SetRampRate(config.rampRate);
+        motor.SetInverted(config.inverted);
+        motor.SetMotorKv(config.motorKv);
+        motor.SetEncoderCountsPerRev(config.encoderCountsPerRev);
+        motor.SetSmartCurrentFreeLimit(config.smartCurrentFreeLimit);
+        motor.SetSmartCurrentStallLimit(config.smartCurrentStallLimit);
+        motor.BurnFlash();
+    }
+
+    static double MonotonicSeconds()
+    {
+        return std::chrono::duration<double>(std::chrono::steady_clock::now().time_since_epoch()).count();
+    }
+
+    // Cache a motor's feedback in the map and its table row (call with stateMutex held)
+    void StoreFeedback(int motor_ID, const MotorFeedback& data, double timestamp)
+    {
+        motorFeedback[motor_ID] = data;
+        FeedbackRecord& record = feedbackTable[feedbackRows.at(motor_ID)];
+        record.dutyCycle   = data.dutyCycle;
+        record.velocity    = data.velocity;
+        record.position    = data.position;
+        record.current     = data.current;
+        record.temperature = data.temperature;
+        record.voltage     = data.voltage;
+        record.timestamp   = timestamp;
+    }
 
     // Delete copy constructor and assignment operator
     MotorController(const MotorController&) = delete;
     MotorController& operator=(const MotorController&) = delete;
 
+    void RequireUpdateThreadStopped(const std::string& action) const
+    {
+        if (updateThreadRunning.load())
+        {
+            throw std::runtime_error("Cannot " + action + " while the update thread is running.");
+        }
+    }
+
+    static void CheckDutyCycle(int motor_ID, float dutyCycle)
+    {
+        // SparkBase::SetDutyCycle rejects these too, but on the update thread that would be too late
+        if (!std::isfinite(dutyCycle) || std::fabs(dutyCycle) > 1.0f)
+        {
+            throw std::invalid_argument("Duty cycle " + std::to_string(dutyCycle) + " for motor " +
+                                        std::to_string(motor_ID) + " must be a finite value in [-1, 1].");
+        }
+    }
+
+    // One heartbeat + command + feedback pass over every motor, used by the update thread.
+    // An exception must not leave the thread (std::terminate would abort the robot with the
+    // motors still running), so each motor's error is recorded and raised from the next update().
+    void UpdateCycle(FeedbackSnapshot& snapshot)
+    {
+        for (size_t slot = 0; slot < slotMotorIDs.size(); ++slot)
+        {
+            try
+            {
+                SparkMax& motor = connectedMotors.at(slotMotorIDs[slot]);
+
+                motor.Heartbeat();
+                motor.SetDutyCycle(dutyCycleMailbox[slot].load(std::memory_order_relaxed));
+
+                float rawPosition = motor.GetPosition();
+                MotorFeedback& data = snapshot.feedback[slot];
+                data.dutyCycle    = motor.GetDutyCycle();
+                data.velocity     = motor.GetVelocity();
+                data.position     = rawPosition - positionOffsetMailbox[slot].load(std::memory_order_relaxed);
+                data.current      = motor.GetCurrent();
+                data.temperature  = motor.GetTemperature();
+                data.voltage      = motor.GetVoltage();
+                snapshot.rawPositions[slot] = rawPosition;
+                snapshot.timestamps[slot] = MonotonicSeconds();
+            }
+            catch (const std::exception& e)
+            {
+                std::lock_guard<std::mutex> lock(statsMutex);
+                threadStats.errors++;
+                threadStats.lastError = "Motor " + std::to_string(slotMotorIDs[slot]) + ": " + e.what();
+                pendingError = threadStats.lastError;
+            }
+        }
+    }
+
+    // Raise the update thread's newest error (once) on the calling Python thread
+    void RaisePendingError()
+    {
+        std::string error;
+        uint64_t errors;
+        {
+            std::lock_guard<std::mutex> lock(statsMutex);
+            if (pendingError.empty())
+            {
+                return;
+            }
+            error.swap(pendingError);
+            errors = threadStats.errors;
+        }
+        throw std::runtime_error("Update thread: " + error + " (" + std::to_string(errors) + " errors so far)");
+    }
+
+    void UpdateThreadLoop(std::chrono::nanoseconds period)
+    {
+        using clock = std::chrono::steady_clock;
+        auto deadline = clock::now();
+        uint64_t cycle = 0;
+
+        while (true)
+        {
+            // One last pass after a stop request so final commands (e.g. 0 on shutdown) go out
+            bool last = !updateThreadRunning.load();
+
+            auto start = clock::now();
+            FeedbackSnapshot& snapshot = snapshots[backSnapshot];
+            UpdateCycle(snapshot);
+            snapshot.cycle = ++cycle;
+            backSnapshot = middleSnapshot.exchange(backSnapshot | kFreshBit) & ~kFreshBit;
+            auto end = clock::now();
+
+            deadline += period;
+            {
+                std::lock_guard<std::mutex> lock(statsMutex);
+                float cycleUs = std::chrono::duration<float, std::micro>(end - start).count();
+                threadStats.cycles = cycle;
+                threadStats.lastCycleUs = cycleUs;
+                threadStats.maxCycleUs = std::max(threadStats.maxCycleUs, cycleUs);
+                if (end > deadline)
+                {
+                    threadStats.overruns++;
+                }
+            }
+            if (last)
+            {
+                break;
+            }
+            if (end > deadline)
+            {
+                // Skip missed periods instead of running them back to back
+                auto missed = (end - deadline) / period + 1;
+                deadline += missed * period;
+            }
+            std::this_thread::sleep_until(deadline);
+        }
+    }
+
+    // Latest snapshot published by the update thread (call with readerMutex held)
+    const FeedbackSnapshot& LatestSnapshot()
+    {
+        if (middleSnapshot.load() & kFreshBit)
+        {
+            frontSnapshot = middleSnapshot.exchange(frontSnapshot) & ~kFreshBit;
+        }
+        return snapshots[frontSnapshot];
+    }
+
 public:
+    ~MotorController()
+    {
+        StopUpdateThread();
+    }
+
     // Get the singleton instance
     static MotorController& GetInstance(const std::string& canbus_name = "can0") 
     {
@@ -76,53 +489,83 @@ public:
         return canbus;
     }
 
-    // Initialize a motor with custom configuration
-    void InitializeMotor(int motor_ID, const MotorConfig& config) 
+    // Initialize a motor with custom configuration. With configure=false the motor is only connected
+    // and keeps the configuration already flashed on it (see library/motor_config.py).
+    void InitializeMotor(int motor_ID, const MotorConfig& config, bool configure = true) 
     {
+        RequireUpdateThreadStopped("initialize motors");
+        std::lock_guard<std::mutex> busLock(busMutex);
+
         // Check if motor is already initialized
         if (connectedMotors.find(motor_ID) != connectedMotors.end()) 
         {
             std::cerr << "Warning: Motor ID " << motor_ID << " is already initialized." << std::endl;
             return;
         }
+        if (connectedMotors.size() >= kMaxMotors)
+        {
+            throw std::runtime_error("Cannot initialize more than " + std::to_string(kMaxMotors) + " motors.");
+        }
 
         // Create new motor object
         connectedMotors.emplace(std::piecewise_construct,
                                 std::forward_as_tuple(motor_ID),
                                 std::forward_as_tuple(canbus, motor_ID));
 
-        // Configure the motor
-        SparkMax& motor = connectedMotors.at(motor_ID);
-        motor.SetIdleMode(config.idleMode);
-        motor.SetMotorType(config.motorType);
-        motor.SetSensorType(config.sensorType);
-        motor.SetRampRate(config.rampRate);
-        motor.SetInverted(config.inverted);
-        motor.SetMotorKv(config.motorKv);
-        motor.SetEncoderCountsPerRev(config.encoderCountsPerRev);
-        motor.SetSmartCurrentFreeLimit(config.smartCurrentFreeLimit);
-        motor.SetSmartCurrentStallLimit(config.smartCurrentStallLimit);
-        motor.BurnFlash();
+        if (configure)
+        {
+            Configure(connectedMotors.at(motor_ID), config);
+        }
 
-        // Initialize position offset to 0
+        // Initialize position offset to 0 and give the motor the next feedback table row
+        std::lock_guard<std::mutex> lock(stateMutex);
         positionOffsets[motor_ID] = 0.0f;
+        size_t row = feedbackRows.size();
+        feedbackRows[motor_ID] = row;
+        feedbackTable[row] = FeedbackRecord{};
+        feedbackTable[row].motorId = motor_ID;
     }
 
     // Initialize multiple motors with the same configuration
-    void InitializeMotors(const std::vector<int>& motor_IDs, const MotorConfig& config) 
+    void InitializeMotors(const std::vector<int>& motor_IDs, const MotorConfig& config, bool configure = true) 
     {
         for (int motor_ID : motor_IDs) 
         {
-            InitializeMotor(motor_ID, config);
+            InitializeMotor(motor_ID, config, configure);
+        }
+    }
+
+    // Write a configuration to an initialized motor and burn it to flash (the SPARK MAX reboots)
+    void ConfigureMotor(int motor_ID, const MotorConfig& config)
+    {
+        RequireUpdateThreadStopped("configure motors");
+        std::lock_guard<std::mutex> busLock(busMutex);
+        auto it = connectedMotors.find(motor_ID);
+        if (it == connectedMotors.end())
+        {
+            throw std::runtime_error("Motor ID " + std::to_string(motor_ID) + " is not initialized.");
+        }
+        Configure(it->second, config);
+    }
+
+    // Throw unless a motor has finished initializing (call with stateMutex held). A motor gets its
+    // feedbackRows entry under stateMutex only once it is set up, so unlike connectedMotors this can
+    // be checked while initialize_motor(s) adds motors on another thread.
+    void RequireInitialized(int motor_ID) const
+    {
+        if (feedbackRows.find(motor_ID) == feedbackRows.end())
+        {
+            throw std::runtime_error("Motor ID " + std::to_string(motor_ID) + " is not initialized.");
         }
     }
 
     // Get list of initialized motor IDs
     std::vector<int> GetInitializedMotorIDs() const 
     {
+        std::lock_guard<std::mutex> lock(stateMutex);
         std::vector<int> ids;
-        ids.reserve(connectedMotors.size());
-        for (const auto& pair : connectedMotors) 
+        ids.reserve(feedbackRows.size());
+        for (const auto& pair : feedbackRows) 
         {
             ids.push_back(pair.first);
         }
@@ -132,19 +575,47 @@ public:
     // Get number of initialized motors
     size_t GetMotorCount() const 
     {
-        return connectedMotors.size();
+        std::lock_guard<std::mutex> lock(stateMutex);
+        return feedbackRows.size();
     }
 
     // Update all motors: send commands and collect feedback (call this in main loop)
     void Update() 
     {
+        RaisePendingError();
+        std::lock_guard<std::mutex> busLock(busMutex);
+        if (updateThreadRunning.load())
+        {
+            // The background thread does the CAN work at its own rate, only refresh the table
+            std::lock_guard<std::mutex> lock(readerMutex);
+            const FeedbackSnapshot& snapshot = LatestSnapshot();
+            std::lock_guard<std::mutex> stateLock(stateMutex);
+            for (size_t slot = 0; slot < slotMotorIDs.size() && snapshot.cycle > 0; ++slot)
+            {
+                StoreFeedback(slotMotorIDs[slot], snapshot.feedback[slot], snapshot.timestamps[slot]);
+            }
+            return;
+        }
+
+        // Take this cycle's commands, then talk to the bus without holding the state lock
+        std::map<int, float> commands;
+        std::map<int, float> offsets;
+        {
+            std::lock_guard<std::mutex> lock(stateMutex);
+            commands = dutyCycles;
+            offsets = positionOffsets;
+        }
+
+        std::map<int, MotorFeedback> feedback;
+        std::map<int, double> timestamps;
         for (auto& pair : connectedMotors) 
         {
             int motor_ID = pair.first;
             SparkMax& motor = pair.second;
 
             // Get desired duty cycle (0 if not set)
-            float dutyCycle = GetCurrentDutyCycle(motor_ID);
+            auto command = commands.find(motor_ID);
+            float dutyCycle = command != commands.end() ? command->second : 0.0f;
 
             // Send heartbeat and set duty cycle
             motor.Heartbeat();
@@ -154,24 +625,33 @@ public:
             MotorFeedback data;
             data.dutyCycle    = motor.GetDutyCycle();
             data.velocity     = motor.GetVelocity();
-            data.position     = motor.GetPosition() - positionOffsets[motor_ID];
+            data.position     = motor.GetPosition() - offsets[motor_ID];
             data.current      = motor.GetCurrent();
             data.temperature  = motor.GetTemperature();
             data.voltage      = motor.GetVoltage();
 
-            motorFeedback[motor_ID] = data;
+            feedback[motor_ID] = data;
+            timestamps[motor_ID] = MonotonicSeconds();
+        }
+
+        std::lock_guard<std::mutex> lock(stateMutex);
+        for (const auto& pair : feedback)
+        {
+            StoreFeedback(pair.first, pair.second, timestamps[pair.first]);
         }
     }
 
     // Set desired duty cycle for a single motor
     void SetMotorDutyCycle(int motor_ID, float dutyCycle) 
     {
-        if (connectedMotors.find(motor_ID) == connectedMotors.end()) 
+        CheckDutyCycle(motor_ID, dutyCycle);
+        std::lock_guard<std::mutex> lock(stateMutex);
+        RequireInitialized(motor_ID);
+        dutyCycles[motor_ID] = dutyCycle;
+        if (updateThreadRunning.load())
         {
-            throw std::runtime_error("Motor ID " + std::to_string(motor_ID) + " is not initialized.");
+            dutyCycleMailbox[motorSlots.at(motor_ID)].store(dutyCycle, std::memory_order_relaxed);
         }
-
-        dutyCycles[motor_ID] = dutyCycle;
     }
 
     // Set desired duty cycles for multiple motors
@@ -191,6 +671,7 @@ public:
     // Get the desired duty cycle for a motor
     float GetCurrentDutyCycle(int motor_ID) const 
     {
+    std::lock_guard<std::mutex> lock(stateMutex);
     auto it = dutyCycles.find(motor_ID);
     if (it != dutyCycles.end()) 
     {
@@ -200,74 +681,407 @@ public:
     }
 
     // Get feedback for a single motor
-    MotorFeedback GetMotorFeedback(int motor_ID) const 
+    MotorFeedback GetMotorFeedback(int motor_ID) 
     {
-        if (connectedMotors.find(motor_ID) == connectedMotors.end()) 
         {
-            throw std::runtime_error("Motor ID " + std::to_string(motor_ID) + " is not initialized.");
+            std::lock_guard<std::mutex> lock(stateMutex);
+            RequireInitialized(motor_ID);
         }
 
-        // Return cached feedback data
+        if (updateThreadRunning.load())
+        {
+            std::lock_guard<std::mutex> lock(readerMutex);
+            return LatestSnapshot().feedback[motorSlots.at(motor_ID)];
+        }
+
+        // Return cached feedback data (zeros until the first update)
+        std::lock_guard<std::mutex> lock(stateMutex);
         auto it = motorFeedback.find(motor_ID);
-        return it->second;
+        return it != motorFeedback.end() ? it->second : MotorFeedback{};
     }
 
     // Get all feedback for all initialized motors
-    std::map<int, MotorFeedback>& GetAllFeedback()
+    std::map<int, MotorFeedback> GetAllFeedback()
     {
+        if (updateThreadRunning.load())
+        {
+            std::lock_guard<std::mutex> lock(readerMutex);
+            const FeedbackSnapshot& snapshot = LatestSnapshot();
+            std::map<int, MotorFeedback> feedback;
+            if (snapshot.cycle > 0)
+            {
+                for (size_t slot = 0; slot < slotMotorIDs.size(); ++slot)
+                {
+                    feedback[slotMotorIDs[slot]] = snapshot.feedback[slot];
+                }
+            }
+            return feedback;
+        }
+        std::lock_guard<std::mutex> lock(stateMutex);
         return motorFeedback;
     }
 
+    // Batched SetMotorDutyCycle: n motor IDs and duty cycles, all validated before any is applied
+    void SetDutyCycles(const int* motor_IDs, const float* values, size_t n)
+    {
+        std::lock_guard<std::mutex> lock(stateMutex);
+        for (size_t i = 0; i < n; ++i)
+        {
+            RequireInitialized(motor_IDs[i]);
+            CheckDutyCycle(motor_IDs[i], values[i]);
+        }
+
+        bool threaded = updateThreadRunning.load();
+        for (size_t i = 0; i < n; ++i)
+        {
+            dutyCycles[motor_IDs[i]] = values[i];
+            if (threaded)
+            {
+                dutyCycleMailbox[motorSlots.at(motor_IDs[i])].store(values[i], std::memory_order_relaxed);
+            }
+        }
+    }
+
+    // Batched GetMotorFeedback: writes n rows of the 6 MotorFeedback fields into out
+    void GetFeedback(const int* motor_IDs, size_t n, float* out)
+    {
+        {
+            std::lock_guard<std::mutex> lock(stateMutex);
+            for (size_t i = 0; i < n; ++i)
+            {
+                RequireInitialized(motor_IDs[i]);
+            }
+        }
+
+        auto write = [out](size_t row, const MotorFeedback& fb) {
+            float* dst = out + row * 6;
+            dst[0] = fb.dutyCycle;
+            dst[1] = fb.velocity;
+            dst[2] = fb.position;
+            dst[3] = fb.current;
+            dst[4] = fb.temperature;
+            dst[5] = fb.voltage;
+        };
+
+        if (updateThreadRunning.load())
+        {
+            std::lock_guard<std::mutex> lock(readerMutex);
+            const FeedbackSnapshot& snapshot = LatestSnapshot();
+            for (size_t i = 0; i < n; ++i)
+            {
+                write(i, snapshot.feedback[motorSlots.at(motor_IDs[i])]);
+            }
+            return;
+        }
+
+        std::lock_guard<std::mutex> lock(stateMutex);
+        for (size_t i = 0; i < n; ++i)
+        {
+            auto it = motorFeedback.find(motor_IDs[i]);
+            write(i, it != motorFeedback.end() ? it->second : MotorFeedback{});
+        }
+    }
+
     // Zero the position for a motor — stores current raw tick as the new reference.
     // All subsequent position values in feedback will be relative to this point.
     void ResetMotorPosition(int motor_ID)
     {
-        if (connectedMotors.find(motor_ID) == connectedMotors.end())
+        {
+            std::lock_guard<std::mutex> lock(stateMutex);
+            RequireInitialized(motor_ID);
+        }
+        if (updateThreadRunning.load())
+        {
+            // Zero against the raw position of the latest snapshot; the thread applies it next cycle
+            std::lock_guard<std::mutex> lock(readerMutex);
+            size_t slot = motorSlots.at(motor_ID);
+            float rawPosition = LatestSnapshot().rawPositions[slot];
+            std::lock_guard<std::mutex> stateLock(stateMutex);
+            positionOffsets[motor_ID] = rawPosition;
+            positionOffsetMailbox[slot].store(rawPosition, std::memory_order_relaxed);
+            return;
+        }
+        float rawPosition;
+        {
+            std::lock_guard<std::mutex> busLock(busMutex); // initialize_motor(s) may be growing connectedMotors
+            rawPosition = connectedMotors.at(motor_ID).GetPosition();
+        }
+        std::lock_guard<std::mutex> lock(stateMutex);
+        positionOffsets[motor_ID] = rawPosition;
+    }
+
+    // Run Update() on a native thread at rate_hz. Python then only exchanges duty cycles and
+    // feedback through the mailbox and snapshots, so CAN I/O stays out of the Python loop.
+    void StartUpdateThread(double rate_hz)
+    {
+        if (rate_hz <= 0)
+        {
+            throw std::invalid_argument("Update thread rate must be positive.");
+        }
+        if (updateThreadRunning.load())
+        {
+            return;
+        }
+
+        std::lock_guard<std::mutex> busLock(busMutex); // Let a running update() finish first
+        std::lock_guard<std::mutex> stateLock(stateMutex);
+        size_t count = connectedMotors.size();
+        slotMotorIDs.clear();
+        motorSlots.clear();
+        dutyCycleMailbox.reset(new std::atomic<float>[count]);
+        positionOffsetMailbox.reset(new std::atomic<float>[count]);
+        for (const auto& pair : connectedMotors)
+        {
+            size_t slot = slotMotorIDs.size();
+            motorSlots[pair.first] = slot;
+            slotMotorIDs.push_back(pair.first);
+            auto command = dutyCycles.find(pair.first);
+            dutyCycleMailbox[slot].store(command != dutyCycles.end() ? command->second : 0.0f);
+            positionOffsetMailbox[slot].store(positionOffsets[pair.first]);
+        }
+        for (FeedbackSnapshot& snapshot : snapshots)
+        {
+            snapshot.feedback.assign(count, MotorFeedback{});
+            snapshot.rawPositions.assign(count, 0.0f);
+            snapshot.timestamps.assign(count, 0.0);
+            snapshot.cycle = 0;
+        }
+        backSnapshot = 0;
+        middleSnapshot.store(1);
+        frontSnapshot = 2;
+        {
+            std::lock_guard<std::mutex> lock(statsMutex);
+            threadStats = UpdateThreadStats{};
+            pendingError.clear();
+        }
+
+        auto period = std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::duration<double>(1.0 / rate_hz));
+        updateThreadRunning.store(true);
+        updateThread = std::thread(&MotorController::UpdateThreadLoop, this, period);
+    }
+
+    // Stop the update thread after one final pass, and keep serving its last feedback
+    void StopUpdateThread()
+    {
+        std::lock_guard<std::mutex> busLock(busMutex); // update() resumes only after the final pass
+        if (!updateThreadRunning.exchange(false))
+        {
+            return;
+        }
+        if (updateThread.joinable())
+        {
+            updateThread.join();
+        }
+        std::lock_guard<std::mutex> lock(readerMutex);
+        std::lock_guard<std::mutex> stateLock(stateMutex);
+        const FeedbackSnapshot& snapshot = LatestSnapshot();
+        for (size_t slot = 0; slot < slotMotorIDs.size() && snapshot.cycle > 0; ++slot)
+        {
+            StoreFeedback(slotMotorIDs[slot], snapshot.feedback[slot], snapshot.timestamps[slot]);
+        }
+    }
+
+    // Feedback table storage and its number of used rows, for get_feedback_view()
+    const FeedbackRecord* GetFeedbackTable() const
+    {
+        return feedbackTable.get();
+    }
+
+    size_t GetFeedbackRowCount() const
+    {
+        std::lock_guard<std::mutex> lock(stateMutex);
+        return feedbackRows.size();
+    }
+
+    // Row of a motor in the feedback table
+    size_t GetFeedbackRow(int motor_ID) const
+    {
+        std::lock_guard<std::mutex> lock(stateMutex);
+        auto it = feedbackRows.find(motor_ID);
+        if (it == feedbackRows.end())
         {
             throw std::runtime_error("Motor ID " + std::to_string(motor_ID) + " is not initialized.");
         }
-        positionOffsets[motor_ID] = connectedMotors.at(motor_ID).GetPosition();
+        return it->second;
+    }
+
+    bool IsUpdateThreadRunning() const
+    {
+        return updateThreadRunning.load();
+    }
+
+    UpdateThreadStats GetUpdateThreadStats()
+    {
+        RaisePendingError();
+        std::lock_guard<std::mutex> lock(statsMutex);
+        return threadStats;
     }
 
-    //Note: method very buggy
     // Read the configuration currently flashed on a SPARK MAX over CAN
     MotorConfig ReadMotorConfig(int motor_ID)
     {
-        if (connectedMotors.find(motor_ID) == connectedMotors.end())
+        ConfigReadback result = ReadMotorConfigs({motor_ID}, kConfigReadTimeoutS, kConfigReadRetries, kConfigReadsInFlight).front();
+        for (const std::string& name : result.missing)
         {
-            throw std::runtime_error("Motor ID " + std::to_string(motor_ID) + " is not initialized.");
+            std::cerr << "No response for parameter " << name << " of motor " << motor_ID << ", using default value." << std::endl;
         }
+        return result.config;
+    }
 
-        SparkMax& motor = connectedMotors.at(motor_ID);
-        MotorConfig config;
+    // Read the configuration of several motors at once. Requests are pipelined: up to maxInFlight
+    // are outstanding at a time (one per motor), responses are matched to requests by their
+    // arbitration ID (parameter + device), and a request without a response within timeout_s is
+    // sent again up to `retries` times before the parameter is reported as missing.
+    std::vector<ConfigReadback> ReadMotorConfigs(const std::vector<int>& motor_IDs, double timeout_s, int retries, size_t maxInFlight)
+    {
+        if (timeout_s <= 0 || maxInFlight == 0 || retries < 0)
+        {
+            throw std::invalid_argument("timeout_s and max_in_flight must be positive and retries not negative.");
+        }
+        if (motor_IDs.empty())
+        {
+            return {};
+        }
+        std::lock_guard<std::mutex> busLock(busMutex); // Also guards the connectedMotors lookups below
+        for (int motor_ID : motor_IDs)
+        {
+            if (connectedMotors.find(motor_ID) == connectedMotors.end())
+            {
+                throw std::runtime_error("Motor ID " + std::to_string(motor_ID) + " is not initialized.");
+            }
+        }
 
-        // Brief pause before each read so the SparkBase background thread can drain
-        // any pending periodic status frames from the shared CAN socket. Without this,
-        // ReadParameter's single read() call may pull a status frame instead of the
-        // parameter response, causing a random subset of reads to time out each run.
-        auto drain = []() {
-            std::this_thread::sleep_for(std::chrono::milliseconds(25));
+        using clock = std::chrono::steady_clock;
+        struct Request
+        {
+            size_t motor;
+            size_t param;
+            uint32_t arbId;
+            int attempts;
+            clock::time_point deadline;
         };
 
-        drain(); config.idleMode              = static_cast<IdleMode>(motor.GetIdleMode());
-        drain(); config.motorType             = static_cast<MotorType>(motor.GetMotorType());
-        drain(); config.sensorType            = static_cast<SensorType>(motor.GetSensorType());
-        drain(); config.rampRate              = motor.GetRampRate();
-        drain(); config.inverted              = motor.GetInverted();
-        drain(); config.motorKv               = static_cast<int>(motor.GetMotorKv());
-        drain(); config.encoderCountsPerRev   = static_cast<int>(motor.GetEncoderCountsPerRev());
-        drain(); config.smartCurrentFreeLimit  = static_cast<float>(motor.GetSmartCurrentFreeLimit());
-        drain(); config.smartCurrentStallLimit = static_cast<float>(motor.GetSmartCurrentStallLimit());
-        return config;
+        const size_t paramCount = sizeof(kConfigParameters) / sizeof(kConfigParameters[0]);
+        std::vector<ConfigReadback> results(motor_IDs.size());
+        std::vector<std::vector<bool>> received(motor_IDs.size(), std::vector<bool>(paramCount, false));
+        std::vector<bool> motorBusy(motor_IDs.size(), false);
+
+        // Parameter-major order, so consecutive requests go to different motors
+        std::deque<Request> queue;
+        for (size_t param = 0; param < paramCount; ++param)
+        {
+            for (size_t motor = 0; motor < motor_IDs.size(); ++motor)
+            {
+                queue.push_back({motor, param, ParameterArbId(motor_IDs[motor], kConfigParameters[param].id), 0, {}});
+            }
+        }
+        std::map<uint32_t, Request> inFlight;
+        auto timeout = std::chrono::duration_cast<clock::duration>(std::chrono::duration<double>(timeout_s));
+
+        ParameterSocket socket(canbus);
+        while (!queue.empty() || !inFlight.empty())
+        {
+            for (auto it = queue.begin(); it != queue.end() && inFlight.size() < maxInFlight;)
+            {
+                if (motorBusy[it->motor])
+                {
+                    ++it;
+                    continue;
+                }
+                if (!socket.SendRequest(it->arbId))
+                {
+                    break; // TX queue full, send the rest once responses have come back
+                }
+                it->attempts++;
+                it->deadline = clock::now() + timeout;
+                motorBusy[it->motor] = true;
+                inFlight[it->arbId] = *it;
+                it = queue.erase(it);
+            }
+
+            // Wait for responses until the earliest deadline (or briefly, if only TX queue space is missing)
+            auto next = clock::now() + std::chrono::milliseconds(1);
+            if (!inFlight.empty())
+            {
+                next = inFlight.begin()->second.deadline;
+                for (const auto& pair : inFlight)
+                {
+                    next = std::min(next, pair.second.deadline);
+                }
+            }
+            can_frame response;
+            if (socket.Receive(response, next))
+            {
+                auto it = inFlight.find(response.can_id & CAN_EFF_MASK);
+                double value;
+                if (it == inFlight.end() || !DecodeParameterResponse(response, value))
+                {
+                    continue; // Late response to a request that already timed out, or not a response
+                }
+                // Matched: go straight back to sending, the motor can take its next request
+                const Request& request = it->second;
+                ApplyConfigParameter(results[request.motor].config, kConfigParameters[request.param].id, value);
+                received[request.motor][request.param] = true;
+                motorBusy[request.motor] = false;
+                inFlight.erase(it);
+            }
+
+            auto now = clock::now();
+            for (auto it = inFlight.begin(); it != inFlight.end();)
+            {
+                if (now < it->second.deadline)
+                {
+                    ++it;
+                    continue;
+                }
+                motorBusy[it->second.motor] = false;
+                if (it->second.attempts <= retries)
+                {
+                    queue.push_front(it->second);
+                }
+                it = inFlight.erase(it);
+            }
+        }
+
+        for (size_t motor = 0; motor < motor_IDs.size(); ++motor)
+        {
+            results[motor].motorId = motor_IDs[motor];
+            for (size_t param = 0; param < paramCount; ++param)
+            {
+                if (!received[motor][param])
+                {
+                    results[motor].missing.push_back(kConfigParameters[param].name);
+                }
+            }
+        }
+        return results;
     }
 };
 
 
 // PYBIND11 BINDINGS
+using IntArray = py::array_t<int, py::array::c_style | py::array::forcecast>;
+using FloatArray = py::array_t<float, py::array::c_style | py::array::forcecast>;
+
 PYBIND11_MODULE(motor_controller, m) 
 {
     m.doc() = "Motor controller module for managing SPARK MAX motor controllers";
 
+    // Row type of get_feedback_view()
+    PYBIND11_NUMPY_DTYPE_EX(FeedbackRecord,
+                            motorId, "motor_id",
+                            dutyCycle, "duty_cycle",
+                            velocity, "velocity",
+                            position, "position",
+                            current, "current",
+                            temperature, "temperature",
+                            voltage, "voltage",
+                            timestamp, "timestamp");
+    m.attr("FEEDBACK_DTYPE") = py::dtype::of<FeedbackRecord>();
+
+    // Column order of get_feedback_array()
+    m.attr("FEEDBACK_FIELDS") = py::make_tuple("duty_cycle", "velocity", "position", "current", "temperature", "voltage");
+
     // Bind IdleMode enum
     py::enum_<IdleMode>(m, "IdleMode")
         .value("COAST", IdleMode::kCoast)
@@ -304,6 +1118,22 @@ PYBIND11_MODULE(motor_controller, m)
                    ", voltage=" + std::to_string(fb.voltage) + " V)";
         });
 
+    // Bind UpdateThreadStats structure
+    py::class_<UpdateThreadStats>(m, "UpdateThreadStats")
+        .def_readonly("cycles", &UpdateThreadStats::cycles)
+        .def_readonly("overruns", &UpdateThreadStats::overruns)
+        .def_readonly("last_cycle_us", &UpdateThreadStats::lastCycleUs)
+        .def_readonly("max_cycle_us", &UpdateThreadStats::maxCycleUs)
+        .def_readonly("errors", &UpdateThreadStats::errors)
+        .def_readonly("last_error", &UpdateThreadStats::lastError)
+        .def("__repr__", [](const UpdateThreadStats& s) {
+            return "UpdateThreadStats(cycles=" + std::to_string(s.cycles) +
+                   ", overruns=" + std::to_string(s.overruns) +
+                   ", last_cycle_us=" + std::to_string(s.lastCycleUs) +
+                   ", max_cycle_us=" + std::to_string(s.maxCycleUs) +
+                   ", errors=" + std::to_string(s.errors) + ")";
+        });
+
     // Bind MotorConfig structure
     py::class_<MotorConfig>(m, "MotorConfig")
         .def(py::init<>())
@@ -332,6 +1162,21 @@ PYBIND11_MODULE(motor_controller, m)
                    "A, smart_current_stall_limit=" + std::to_string(c.smartCurrentStallLimit) + "A)";
         });
 
+    // Bind ConfigReadback structure
+    py::class_<ConfigReadback>(m, "ConfigReadback")
+        .def_readonly("motor_id", &ConfigReadback::motorId)
+        .def_readonly("config", &ConfigReadback::config)
+        .def_readonly("missing", &ConfigReadback::missing)
+        .def_property_readonly("complete", [](const ConfigReadback& r) { return r.missing.empty(); })
+        .def("__repr__", [](const ConfigReadback& r) {
+            std::string missing;
+            for (const std::string& name : r.missing)
+            {
+                missing += (missing.empty() ? "'" : ", '") + name + "'";
+            }
+            return "ConfigReadback(motor_id=" + std::to_string(r.motorId) + ", missing=[" + missing + "])";
+        });
+
     // Bind MotorController class (singleton)
     py::class_<MotorController>(m, "MotorController")
         .def_static("get_instance", &MotorController::GetInstance,
@@ -341,11 +1186,17 @@ PYBIND11_MODULE(motor_controller, m)
         .def("get_canbus_name", &MotorController::GetCanBusName,
              "Get the CAN bus name this controller is using")
         .def("initialize_motor", &MotorController::InitializeMotor,
-             py::arg("motor_id"), py::arg("config"),
-             "Initialize a motor with custom configuration")
+             py::arg("motor_id"), py::arg("config"), py::arg("configure") = true,
+             py::call_guard<py::gil_scoped_release>(),
+             "Initialize a motor with custom configuration (configure=False keeps what is flashed on it)")
         .def("initialize_motors", &MotorController::InitializeMotors,
-             py::arg("motor_ids"), py::arg("config"),
-             "Initialize multiple motors with the same configuration")
+             py::arg("motor_ids"), py::arg("config"), py::arg("configure") = true,
+             py::call_guard<py::gil_scoped_release>(),
+             "Initialize multiple motors with the same configuration (configure=False keeps what is flashed on them)")
+        .def("configure_motor", &MotorController::ConfigureMotor,
+             py::arg("motor_id"), py::arg("config"),
+             py::call_guard<py::gil_scoped_release>(),
+             "Write a configuration to an initialized motor and burn it to flash")
         .def("get_motor_feedback", &MotorController::GetMotorFeedback,
              py::arg("motor_id"),
              "Get feedback for a single motor")
@@ -365,11 +1216,96 @@ PYBIND11_MODULE(motor_controller, m)
              py::arg("motor_id"),
              "Get the current duty cycle for a motor")
         .def("update", &MotorController::Update,
+             py::call_guard<py::gil_scoped_release>(),
              "Process all motors: send commands and collect feedback (call in main loop)")
+        .def("set_duty_cycles_array",
+             [](MotorController& self, IntArray motor_ids, FloatArray duty_cycles) {
+                 if (motor_ids.ndim() != 1 || duty_cycles.ndim() != 1 || motor_ids.size() != duty_cycles.size())
+                 {
+                     throw std::invalid_argument("motor_ids and duty_cycles must be 1-D arrays of the same length.");
+                 }
+                 self.SetDutyCycles(motor_ids.data(), duty_cycles.data(), motor_ids.size());
+             },
+             py::arg("motor_ids"), py::arg("duty_cycles"),
+             "Set duty cycles for many motors in one call (int32 ids, float32 duty cycles)")
+        .def("get_feedback_array",
+             [](MotorController& self, py::object motor_ids) {
+                 std::vector<int> all;
+                 const int* ids;
+                 size_t n;
+                 IntArray requested;
+                 if (motor_ids.is_none())
+                 {
+                     all = self.GetInitializedMotorIDs();
+                     ids = all.data();
+                     n = all.size();
+                 }
+                 else
+                 {
+                     requested = IntArray::ensure(motor_ids);
+                     if (!requested || requested.ndim() != 1)
+                     {
+                         throw std::invalid_argument("motor_ids must be a 1-D array of motor IDs.");
+                     }
+                     ids = requested.data();
+                     n = requested.size();
+                 }
+                 py::array_t<float> out({n, static_cast<size_t>(6)});
+                 self.GetFeedback(ids, n, out.mutable_data());
+                 return out;
+             },
+             py::arg("motor_ids") = py::none(),
+             "Feedback of many motors as an (n, 6) float32 array, columns in FEEDBACK_FIELDS order "
+             "(all initialized motors in ID order when motor_ids is None)")
+        .def("get_feedback_view",
+             [](py::object self) {
+                 const MotorController& controller = self.cast<const MotorController&>();
+                 size_t rows = controller.GetFeedbackRowCount();
+                 // No copy: the array points at the controller's table and keeps the controller alive
+                 py::array_t<FeedbackRecord> view({rows}, {sizeof(FeedbackRecord)}, controller.GetFeedbackTable(), self);
+                 view.attr("setflags")(py::arg("write") = false);
+                 return view;
+             },
+             "Read-only structured array (FEEDBACK_DTYPE) over the controller's feedback table, one row per "
+             "motor in initialization order. Rows are updated in place by update(); motors initialized "
+             "later are not in views taken earlier")
+        .def("get_feedback_row", &MotorController::GetFeedbackRow,
+             py::arg("motor_id"),
+             "Row of a motor in get_feedback_view()")
         .def("reset_motor_position", &MotorController::ResetMotorPosition,
              py::arg("motor_id"),
              "Zero the position counter for a motor (software offset — no hardware reset)")
         .def("read_motor_config", &MotorController::ReadMotorConfig,
              py::arg("motor_id"),
-             "Read the configuration currently flashed on the SPARK MAX over CAN");
+             py::call_guard<py::gil_scoped_release>(),
+             "Read the configuration currently flashed on the SPARK MAX over CAN")
+        .def("read_motor_configs",
+             [](MotorController& self, py::object motor_ids, double timeout_s, int retries, size_t max_in_flight) {
+                 std::vector<int> ids = motor_ids.is_none() ? self.GetInitializedMotorIDs() : motor_ids.cast<std::vector<int>>();
+                 std::vector<ConfigReadback> results;
+                 {
+                     py::gil_scoped_release release;
+                     results = self.ReadMotorConfigs(ids, timeout_s, retries, max_in_flight);
+                 }
+                 py::dict out;
+                 for (const ConfigReadback& result : results)
+                 {
+                     out[py::int_(result.motorId)] = result;
+                 }
+                 return out;
+             },
+             py::arg("motor_ids") = py::none(), py::arg("timeout_s") = kConfigReadTimeoutS,
+             py::arg("retries") = kConfigReadRetries, py::arg("max_in_flight") = kConfigReadsInFlight,
+             "Read the flashed configuration of many motors (all initialized motors when motor_ids is None) "
+             "with pipelined requests. Returns {motor_id: ConfigReadback}")
+        .def("start_update_thread", &MotorController::StartUpdateThread,
+             py::arg("rate_hz"),
+             "Run update() on a background thread at rate_hz (motors must be initialized first)")
+        .def("stop_update_thread", &MotorController::StopUpdateThread,
+             py::call_guard<py::gil_scoped_release>(),
+             "Stop the background update thread after one final pass")
+        .def("is_update_thread_running", &MotorController::IsUpdateThreadRunning,
+             "Whether the background update thread is running")
+        .def("get_update_thread_stats", &MotorController::GetUpdateThreadStats,
+             "Cycle count, overruns and cycle times of the background update thread");
 }
@@ -0,0 +1,288 @@
+"""
+Wire protocol shared by the robot Server and the mission control Client.
+
+Two wire formats are supported:
+    json   - one JSON object per line (the original protocol, kept as a fallback)
+    binary - length-prefixed frames with fixed struct layouts for the hot message types
+
+The format is negotiated when the client connects:
+    client -> {"type": "hello", "formats": ["binary", "json"]}\n
+    server -> {"type": "hello", "format": "binary"}\n
+A server that never sees a hello (old client) stays on JSON, and a client that
+gets no hello back (old server) falls back to JSON as well.
+
+Joystick axis state can also travel over UDP. The client asks for it with
+"udp": true in its hello and the server answers with the "udp_port" to send to.
+Each datagram carries a sequence number so the robot keeps only the newest sample.
+
+Telemetry is sent as one batch frame per control tick. Every sample in a batch
+is a (topic, data) pair and gets a sequence number, and the client answers with a
+single SACK (cumulative sequence plus selectively received ranges) covering many
+batches at once. The client picks topics with "subscribe"/"unsubscribe" messages.
+
+Binary frame layout (network byte order):
+    uint16 payload length | uint8 message code | message body
+"""
+
+import json
+import struct
+from library import telemetry_codec
+
+FORMAT_JSON = "json"
+FORMAT_BINARY = "binary"
+SUPPORTED_FORMATS = [FORMAT_BINARY, FORMAT_JSON]
+
+HANDSHAKE_TIMEOUT = 2.0 # seconds the client waits for the server hello
+
+# Message codes
+MSG_ACK = 1
+MSG_AXES = 2
+MSG_BUTTON = 3
+MSG_TEXT = 4
+MSG_MOTOR_TELEMETRY = 5
+MSG_JSON = 6
+MSG_AXIS_DATAGRAM = 7
+MSG_TELEMETRY_BATCH = 8
+MSG_SACK = 9
+MSG_MOTOR_COLUMNS = 10 # Keyframe/delta encoded motor rows, see telemetry_codec
+
+# Lookup tables for the enum-like string fields in controller commands
+MODES = [None, "TELEOP", "AUTO"]
+BUTTONS = ["A", "B", "X", "Y", "LB", "RB", "DPAD_UP", "DPAD_DOWN", "DPAD_LEFT", "DPAD_RIGHT"]
+ACTIONS = ["RELEASED", "PRESSED"]
+
+# Order of the values in one motor telemetry row: (motor_id, *MOTOR_FIELDS)
+MOTOR_FIELDS = ["duty_cycle", "velocity", "position", "current", "temperature", "voltage"]
+
+_HEADER = struct.Struct("!HB")       # payload length, message code
+_ID = struct.Struct("!i")            # message id
+_AXES = struct.Struct("!iB6f")       # id, mode, x, y, yaw_rate, pitch_rate, lt, rt
+_BUTTON = struct.Struct("!iBBB")     # id, mode, button, action
+_TELEMETRY = struct.Struct("!iB")    # id, motor count
+_MOTOR_ROW = struct.Struct("!B6f")   # motor_id, duty_cycle ... voltage
+_AXIS_DATAGRAM = struct.Struct("!BIB6f") # message code, sequence, mode, x, y, yaw_rate, pitch_rate, lt, rt
+_BATCH = struct.Struct("!iIIH")      # frame id, base sequence, first sequence, sample count
+_SAMPLE = struct.Struct("!BHB")      # sample encoding, sample length, topic length
+_ROW_COUNT = struct.Struct("!B")     # motor count
+_SACK = struct.Struct("!iB")         # cumulative sequence, range count
+_RANGE = struct.Struct("!II")        # first, last sequence of a received range
+
+_MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+_BUTTON_CODES = {button: code for code, button in enumerate(BUTTONS)}
+_ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+FRAME_HEADER_SIZE = _HEADER.size
+MAX_PAYLOAD = 0xFFFF
+SEQ_MODULUS = 1 << 32
+
+
+def hello_request(udp=True):
+    return {"type": "hello", "formats": SUPPORTED_FORMATS, "udp": udp}
+
+def choose_format(hello):
+    """Pick the wire format for a client hello, preferring binary."""
+    offered = hello.get('formats') or []
+    for fmt in SUPPORTED_FORMATS:
+        if fmt in offered:
+            return fmt
+    return FORMAT_JSON
+
+def hello_reply(fmt, udp_port=None):
+    reply = {"type": "hello", "format": fmt}
+    if udp_port is not None:
+        reply["udp_port"] = udp_port
+    return reply
+
+def encode_line(msg):
+    return (json.dumps(msg) + '\n').encode('utf-8')
+
+class MalformedMessage(ValueError):
+    """A complete line or frame that could not be decoded (unknown code, bad body). The
+    stream is still in sync, so receivers log it and read on."""
+
+# What decoding a line or frame body raises on bad input (JSON and Unicode errors are ValueErrors)
+DECODE_ERRORS = (ValueError, TypeError, KeyError, IndexError, struct.error)
+
+def decode_line(raw):
+    try:
+        msg = json.loads(raw)
+    except DECODE_ERRORS as e:
+        raise MalformedMessage(f"Bad JSON message: {e}") from e
+    if not isinstance(msg, dict):
+        raise MalformedMessage(f"Expected a JSON object, got {type(msg).__name__}")
+    return msg
+
+def parse_header(header):
+    """Returns (body length, message code) for a FRAME_HEADER_SIZE byte frame header."""
+    length, code = _HEADER.unpack(header)
+    return length - 1, code
+
+def is_motor_rows(data):
+    """True if data is a list of (motor_id, duty_cycle, velocity, position, current, temperature, voltage) rows."""
+    if not isinstance(data, (list, tuple)) or not data or len(data) > 255:
+        return False
+    for row in data:
+        if not isinstance(row, (list, tuple)) or len(row) != 1 + len(MOTOR_FIELDS):
+            return False
+        if not isinstance(row[0], int) or not 0 <= row[0] <= 255:
+            return False
+    return True
+
+def _is_axes(data):
+    return (isinstance(data, (list, tuple)) and len(data) == 7 and data[0] in _MODE_CODES
+            and all(isinstance(v, (int, float)) for v in data[1:]))
+
+def _is_button(data):
+    return (isinstance(data, (list, tuple)) and len(data) == 3 and data[0] in _MODE_CODES
+            and data[1] in _BUTTON_CODES and data[2] in _ACTION_CODES)
+
+def _encode_body(msg):
+    msg_type = msg.get('type')
+    msg_id = msg.get('id')
+    data = msg.get('data')
+
+    if msg_type == 'ack':
+        return MSG_ACK, _ID.pack(msg_id)
+    if msg_type == 'command':
+        if _is_axes(data):
+            return MSG_AXES, _AXES.pack(msg_id, _MODE_CODES[data[0]], *data[1:])
+        if _is_button(data):
+            return MSG_BUTTON, _BUTTON.pack(msg_id, _MODE_CODES[data[0]], _BUTTON_CODES[data[1]], _ACTION_CODES[data[2]])
+        if isinstance(data, str):
+            return MSG_TEXT, _ID.pack(msg_id) + data.encode('utf-8')
+    if msg_type == 'telemetry' and is_motor_rows(data):
+        return MSG_MOTOR_TELEMETRY, _TELEMETRY.pack(msg_id, len(data)) + _encode_motor_rows(data)
+    if msg_type == 'telemetry_batch':
+        body = bytearray(_BATCH.pack(msg_id, msg['base'], msg['seq'], len(data)))
+        for topic, sample in data:
+            topic_bytes = (topic or '').encode('utf-8')
+            if isinstance(sample, telemetry_codec.EncodedMotorFrame):
+                code, sample_body = MSG_MOTOR_COLUMNS, sample
+            elif is_motor_rows(sample):
+                code, sample_body = MSG_MOTOR_TELEMETRY, _ROW_COUNT.pack(len(sample)) + _encode_motor_rows(sample)
+            else:
+                code, sample_body = MSG_JSON, json.dumps(sample).encode('utf-8')
+            body += _SAMPLE.pack(code, len(sample_body), len(topic_bytes)) + topic_bytes + sample_body
+        return MSG_TELEMETRY_BATCH, bytes(body)
+    if msg_type == 'sack':
+        ranges = msg['ranges']
+        body = _SACK.pack(msg['cum'], len(ranges)) + b''.join(_RANGE.pack(*r) for r in ranges)
+        return MSG_SACK, body
+
+    # Anything without a fixed layout travels as JSON inside a binary frame
+    return MSG_JSON, json.dumps(msg).encode('utf-8')
+
+def _encode_motor_rows(rows):
+    return b''.join(_MOTOR_ROW.pack(*row) for row in rows)
+
+def _decode_motor_rows(body, offset, count):
+    return [_MOTOR_ROW.unpack_from(body, offset + i * _MOTOR_ROW.size) for i in range(count)]
+
+def encode_frame(msg):
+    code, body = _encode_body(msg)
+    if len(body) + 1 > MAX_PAYLOAD:
+        raise ValueError(f"Message too large for a binary frame ({len(body)} bytes)")
+    return _HEADER.pack(len(body) + 1, code) + body
+
+def decode_body(code, body):
+    try:
+        return _decode_body(code, body)
+    except MalformedMessage:
+        raise
+    except DECODE_ERRORS as e:
+        raise MalformedMessage(f"Bad frame with code {code} ({len(body)} bytes): {type(e).__name__}: {e}") from e
+
+def _decode_body(code, body):
+    if code == MSG_ACK:
+        (msg_id,) = _ID.unpack(body)
+        return {"type": "ack", "id": msg_id}
+    if code == MSG_AXES:
+        msg_id, mode, *axes = _AXES.unpack(body)
+        return {"type": "command", "id": msg_id, "data": (MODES[mode], *axes)}
+    if code == MSG_BUTTON:
+        msg_id, mode, button, action = _BUTTON.unpack(body)
+        return {"type": "command", "id": msg_id, "data": (MODES[mode], BUTTONS[button], ACTIONS[action])}
+    if code == MSG_TEXT:
+        (msg_id,) = _ID.unpack_from(body)
+        return {"type": "command", "id": msg_id, "data": body[_ID.size:].decode('utf-8')}
+    if code == MSG_MOTOR_TELEMETRY:
+        msg_id, count = _TELEMETRY.unpack_from(body)
+        return {"type": "telemetry", "id": msg_id, "data": _decode_motor_rows(body, _TELEMETRY.size, count)}
+    if code == MSG_TELEMETRY_BATCH:
+        msg_id, base, seq, count = _BATCH.unpack_from(body)
+        offset = _BATCH.size
+        samples = []
+        for _ in range(count):
+            sample_code, length, topic_length = _SAMPLE.unpack_from(body, offset)
+            offset += _SAMPLE.size
+            topic = body[offset:offset + topic_length].decode('utf-8') or None
+            offset += topic_length
+            if sample_code == MSG_MOTOR_COLUMNS:
+                sample = telemetry_codec.EncodedMotorFrame(body[offset:offset + length])
+            elif sample_code == MSG_MOTOR_TELEMETRY:
+                (rows,) = _ROW_COUNT.unpack_from(body, offset)
+                sample = _decode_motor_rows(body, offset + _ROW_COUNT.size, rows)
+            else:
+                sample = json.loads(body[offset:offset + length])
+            samples.append((topic, sample))
+            offset += length
+        return {"type": "telemetry_batch", "id": msg_id, "base": base, "seq": seq, "data": samples}
+    if code == MSG_SACK:
+        cum, count = _SACK.unpack_from(body)
+        ranges = [list(_RANGE.unpack_from(body, _SACK.size + i * _RANGE.size)) for i in range(count)]
+        return {"type": "sack", "cum": cum, "ranges": ranges}
+    if code == MSG_JSON:
+        return decode_line(body)
+    raise MalformedMessage(f"Unknown message code {code}")
+
+def read_message(stream, fmt):
+    """
+    Read one message from a binary file object (socket.makefile('rb')).
+    Returns None when the connection is closed. A line or frame that can't be decoded
+    (e.g. a message type from a newer peer) is consumed whole and raises MalformedMessage.
+    """
+    if fmt == FORMAT_BINARY:
+        header = stream.read(FRAME_HEADER_SIZE)
+        if len(header) < FRAME_HEADER_SIZE:
+            return None
+        length, code = parse_header(header)
+        body = stream.read(length)
+        if len(body) < length:
+            return None
+        return decode_body(code, body)
+
+    while True:
+        raw = stream.readline()
+        if not raw:
+            return None
+        raw = raw.strip()
+        if raw: # Skip empty lines
+            return decode_line(raw)
+
+def encode_message(msg, fmt):
+    if fmt == FORMAT_BINARY:
+        return encode_frame(msg)
+    return encode_line(msg)
+
+# What encode_message raises for a message that can't be sent (too large, a field of
+# the wrong type). Senders drop that one message and keep the link up.
+ENCODE_ERRORS = (ValueError, TypeError, KeyError, struct.error)
+
+def encode_axis_datagram(seq, data):
+    return _AXIS_DATAGRAM.pack(MSG_AXIS_DATAGRAM, seq % SEQ_MODULUS, _MODE_CODES[data[0]], *data[1:])
+
+def decode_axis_datagram(datagram):
+    """Returns (seq, axis command) or None if the datagram is not a valid axis sample."""
+    if len(datagram) != _AXIS_DATAGRAM.size or datagram[0] != MSG_AXIS_DATAGRAM:
+        return None
+    _, seq, mode, *axes = _AXIS_DATAGRAM.unpack(datagram)
+    if mode >= len(MODES):
+        return None
+    return seq, (MODES[mode], *axes)
+
+def seq_newer(seq, last_seq):
+    """Wrap-safe check that seq comes after last_seq (None means nothing seen yet)."""
+    if last_seq is None:
+        return True
+    diff = (seq - last_seq) % SEQ_MODULUS
+    return 0 < diff < SEQ_MODULUS // 2
@@ -0,0 +1,180 @@
+import ctypes
+import ctypes.util
+import gc
+import os
+import resource
+import threading
+import time
+
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+
+
+class RealtimeProfile:
+    """
+    Opt-in real-time settings for the control thread.
+
+    Applied from the control thread once the server threads are running:
+      - SCHED_FIFO at fifo_priority for the control thread, or a nice value if FIFO isn't permitted
+      - control thread pinned to control_cpus, every other thread of the process to network_cpus
+        (threads started later inherit the affinity of the thread that starts them)
+      - mlockall(MCL_CURRENT | MCL_FUTURE) when RLIMIT_MEMLOCK allows it
+      - gc.freeze() plus disabling automatic collection; collect_in_slack() then runs
+        collections only when the loop has idle time before its next deadline
+
+    Every step fails soft: anything not permitted (no root/CAP_SYS_NICE, fewer CPUs,
+    low memlock limit) is skipped and recorded, and report() lists what was achieved.
+
+    Usage:
+        rt = RealtimeProfile(fifo_priority=40, control_cpus={3}, network_cpus={0, 1, 2}, freeze_gc=True)
+        rt.apply()
+        print(rt.report())
+        while running:
+            scheduler.wait()
+            run_tick()
+            rt.collect_in_slack(scheduler.time_until_deadline())
+    """
+
+    # Minimum idle time before the next tick to run a collection of each generation
+    MIN_SLACK_S = (0.001, 0.002, 0.005)
+    FORCE_FACTOR = 10 # Collect anyway once a generation is this far past its threshold, so memory stays bounded
+
+    def __init__(self, fifo_priority=None, nice=None, control_cpus=None, network_cpus=None,
+                 lock_memory=False, freeze_gc=False, name="Realtime"):
+        self.fifo_priority = fifo_priority
+        self.nice = nice
+        self.control_cpus = set(control_cpus) if control_cpus else None
+        self.network_cpus = set(network_cpus) if network_cpus else None
+        self.lock_memory = lock_memory
+        self.freeze_gc = freeze_gc
+        self.name = name
+        self.achieved = {} # setting -> what happened, for report()
+        self.gc_managed = False
+        self._thresholds = gc.get_threshold()
+
+        # GC statistics
+        self.collections = [0, 0, 0]
+        self.last_duration_s = [0.0, 0.0, 0.0] # Last collection time per generation, to predict the next
+        self.forced_collections = 0
+        self.gc_time_s = 0.0
+        self.gc_max_s = 0.0
+
+    def apply(self):
+        """Apply every requested setting to the calling (control) thread. Returns self."""
+        if self.control_cpus or self.network_cpus:
+            self.achieved["affinity"] = self._apply_affinity()
+        if self.fifo_priority is not None or self.nice is not None:
+            self.achieved["priority"] = self._apply_priority()
+        if self.lock_memory:
+            self.achieved["mlockall"] = self._apply_mlockall()
+        if self.freeze_gc:
+            self.achieved["gc"] = self._apply_gc()
+        return self
+
+    def _apply_affinity(self):
+        if not hasattr(os, "sched_setaffinity"):
+            return "unsupported on this platform"
+        try:
+            available = os.sched_getaffinity(0)
+            control = (self.control_cpus or available) & available
+            network = (self.network_cpus or available) & available
+            if not control or not network:
+                return f"skipped, only CPUs {sorted(available)} available"
+
+            own = threading.get_native_id()
+            others = 0
+            if self.network_cpus:
+                for tid in os.listdir("/proc/self/task"):
+                    if int(tid) != own:
+                        try:
+                            os.sched_setaffinity(int(tid), network)
+                            others += 1
+                        except ProcessLookupError:
+                            pass # Thread exited meanwhile
+            os.sched_setaffinity(0, control)
+            return f"control on CPUs {sorted(control)}, {others} other threads on CPUs {sorted(network)}"
+        except OSError as e:
+            return f"failed: {e}"
+
+    def _apply_priority(self):
+        if self.fifo_priority is not None and hasattr(os, "sched_setscheduler"):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.fifo_priority))
+                return f"SCHED_FIFO priority {self.fifo_priority}"
+            except OSError as e:
+                fifo_error = e.strerror
+        else:
+            fifo_error = "not requested"
+        if self.nice is None:
+            return f"default scheduling (SCHED_FIFO: {fifo_error})"
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+            return f"nice {self.nice} (SCHED_FIFO: {fifo_error})"
+        except OSError as e:
+            return f"default scheduling (SCHED_FIFO: {fifo_error}, nice {self.nice}: {e.strerror})"
+
+    def _apply_mlockall(self):
+        # With MCL_FUTURE a limit that's too small makes later allocations fail, so only
+        # lock when the limit can't be hit
+        soft, _ = resource.getrlimit(resource.RLIMIT_MEMLOCK)
+        if soft != resource.RLIM_INFINITY and os.geteuid() != 0:
+            return f"skipped, RLIMIT_MEMLOCK is {soft // 1024} KiB (needs root or 'ulimit -l unlimited')"
+        path = ctypes.util.find_library("c")
+        if path is None:
+            return "unsupported, libc not found"
+        libc = ctypes.CDLL(path, use_errno=True)
+        if libc.mlockall(_MCL_CURRENT | _MCL_FUTURE) != 0:
+            return f"failed: {os.strerror(ctypes.get_errno())}"
+        return "all current and future pages locked"
+
+    def _apply_gc(self):
+        gc.collect()
+        gc.freeze() # Startup objects move to the permanent generation and are never scanned again
+        gc.disable()
+        self.gc_managed = True
+        return f"{gc.get_freeze_count()} objects frozen, collections moved to idle slack"
+
+    def collect_in_slack(self, slack_s):
+        """Run a due GC collection if it fits in slack_s. Returns the time spent collecting."""
+        if not self.gc_managed:
+            return 0.0
+        counts = gc.get_count()
+        generation = None
+        for gen in (2, 1, 0):
+            needed = max(self.MIN_SLACK_S[gen], 1.5 * self.last_duration_s[gen])
+            if counts[gen] >= self._thresholds[gen] and slack_s >= needed:
+                generation = gen
+                break
+        if generation is None:
+            overdue = [gen for gen in (2, 1, 0) if counts[gen] >= self.FORCE_FACTOR * self._thresholds[gen]]
+            if not overdue:
+                return 0.0
+            generation = overdue[0] # No slack for too long, collect anyway
+            self.forced_collections += 1
+
+        start = time.perf_counter()
+        gc.collect(generation)
+        elapsed = time.perf_counter() - start
+        self.last_duration_s[generation] = elapsed
+        self.collections[generation] += 1
+        self.gc_time_s += elapsed
+        if elapsed > self.gc_max_s:
+            self.gc_max_s = elapsed
+        return elapsed
+
+    def release(self):
+        """Hand garbage collection back to the interpreter (e.g. at shutdown)."""
+        if self.gc_managed:
+            self.gc_managed = False
+            gc.unfreeze()
+            gc.enable()
+
+    def report(self):
+        lines = [f"[{self.name}] {setting}: {result}" for setting, result in self.achieved.items()]
+        if not lines:
+            lines.append(f"[{self.name}] No real-time settings requested")
+        if self.freeze_gc:
+            lines.append(f"[{self.name}] GC in slack: {self.collections[0]}/{self.collections[1]}/{self.collections[2]} "
+                         f"gen0/1/2 collections, {self.forced_collections} forced, "
+                         f"{self.gc_time_s * 1000:.1f} ms total, {self.gc_max_s * 1000:.2f} ms max")
+        return "\n".join(lines)
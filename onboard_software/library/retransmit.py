@@ -0,0 +1,197 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+
+class RetransmitScheduler:
+    """
+    Tracks messages waiting for an ACK and decides when to resend them.
+
+    Usage:
+        scheduler = RetransmitScheduler(base_timeout=0.5)
+        for msg in scheduler.track(msg):        # messages allowed on the wire now
+            output_queue.put(msg)
+        for msg in scheduler.ack(msg_id):       # backlog released by the ACK
+            output_queue.put(msg)
+        for msg in scheduler.due():             # overdue messages to resend
+            output_queue.put(msg)
+
+    Deadlines live in a min-heap so each check only touches overdue entries.
+    Every resend doubles the timeout (up to max_timeout) and a message is given up
+    after max_retries resends. At most max_in_flight messages are unacknowledged at
+    once; extra reliable messages wait in a backlog, extra droppable ones (telemetry)
+    are discarded. Droppable messages are also discarded instead of resent once they
+    are older than max_age, since newer samples have replaced them by then.
+
+    All methods are thread-safe.
+    """
+
+    def __init__(self, base_timeout=0.5, max_timeout=4.0, backoff=2.0, max_retries=8,
+                 max_in_flight=64, max_age=1.0, name="Retransmit"):
+        self.base_timeout = base_timeout
+        self.max_timeout = max_timeout
+        self.backoff = backoff
+        self.max_retries = max_retries
+        self.max_in_flight = max_in_flight
+        self.max_age = max_age
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._heap = []          # (deadline, order, msg_id, attempt)
+        self._in_flight = {}     # msg_id -> [msg, first_sent, attempt, droppable]
+        self._backlog = deque()  # reliable messages waiting for window space
+        self._order = itertools.count()
+
+        # Counters for diagnostics
+        self.resent = 0
+        self.dropped = 0
+        self.given_up = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._in_flight) + len(self._backlog)
+
+    def __contains__(self, msg_id):
+        with self._lock:
+            return msg_id in self._in_flight
+
+    def _schedule(self, msg_id, attempt, now):
+        timeout = min(self.base_timeout * (self.backoff ** attempt), self.max_timeout)
+        heapq.heappush(self._heap, (now + timeout, next(self._order), msg_id, attempt))
+
+    def _admit(self, msg, droppable, now):
+        self._in_flight[msg['id']] = [msg, now, 0, droppable]
+        self._schedule(msg['id'], 0, now)
+
+    def track(self, msg, droppable=False, now=None):
+        """Register a message that expects an ACK. Returns the messages to send now."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if len(self._in_flight) < self.max_in_flight:
+                self._admit(msg, droppable, now)
+                return [msg]
+            if droppable:
+                self.dropped += 1
+                return []
+            self._backlog.append(msg)
+            return []
+
+    def ack(self, msg_id, now=None):
+        """Mark a message acknowledged. Returns backlog messages that can now be sent."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._in_flight.pop(msg_id, None) is None:
+                return []
+            return self._release(now)
+
+    def _release(self, now):
+        released = []
+        while self._backlog and len(self._in_flight) < self.max_in_flight:
+            msg = self._backlog.popleft()
+            self._admit(msg, False, now)
+            released.append(msg)
+        return released
+
+    def ack_many(self, msg_ids, now=None):
+        """Acknowledge several messages at once (cumulative/selective ACKs)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for msg_id in msg_ids:
+                self._in_flight.pop(msg_id, None)
+            return self._release(now)
+
+    def due(self, now=None):
+        """Pop every overdue message and return the ones that should be resent."""
+        now = time.monotonic() if now is None else now
+        to_resend = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, msg_id, attempt = heapq.heappop(self._heap)
+                entry = self._in_flight.get(msg_id)
+                if entry is None or entry[2] != attempt:
+                    continue  # Already acknowledged or rescheduled
+                msg, first_sent, _, droppable = entry
+
+                if droppable and now - first_sent > self.max_age:
+                    del self._in_flight[msg_id]
+                    self.dropped += 1
+                    continue
+                if attempt >= self.max_retries:
+                    del self._in_flight[msg_id]
+                    self.given_up += 1
+                    print(f"[{self.name}] Giving up on message {msg_id} after {attempt} resends")
+                    continue
+
+                entry[2] = attempt + 1
+                self._schedule(msg_id, attempt + 1, now)
+                to_resend.append(msg)
+
+            self.resent += len(to_resend)
+            to_resend.extend(self._release(now))
+        return to_resend
+
+    def time_until_next(self, now=None, default=0.5):
+        """Seconds until the earliest deadline (default if nothing is pending)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self._heap:
+                return default
+            return max(0.0, self._heap[0][0] - now)
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+            self._in_flight.clear()
+            self._backlog.clear()
+
+
+class SackTracker:
+    """
+    Receiver side of cumulative + selective acknowledgement over sequence numbers.
+
+    cum is the highest sequence below which everything has arrived; ranges holds
+    the [first, last] blocks received beyond the first gap. The sender's base
+    (oldest sequence it still retransmits) lets cum skip gaps the sender gave up on.
+    """
+
+    MAX_RANGES = 8 # Only the newest ranges are reported, like TCP SACK blocks
+
+    def __init__(self):
+        self.cum = -1
+        self._ranges = []
+
+    def add(self, first, last, base=None):
+        """Record [first, last] as received. Returns False if it was all seen before."""
+        if base is not None and base - 1 > self.cum:
+            self.cum = base - 1
+        new = last > self.cum and not any(r[0] <= first and last <= r[1] for r in self._ranges)
+        if new:
+            self._ranges.append([max(first, self.cum + 1), last])
+            self._ranges.sort()
+        self._collapse()
+        return new
+
+    def _collapse(self):
+        merged = []
+        for first, last in self._ranges:
+            if last <= self.cum:
+                continue
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last])
+        while merged and merged[0][0] <= self.cum + 1:
+            self.cum = max(self.cum, merged.pop(0)[1])
+        self._ranges = merged
+
+    def ranges(self):
+        return [list(r) for r in self._ranges[-self.MAX_RANGES:]]
+
+
+def sack_covers(cum, ranges, first, last):
+    """True if a SACK (cum, ranges) acknowledges every sequence in [first, last]."""
+    if last <= cum:
+        return True
+    return any(r[0] <= first and last <= r[1] for r in ranges)
@@ -0,0 +1,522 @@
+"""
+Simulated stand-in for the compiled motor_controller module.
+
+Same API as the pybind module (MotorController singleton, MotorConfig,
+MotorFeedback and the IdleMode/MotorType/SensorType enums), but the motors are
+modelled in Python instead of being driven over CAN, so the robot stack can run
+on any machine. library/motor_backend.py picks this module or the real one.
+
+Model, per motor, advanced on every update():
+    - applied voltage = duty cycle (after the ramp rate) * bus voltage
+    - speed follows kv * applied voltage with a first-order lag; with zero output
+      it decays faster in brake mode than in coast mode
+    - current = (applied voltage - back EMF) / winding resistance, clamped to the
+      smart current limit (stall limit at 0 RPM, free limit at free speed), which
+      in turn caps the effective voltage and the acceleration
+    - temperature rises with I^2 R and cools towards ambient
+    - bus voltage sags with the total current
+    - output is cut when update() (the heartbeat) stops for HEARTBEAT_TIMEOUT_S
+    - inversion flips the physical direction; like a SPARK MAX the reported
+      velocity and position stay in the commanded direction
+
+CAN effects are configurable: commands reach the motor can_latency_s after
+update() sends them, feedback is can_latency_s old, and update_cost_s of busy
+time per motor stands in for the blocking CAN transactions of the real Update().
+
+get_feedback_view() is a read-only structured array over a preallocated table
+with the native module's layout (FEEDBACK_DTYPE), rewritten in place by update().
+
+start_update_thread() mirrors the native background update thread with a Python
+thread, so the threaded code path can be exercised too (its timing is of course
+still subject to the GIL).
+"""
+
+import enum
+import math
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+HEARTBEAT_TIMEOUT_S = 0.1
+MAX_STEP_S = 0.002 # Integration step
+IDLE_STEP_S = 0.05 # Integration step while the heartbeat has timed out
+MAX_MOTORS = 64 # Rows of the feedback table
+
+# Tunables, overridden from robot_params.SimConfig by library/motor_backend.py
+settings = {
+    "can_latency_s": 0.0,
+    "update_cost_s": 0.0,
+    "bus_voltage": 12.6,
+    "battery_resistance": 0.02,    # Ohm
+    "winding_resistance": 0.11,    # Ohm, NEO-like
+    "time_constant_s": 0.08,       # Mechanical time constant under power
+    "brake_time_constant_s": 0.05,
+    "coast_time_constant_s": 0.6,
+    "thermal_time_constant_s": 120.0,
+    "thermal_resistance": 1.5,     # degC per W
+    "ambient_temperature": 25.0,
+}
+
+
+class IdleMode(enum.IntEnum):
+    COAST = 0
+    BRAKE = 1
+
+
+class MotorType(enum.IntEnum):
+    BRUSHED = 0
+    BRUSHLESS = 1
+
+
+class SensorType(enum.IntEnum):
+    NO_SENSOR = 0
+    HALL_SENSOR = 1
+
+
+# Column order of get_feedback_array()
+FEEDBACK_FIELDS = ("duty_cycle", "velocity", "position", "current", "temperature", "voltage")
+
+# Configuration "flashed" on each simulated SPARK MAX; survives re-creating the controller, not the process
+_flash = {}
+
+# Row type of get_feedback_view(), same layout as the native FeedbackRecord
+FEEDBACK_DTYPE = np.dtype({
+    "names": ["motor_id", "duty_cycle", "velocity", "position", "current", "temperature", "voltage", "timestamp"],
+    "formats": ["<i4", "<f4", "<f4", "<f4", "<f4", "<f4", "<f4", "<f8"],
+    "offsets": [0, 4, 8, 12, 16, 20, 24, 32],
+    "itemsize": 40,
+})
+
+# pybind's export_values() also puts the enum values at module level
+COAST, BRAKE = IdleMode.COAST, IdleMode.BRAKE
+BRUSHED, BRUSHLESS = MotorType.BRUSHED, MotorType.BRUSHLESS
+NO_SENSOR, HALL_SENSOR = SensorType.NO_SENSOR, SensorType.HALL_SENSOR
+
+
+class MotorFeedback:
+    __slots__ = ("duty_cycle", "velocity", "position", "current", "temperature", "voltage")
+
+    def __init__(self, duty_cycle=0.0, velocity=0.0, position=0.0, current=0.0, temperature=0.0, voltage=0.0):
+        self.duty_cycle = duty_cycle
+        self.velocity = velocity
+        self.position = position
+        self.current = current
+        self.temperature = temperature
+        self.voltage = voltage
+
+    def __repr__(self):
+        return (f"MotorFeedback(duty_cycle={self.duty_cycle:f}, velocity={self.velocity:f} RPM, "
+                f"position={self.position:f} ticks, current={self.current:f} A, "
+                f"temperature={self.temperature:f} C, voltage={self.voltage:f} V)")
+
+
+class UpdateThreadStats:
+    __slots__ = ("cycles", "overruns", "last_cycle_us", "max_cycle_us", "errors", "last_error")
+
+    def __init__(self):
+        self.cycles = 0
+        self.overruns = 0
+        self.last_cycle_us = 0.0
+        self.max_cycle_us = 0.0
+        self.errors = 0
+        self.last_error = ""
+
+    def __repr__(self):
+        return (f"UpdateThreadStats(cycles={self.cycles}, overruns={self.overruns}, "
+                f"last_cycle_us={self.last_cycle_us:f}, max_cycle_us={self.max_cycle_us:f}, errors={self.errors})")
+
+
+class MotorConfig:
+
+    def __init__(self):
+        self.idle_mode = IdleMode.BRAKE
+        self.motor_type = MotorType.BRUSHLESS
+        self.sensor_type = SensorType.HALL_SENSOR
+        self.ramp_rate = 0.0
+        self.inverted = False
+        self.motor_kv = 480
+        self.encoder_counts_per_rev = 1
+        self.smart_current_free_limit = 20.0
+        self.smart_current_stall_limit = 80.0
+
+    def _copy(self):
+        config = MotorConfig()
+        config.__dict__.update(self.__dict__)
+        return config
+
+    def __repr__(self):
+        return (f"MotorConfig(idle_mode={int(self.idle_mode)} (0=Coast,1=Brake), "
+                f"motor_type={int(self.motor_type)} (0=Brushed,1=Brushless), "
+                f"sensor_type={int(self.sensor_type)} (0=None,1=Hall,2=Encoder), "
+                f"ramp_rate={self.ramp_rate:f}, inverted={self.inverted}, motor_kv={self.motor_kv}, "
+                f"encoder_counts_per_rev={self.encoder_counts_per_rev}, "
+                f"smart_current_free_limit={self.smart_current_free_limit:f}A, "
+                f"smart_current_stall_limit={self.smart_current_stall_limit:f}A)")
+
+
+class ConfigReadback:
+    __slots__ = ("motor_id", "config", "missing")
+
+    def __init__(self, motor_id, config, missing=()):
+        self.motor_id = motor_id
+        self.config = config
+        self.missing = list(missing)
+
+    @property
+    def complete(self):
+        return not self.missing
+
+    def __repr__(self):
+        return f"ConfigReadback(motor_id={self.motor_id}, missing={self.missing})"
+
+
+class _SimMotor:
+
+    def __init__(self, config):
+        self.config = config._copy()
+        self.rpm = 0.0           # Shaft speed in the physical direction
+        self.rotations = 0.0
+        self.output = 0.0        # Applied duty cycle after ramp and current limit
+        self.current = 0.0
+        self.temperature = settings["ambient_temperature"]
+        self.position_offset = 0.0
+        self.pending = deque()   # (time the command arrives, duty cycle)
+        self.command = 0.0       # Duty cycle the motor is acting on
+        self.history = deque()   # (time, feedback) for delayed feedback
+
+    def step(self, dt, bus_voltage, enabled):
+        c = self.config
+        target = self.command if enabled else 0.0
+        if c.inverted:
+            target = -target
+
+        # Ramp rate is seconds from 0 to full output
+        if c.ramp_rate > 0:
+            max_change = dt / c.ramp_rate
+            target = min(max(target, self.output - max_change), self.output + max_change)
+
+        kv = max(c.motor_kv, 1)
+        free_rpm = kv * bus_voltage
+        back_emf = self.rpm / kv
+        voltage = target * bus_voltage
+
+        if target == 0.0:
+            tau = settings["brake_time_constant_s"] if c.idle_mode == IdleMode.BRAKE else settings["coast_time_constant_s"]
+            goal_rpm = 0.0
+            current = 0.0
+            if c.idle_mode == IdleMode.BRAKE: # Windings shorted: back EMF drives a braking current
+                current = -back_emf / settings["winding_resistance"]
+                current = math.copysign(min(abs(current), c.smart_current_stall_limit), current)
+        else:
+            # Smart current limit, interpolated between the stall and free limits by speed
+            fraction = min(abs(self.rpm) / free_rpm, 1.0) if free_rpm else 1.0
+            limit = c.smart_current_stall_limit + (c.smart_current_free_limit - c.smart_current_stall_limit) * fraction
+            current = (voltage - back_emf) / settings["winding_resistance"]
+            if abs(current) > limit:
+                current = math.copysign(limit, current)
+                voltage = back_emf + current * settings["winding_resistance"]
+            tau = settings["time_constant_s"]
+            goal_rpm = kv * voltage
+
+        self.rpm += (goal_rpm - self.rpm) * (1.0 - math.exp(-dt / tau))
+        self.rotations += self.rpm / 60.0 * dt
+        self.output = voltage / bus_voltage if bus_voltage else 0.0
+        self.current = current
+
+        # Heating from I^2 R, cooling towards ambient
+        ambient = settings["ambient_temperature"]
+        heat = current * current * settings["winding_resistance"] * settings["thermal_resistance"]
+        self.temperature += (ambient + heat - self.temperature) * (1.0 - math.exp(-dt / settings["thermal_time_constant_s"]))
+
+    def sample(self, bus_voltage):
+        sign = -1.0 if self.config.inverted else 1.0
+        return MotorFeedback(
+            duty_cycle=sign * self.output,
+            velocity=sign * self.rpm,
+            position=sign * self.rotations * self.config.encoder_counts_per_rev - self.position_offset,
+            current=abs(self.current),
+            temperature=self.temperature,
+            voltage=bus_voltage,
+        )
+
+
+class MotorController:
+    """Simulated MotorController singleton, see the module docstring."""
+
+    _instance = None
+
+    def __init__(self, canbus_name):
+        self.canbus = canbus_name
+        self._motors = {}
+        self._duty_cycles = {}
+        self._feedback = {}
+        self._feedback_times = {}
+        self._table = np.zeros(MAX_MOTORS, dtype=FEEDBACK_DTYPE)
+        self._rows = {}
+        self._sim_time = None
+        self._last_update = None
+        self._bus_voltage = settings["bus_voltage"]
+        self._thread = None
+        self._thread_running = False
+        self._thread_stats = UpdateThreadStats()
+        self._pending_error = None # Update thread error not yet raised to the caller
+
+    @staticmethod
+    def get_instance(canbus_name="can0"):
+        """Get the singleton instance of MotorController"""
+        if MotorController._instance is None:
+            MotorController._instance = MotorController(canbus_name)
+        instance = MotorController._instance
+        if instance.canbus != canbus_name:
+            raise RuntimeError(f"MotorController already initialized with CAN bus '{instance.canbus}'. "
+                               f"Cannot change to '{canbus_name}'.")
+        return instance
+
+    def get_canbus_name(self):
+        return self.canbus
+
+    def _require_thread_stopped(self, action):
+        if self._thread_running:
+            raise RuntimeError(f"Cannot {action} while the update thread is running.")
+
+    def initialize_motor(self, motor_id, config, configure=True):
+        """Initialize a motor with custom configuration (configure=False keeps what is flashed on it)"""
+        self._require_thread_stopped("initialize motors")
+        if motor_id in self._motors:
+            print(f"Warning: Motor ID {motor_id} is already initialized.", file=sys.stderr)
+            return
+        if len(self._motors) >= MAX_MOTORS:
+            raise RuntimeError(f"Cannot initialize more than {MAX_MOTORS} motors.")
+        if configure:
+            _flash[motor_id] = config._copy()
+        self._motors[motor_id] = _SimMotor(_flash.get(motor_id) or MotorConfig())
+        row = self._rows[motor_id] = len(self._rows)
+        self._table[row] = 0
+        self._table["motor_id"][row] = motor_id
+
+    def initialize_motors(self, motor_ids, config, configure=True):
+        for motor_id in motor_ids:
+            self.initialize_motor(motor_id, config, configure)
+
+    def configure_motor(self, motor_id, config):
+        """Write a configuration to an initialized motor and burn it to flash"""
+        self._require_thread_stopped("configure motors")
+        self._check(motor_id)
+        _flash[motor_id] = config._copy()
+        self._motors[motor_id].config = config._copy()
+
+    def get_initialized_motor_ids(self):
+        return sorted(self._motors)
+
+    def get_motor_count(self):
+        return len(self._motors)
+
+    def _check(self, motor_id):
+        if motor_id not in self._motors:
+            raise RuntimeError(f"Motor ID {motor_id} is not initialized.")
+
+    @staticmethod
+    def _check_duty_cycle(motor_id, duty_cycle):
+        if not math.isfinite(duty_cycle) or abs(duty_cycle) > 1.0:
+            raise ValueError(f"Duty cycle {duty_cycle} for motor {motor_id} must be a finite value in [-1, 1].")
+
+    def set_motor_duty_cycle(self, motor_id, duty_cycle):
+        self._check_duty_cycle(motor_id, duty_cycle)
+        self._check(motor_id)
+        self._duty_cycles[motor_id] = duty_cycle
+
+    def set_motors_duty_cycles(self, motor_ids, duty_cycles):
+        if len(motor_ids) != len(duty_cycles):
+            raise ValueError("Number of duty cycles does not match the number of motor IDs.")
+        for motor_id, duty_cycle in zip(motor_ids, duty_cycles):
+            self.set_motor_duty_cycle(motor_id, duty_cycle)
+
+    def set_duty_cycles_array(self, motor_ids, duty_cycles):
+        """Set duty cycles for many motors in one call (int32 ids, float32 duty cycles)"""
+        motor_ids = np.ascontiguousarray(motor_ids, dtype=np.int32)
+        duty_cycles = np.ascontiguousarray(duty_cycles, dtype=np.float32)
+        if motor_ids.ndim != 1 or duty_cycles.ndim != 1 or motor_ids.size != duty_cycles.size:
+            raise ValueError("motor_ids and duty_cycles must be 1-D arrays of the same length.")
+        ids = motor_ids.tolist()
+        values = duty_cycles.tolist()
+        for motor_id, duty_cycle in zip(ids, values):
+            self._check(motor_id)
+            self._check_duty_cycle(motor_id, duty_cycle)
+        self._duty_cycles.update(zip(ids, values))
+
+    def get_current_duty_cycle(self, motor_id):
+        return self._duty_cycles.get(motor_id, 0.0)
+
+    def _advance(self, now):
+        # Integrate every motor up to now, applying commands as they arrive
+        if self._sim_time is None:
+            self._sim_time = now
+            return
+        heartbeat_deadline = self._last_update + HEARTBEAT_TIMEOUT_S if self._last_update is not None else now
+        while self._sim_time < now:
+            enabled = self._sim_time < heartbeat_deadline
+            # Without output the model is linear, so long gaps (e.g. before the first heartbeat) take big steps
+            dt = min(MAX_STEP_S if enabled else IDLE_STEP_S, now - self._sim_time)
+            self._sim_time += dt
+            total_current = 0.0
+            for motor in self._motors.values():
+                while motor.pending and motor.pending[0][0] <= self._sim_time:
+                    motor.command = motor.pending.popleft()[1]
+                motor.step(dt, self._bus_voltage, enabled)
+                total_current += abs(motor.current)
+            self._bus_voltage = settings["bus_voltage"] - total_current * settings["battery_resistance"]
+
+    def update(self):
+        """Process all motors: send commands and collect feedback (call in main loop)"""
+        self._raise_pending_error()
+        if not self._thread_running: # Otherwise the background thread does this at its own rate
+            self._update_cycle()
+        self._store_table()
+
+    def _store_table(self):
+        table = self._table
+        for motor_id, fb in list(self._feedback.items()):
+            table[self._rows[motor_id]] = (motor_id, fb.duty_cycle, fb.velocity, fb.position, fb.current,
+                                           fb.temperature, fb.voltage, self._feedback_times[motor_id])
+
+    def _update_cycle(self):
+        now = time.monotonic()
+        self._advance(now)
+        self._last_update = now
+
+        latency = settings["can_latency_s"]
+        cost = settings["update_cost_s"]
+        for motor_id, motor in self._motors.items():
+            if cost > 0:
+                # Busy wait: the real Update() holds the GIL for its CAN transactions too
+                end = time.perf_counter() + cost
+                while time.perf_counter() < end:
+                    pass
+
+            motor.pending.append((now + latency, self._duty_cycles.get(motor_id, 0.0)))
+            if latency <= 0:
+                motor.command = motor.pending.popleft()[1]
+
+            # Feedback is what the motor reported latency seconds ago
+            motor.history.append((now, motor.sample(self._bus_voltage)))
+            while len(motor.history) > 1 and motor.history[1][0] <= now - latency:
+                motor.history.popleft()
+            self._feedback_times[motor_id], self._feedback[motor_id] = motor.history[0]
+
+    def get_motor_feedback(self, motor_id):
+        self._check(motor_id)
+        return self._feedback.get(motor_id) or MotorFeedback()
+
+    def get_all_feedback(self):
+        return dict(self._feedback)
+
+    def get_feedback_array(self, motor_ids=None):
+        """Feedback of many motors as an (n, 6) float32 array, columns in FEEDBACK_FIELDS order"""
+        if motor_ids is None:
+            ids = self.get_initialized_motor_ids()
+        else:
+            motor_ids = np.asarray(motor_ids, dtype=np.int32)
+            if motor_ids.ndim != 1:
+                raise ValueError("motor_ids must be a 1-D array of motor IDs.")
+            ids = motor_ids.tolist()
+        out = np.empty((len(ids), len(FEEDBACK_FIELDS)), dtype=np.float32)
+        for row, motor_id in enumerate(ids):
+            fb = self.get_motor_feedback(motor_id)
+            out[row] = (fb.duty_cycle, fb.velocity, fb.position, fb.current, fb.temperature, fb.voltage)
+        return out
+
+    def get_feedback_view(self):
+        """Read-only structured array (FEEDBACK_DTYPE) over the feedback table, one row per motor in
+        initialization order. Rows are updated in place by update(); motors initialized later are
+        not in views taken earlier"""
+        view = self._table[:len(self._rows)]
+        view.flags.writeable = False
+        return view
+
+    def get_feedback_row(self, motor_id):
+        """Row of a motor in get_feedback_view()"""
+        self._check(motor_id)
+        return self._rows[motor_id]
+
+    def reset_motor_position(self, motor_id):
+        """Zero the position counter for a motor (software offset — no hardware reset)"""
+        self._check(motor_id)
+        motor = self._motors[motor_id]
+        motor.position_offset = motor.sample(self._bus_voltage).position + motor.position_offset
+
+    def read_motor_config(self, motor_id):
+        """Read the configuration currently flashed on the SPARK MAX over CAN"""
+        self._check(motor_id)
+        return self._motors[motor_id].config._copy()
+
+    def read_motor_configs(self, motor_ids=None, timeout_s=0.02, retries=2, max_in_flight=8):
+        """Read the flashed configuration of many motors (all initialized motors when motor_ids is None)
+        with pipelined requests. Returns {motor_id: ConfigReadback}"""
+        if timeout_s <= 0 or max_in_flight <= 0 or retries < 0:
+            raise ValueError("timeout_s and max_in_flight must be positive and retries not negative.")
+        ids = self.get_initialized_motor_ids() if motor_ids is None else list(motor_ids)
+        for motor_id in ids:
+            self._check(motor_id)
+        return {motor_id: ConfigReadback(motor_id, self._motors[motor_id].config._copy()) for motor_id in ids}
+
+    def start_update_thread(self, rate_hz):
+        """Run update() on a background thread at rate_hz (motors must be initialized first)"""
+        if rate_hz <= 0:
+            raise ValueError("Update thread rate must be positive.")
+        if self._thread_running:
+            return
+        self._thread_stats = UpdateThreadStats()
+        self._pending_error = None
+        self._thread_running = True
+        self._thread = threading.Thread(target=self._update_thread, args=(1.0 / rate_hz,), daemon=True)
+        self._thread.start()
+
+    def _update_thread(self, period):
+        stats = self._thread_stats
+        deadline = time.monotonic()
+        while True:
+            last = not self._thread_running # One final pass so the last commands go out
+            start = time.monotonic()
+            try:
+                self._update_cycle()
+            except Exception as e: # Like the native thread: record it, raise it from the next update()
+                stats.errors += 1
+                stats.last_error = self._pending_error = f"{type(e).__name__}: {e}"
+            end = time.monotonic()
+
+            deadline += period
+            cycle_us = (end - start) * 1e6
+            stats.cycles += 1
+            stats.last_cycle_us = cycle_us
+            stats.max_cycle_us = max(stats.max_cycle_us, cycle_us)
+            if end > deadline:
+                stats.overruns += 1
+            if last:
+                break
+            if end > deadline:
+                deadline += (int((end - deadline) / period) + 1) * period
+            time.sleep(max(0.0, deadline - time.monotonic()))
+
+    def stop_update_thread(self):
+        """Stop the background update thread after one final pass"""
+        if not self._thread_running:
+            return
+        self._thread_running = False
+        self._thread.join()
+        self._thread = None
+        self._store_table()
+
+    def is_update_thread_running(self):
+        return self._thread_running
+
+    def get_update_thread_stats(self):
+        self._raise_pending_error()
+        return self._thread_stats
+
+    def _raise_pending_error(self):
+        error, self._pending_error = self._pending_error, None
+        if error is not None:
+            raise RuntimeError(f"Update thread: {error} ({self._thread_stats.errors} errors so far)")
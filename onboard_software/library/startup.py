@@ -0,0 +1,105 @@
+import threading
+import time
+
+
+class StartupStage:
+    def __init__(self, name, callback, after):
+        self.name = name
+        self.callback = callback
+        self.after = tuple(after)
+        self.state = "pending" # pending, running, done, failed or skipped
+        self.error = None
+
+        # Timing, relative to the start of the sequence
+        self.start_s = None
+        self.elapsed_s = 0.0
+
+
+class StartupSequence:
+    """
+    Runs the robot's startup stages, each as soon as the stages it depends on are done.
+
+    Stages without a dependency between them run concurrently on their own threads,
+    e.g. the server can accept the laptop connection while CAN and the motors come
+    up. motor_controller releases the GIL for its CAN work and subprocesses wait
+    outside it, so the overlap is real.
+
+    If a stage raises, the stages that depend on it are skipped, `failed` is set so
+    long-running stages can give up early, and run() re-raises the first error once
+    everything still running has finished. report() gives every stage's start time
+    and duration either way.
+
+    Usage:
+        startup = StartupSequence()
+        startup.add("can_bus", init_can_bus)
+        startup.add("motors", init_motors, after=["can_bus"])
+        startup.add("server", start_server)
+        startup.run()
+        print(startup.report())
+    """
+
+    def __init__(self, name="Startup"):
+        self.name = name
+        self.stages = {}
+        self.failed = threading.Event()
+        self.elapsed_s = 0.0
+        self._condition = threading.Condition()
+        self._started = None
+
+    def add(self, name, callback, after=()):
+        """Add a stage. Dependencies must already be added, which keeps the graph acyclic."""
+        if name in self.stages:
+            raise ValueError(f"Startup stage {name} added twice")
+        for dependency in after:
+            if dependency not in self.stages:
+                raise ValueError(f"Startup stage {name} depends on unknown stage {dependency}")
+        self.stages[name] = StartupStage(name, callback, after)
+
+    def run(self):
+        self._started = time.monotonic()
+        with self._condition:
+            while True:
+                for stage in self.stages.values():
+                    if stage.state != "pending":
+                        continue
+                    states = [self.stages[dependency].state for dependency in stage.after]
+                    if any(state in ("failed", "skipped") for state in states):
+                        stage.state = "skipped"
+                    elif all(state == "done" for state in states):
+                        stage.state = "running"
+                        threading.Thread(target=self._run_stage, args=(stage,), name=f"startup-{stage.name}", daemon=True).start()
+                states = [stage.state for stage in self.stages.values()]
+                if "running" not in states and "pending" not in states:
+                    break
+                self._condition.wait()
+        self.elapsed_s = time.monotonic() - self._started
+
+        for stage in self.stages.values():
+            if stage.error is not None:
+                raise stage.error
+
+    def _run_stage(self, stage):
+        start = time.monotonic()
+        stage.start_s = start - self._started
+        try:
+            stage.callback()
+            state = "done"
+        except BaseException as e: # Includes SystemExit from a stage, re-raised by run()
+            stage.error = e
+            state = "failed"
+            self.failed.set()
+            print(f"[{self.name}] Stage {stage.name} failed: {type(e).__name__}: {e}")
+        stage.elapsed_s = time.monotonic() - start
+        with self._condition:
+            stage.state = state
+            self._condition.notify_all()
+
+    def report(self):
+        lines = [f"[{self.name}] {'stage':<16}{'after':<24}{'start ms':>10}{'time ms':>10}  state"]
+        for stage in self.stages.values():
+            start = f"{stage.start_s * 1000:.1f}" if stage.start_s is not None else "-"
+            lines.append(f"[{self.name}] {stage.name:<16}{','.join(stage.after) or '-':<24}{start:>10}"
+                         f"{stage.elapsed_s * 1000:>10.1f}  {stage.state}")
+        serial_s = sum(stage.elapsed_s for stage in self.stages.values())
+        lines.append(f"[{self.name}] Total {self.elapsed_s * 1000:.1f} ms ({serial_s * 1000:.1f} ms if run one after another)")
+        return "\n".join(lines)
@@ -0,0 +1,151 @@
+import math
+import time
+
+
+class PeriodicTask:
+    def __init__(self, name, callback, rate_hz, divider, phase, budget_s, critical):
+        self.name = name
+        self.callback = callback
+        self.rate_hz = rate_hz
+        self.divider = divider   # runs every `divider` base ticks
+        self.phase = phase       # ...on ticks where tick % divider == phase
+        self.budget_s = budget_s
+        self.critical = critical # never deferred when the tick runs over budget
+        self.pending = False     # deferred from an earlier tick
+        self.profile_key = f"task.{name}"
+
+        # Statistics
+        self.runs = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.budget_overruns = 0
+        self.deferred = 0
+        self.errors = 0
+        self._last_warning = 0.0
+
+
+class TaskScheduler:
+    """
+    Runs subsystem callbacks at their own rates from one base-rate control tick.
+
+    Every task rate must divide the base rate. Tasks that share a rate are given
+    different phase offsets automatically so heavy work doesn't pile onto the same
+    tick (e.g. a 10 Hz logger and a 2 Hz console printer never land together).
+
+    Each task has an execution-time budget. Overruns are counted and reported, and
+    once a tick has used up its own budget the remaining non-critical tasks due in
+    it are deferred to the next tick instead of stretching the loop period.
+
+    Usage:
+        tasks = TaskScheduler(100)
+        tasks.register("motor_update", mc.update, 100, budget_s=0.003, critical=True)
+        tasks.register("logging", logger_step, 10)
+        while running:
+            scheduler.wait()
+            tasks.run_tick()
+    """
+
+    WARNING_INTERVAL_S = 1.0 # Per-task rate limit for budget overrun warnings
+
+    def __init__(self, base_rate_hz, tick_budget_fraction=0.8, name="Tasks", profiler=None):
+        self.base_rate_hz = base_rate_hz
+        self.profiler = profiler # Optional LoopProfiler that also gets every task's run time
+        self.tick_budget_s = tick_budget_fraction / base_rate_hz
+        self.name = name
+        self.tasks = []
+        self._tick = 0
+
+    def register(self, name, callback, rate_hz, budget_s=None, critical=False, phase=None):
+        """Add a task. Tasks registered first run first within a tick."""
+        divider = self.base_rate_hz / rate_hz
+        if divider < 1 or abs(divider - round(divider)) > 1e-9:
+            raise ValueError(f"Task {name}: rate {rate_hz} Hz must divide the base rate {self.base_rate_hz} Hz")
+        divider = int(round(divider))
+        if phase is None:
+            phase = self._pick_phase(divider)
+        if budget_s is None:
+            budget_s = self.tick_budget_s / 4
+
+        task = PeriodicTask(name, callback, rate_hz, divider, phase % divider, budget_s, critical)
+        self.tasks.append(task)
+        if self.profiler is not None:
+            self.profiler.set_budget(task.profile_key, budget_s)
+        return task
+
+    def unregister(self, name):
+        self.tasks = [t for t in self.tasks if t.name != name]
+
+    def _pick_phase(self, divider):
+        # Over one hyperperiod, count how many existing tasks land on each tick and
+        # pick the phase whose ticks are the least loaded
+        hyper = divider
+        for task in self.tasks:
+            hyper = hyper * task.divider // math.gcd(hyper, task.divider)
+        load = [0] * hyper
+        for task in self.tasks:
+            for t in range(task.phase, hyper, task.divider):
+                load[t] += 1
+        costs = [sum(load[t] for t in range(phase, hyper, divider)) for phase in range(divider)]
+        return costs.index(min(costs))
+
+    def run_tick(self):
+        """Run every task due on this base tick."""
+        tick_start = time.monotonic()
+        tick = self._tick
+        self._tick += 1
+
+        for task in self.tasks:
+            if not task.pending and tick % task.divider != task.phase:
+                continue
+
+            if not task.critical and time.monotonic() - tick_start > self.tick_budget_s:
+                if not task.pending:
+                    task.deferred += 1
+                task.pending = True # Tick is over budget, try again next tick
+                continue
+            task.pending = False
+
+            start = time.monotonic()
+            try:
+                task.callback()
+            except RuntimeError as e: # e.g. CAN errors from motor_controller
+                task.errors += 1
+                print(f"[{self.name}] Task {task.name} raised {type(e).__name__}: {e}")
+            elapsed = time.monotonic() - start
+
+            if self.profiler is not None:
+                self.profiler.record(task.profile_key, elapsed)
+
+            task.runs += 1
+            task.total_s += elapsed
+            if elapsed > task.max_s:
+                task.max_s = elapsed
+            if elapsed > task.budget_s:
+                task.budget_overruns += 1
+                if start - task._last_warning > self.WARNING_INTERVAL_S:
+                    task._last_warning = start
+                    print(f"[{self.name}] Task {task.name} took {elapsed * 1000:.2f} ms "
+                          f"(budget {task.budget_s * 1000:.2f} ms)")
+
+    def stats(self):
+        return [{
+            "name": t.name,
+            "rate_hz": t.rate_hz,
+            "phase": t.phase,
+            "runs": t.runs,
+            "mean_ms": 1000.0 * t.total_s / t.runs if t.runs else 0.0,
+            "max_ms": 1000.0 * t.max_s,
+            "budget_ms": 1000.0 * t.budget_s,
+            "budget_overruns": t.budget_overruns,
+            "deferred": t.deferred,
+            "errors": t.errors,
+        } for t in self.tasks]
+
+    def report(self):
+        lines = [f"[{self.name}] {'task':<20}{'Hz':>6}{'phase':>6}{'runs':>8}{'mean ms':>9}{'max ms':>9}"
+                 f"{'budget':>8}{'over':>6}{'defer':>6}{'err':>5}"]
+        for s in self.stats():
+            lines.append(f"[{self.name}] {s['name']:<20}{s['rate_hz']:>6g}{s['phase']:>6}{s['runs']:>8}"
+                         f"{s['mean_ms']:>9.3f}{s['max_ms']:>9.3f}{s['budget_ms']:>8.2f}"
+                         f"{s['budget_overruns']:>6}{s['deferred']:>6}{s['errors']:>5}")
+        return "\n".join(lines)
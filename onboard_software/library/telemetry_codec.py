@@ -0,0 +1,165 @@
+"""
+Keyframe + delta encoding for motor telemetry rows.
+
+A motor telemetry sample is a list of rows
+    (motor_id, duty_cycle, velocity, position, current, temperature, voltage)
+as produced for every connected motor each control tick. Values are quantized to
+fixed steps and packed column by column (all duty cycles, then all velocities...).
+
+Keyframes carry the full quantized values as int32 columns. Every other frame
+carries only the difference from the last keyframe as zigzag varints, which are one
+byte for the slowly changing channels. Deltas are taken against the keyframe rather
+than the previous frame, so a lost or reordered delta only costs that one sample. A
+lost keyframe costs every delta up to the next keyframe (at most keyframe_interval
+frames); the server asks for an early keyframe when it has to drop one itself.
+
+NaN and inf (a bad feedback read) are sent as a sentinel and decode as NaN; finite
+values beyond the int32 range are clamped to it.
+
+Frame layout (network byte order):
+    uint8 kind | uint16 keyframe number | uint8 motor count | body
+    keyframe body: motor ids (uint8 each), then 6 columns of int32
+    delta body:    6 columns of zigzag varints
+"""
+
+import math
+import struct
+
+KIND_KEY = 1
+KIND_DELTA = 2
+
+# Quantization step per field, in the order of protocol.MOTOR_FIELDS
+STEPS = (
+    1e-4, # duty_cycle
+    0.1,  # velocity (RPM)
+    0.01, # position (ticks)
+    0.01, # current (A)
+    0.1,  # temperature (°C)
+    0.01, # voltage (V)
+)
+
+_HEADER = struct.Struct("!BHB")
+_KEY_MODULUS = 1 << 16
+_NAN = -(1 << 31) # Quantized value of NaN/inf
+_MAX = (1 << 31) - 1
+
+
+class EncodedMotorFrame(bytes):
+    """Marks an already-encoded motor telemetry sample so the wire protocol sends it as-is."""
+
+    @property
+    def keyframe(self):
+        return self[0] == KIND_KEY
+
+
+def _zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _read_varint(data, offset):
+    result = 0
+    shift = 0
+    while True:
+        b = data[offset]
+        offset += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, offset
+        shift += 7
+
+def _quantize_value(value, step):
+    if not math.isfinite(value):
+        return _NAN
+    return max(_NAN + 1, min(_MAX, round(value / step)))
+
+def _quantize(rows):
+    return [[_quantize_value(row[f + 1], STEPS[f]) for row in rows] for f in range(len(STEPS))]
+
+def _dequantize(value, step):
+    return math.nan if value == _NAN else value * step
+
+
+class MotorTelemetryEncoder:
+
+    def __init__(self, keyframe_interval=25):
+        self.keyframe_interval = keyframe_interval # frames between keyframes (0.5 s at 50 Hz)
+        self._key_number = -1
+        self._key_ids = None
+        self._key_columns = None
+        self._since_key = 0
+
+    def request_keyframe(self):
+        self._key_ids = None
+
+    def encode(self, rows):
+        ids = [row[0] for row in rows]
+        columns = _quantize(rows)
+
+        if ids != self._key_ids or self._since_key >= self.keyframe_interval:
+            self._key_number = (self._key_number + 1) % _KEY_MODULUS
+            self._key_ids = ids
+            self._key_columns = columns
+            self._since_key = 1
+            n = len(ids)
+            out = bytearray(_HEADER.pack(KIND_KEY, self._key_number, n))
+            out += bytes(ids)
+            column = struct.Struct(f"!{n}i")
+            for values in columns:
+                out += column.pack(*values)
+            return EncodedMotorFrame(out)
+
+        self._since_key += 1
+        out = bytearray(_HEADER.pack(KIND_DELTA, self._key_number, len(ids)))
+        for values, base in zip(columns, self._key_columns):
+            for v, b in zip(values, base):
+                _write_varint(out, _zigzag(v - b))
+        return EncodedMotorFrame(out)
+
+
+class MotorTelemetryDecoder:
+
+    def __init__(self):
+        self._key_number = None
+        self._key_ids = None
+        self._key_columns = None
+
+    def decode(self, frame):
+        """Returns the motor rows, or None for a delta whose keyframe never arrived."""
+        kind, key_number, n = _HEADER.unpack_from(frame)
+        offset = _HEADER.size
+
+        if kind == KIND_KEY:
+            ids = list(frame[offset:offset + n])
+            offset += n
+            column = struct.Struct(f"!{n}i")
+            columns = []
+            for _ in STEPS:
+                columns.append(column.unpack_from(frame, offset))
+                offset += column.size
+            self._key_number = key_number
+            self._key_ids = ids
+            self._key_columns = columns
+        elif kind == KIND_DELTA:
+            if key_number != self._key_number or n != len(self._key_ids):
+                return None
+            ids = self._key_ids
+            columns = []
+            for base in self._key_columns:
+                values = []
+                for b in base:
+                    delta, offset = _read_varint(frame, offset)
+                    values.append(b + _unzigzag(delta))
+                columns.append(values)
+        else:
+            raise ValueError(f"Unknown motor telemetry frame kind {kind}")
+
+        return [(motor_id, *(_dequantize(columns[f][i], STEPS[f]) for f in range(len(STEPS))))
+                for i, motor_id in enumerate(ids)]
@@ -1,6 +1,35 @@
 import os
 import csv
 import datetime
+import gzip
+import io
+import itertools
+import json
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+import robot_params
+from library import log_index
+from library import log_maintenance
+
+# Binary (.tlog) format:
+#   MAGIC, <H version, <I header length, JSON header {"name", "columns", "started"}
+#   then chunks: <I row count n, n float64 timestamps (s since the robot timer started),
+#   then each column as n float32 values (column-major, so one column reads as one slice)
+TLOG_MAGIC = b"TLOG"
+TLOG_VERSION = 1
+_FILE_HEADER = struct.Struct("<HI")
+_CHUNK_HEADER = struct.Struct("<I")
+
+TIME_COLUMN = "Time (s)" # Robot timer seconds, first column of every CSV row
+
+# Compression and disk budget for every logger's segments (and the flight recordings next to them)
+maintenance = log_maintenance.LogMaintenance(robot_params.LoggingConfig.LOG_BUDGET_BYTES,
+                                             compress=robot_params.LoggingConfig.compressLogs)
 
 
 class TelemetryLogger:
@@ -10,29 +39,49 @@ class TelemetryLogger:
     Usage:
         logger = TelemetryLogger("auger")
         logger.start_logging(["Velocity (RPM)", "Current (A)"])
-        logger.log_row("[T+00:01.00]", [120.4, 2.1])
+        logger.log_row(robot_params.robot_timer.elapsed(), [120.4, 2.1])
         logger.stop_logging()
 
     Output is CSV — open the file in any spreadsheet app and each
     value lands in its own cell automatically.
+
+    With binary=True (default: robot_params.LoggingConfig.useBinaryLogs) rows go
+    into preallocated NumPy chunks instead, and a background thread writes and
+    fsyncs whole chunks to a .tlog file, so log_row() does no formatting and no
+    syscalls on the control thread. tlog_to_csv.py turns a .tlog back into the
+    CSV layout above.
     """
 
-    def __init__(self, name: str, log_dir: str = None):
+    def __init__(self, name: str, log_dir: str = None, binary: bool = None):
         """
         name:    subsystem label used in the filename and header (e.g. "auger")
         log_dir: directory to write log files into; defaults to
                  <this file's location>/../../logs/  (i.e. onboard_software/logs/)
+        binary:  write .tlog instead of CSV; defaults to LoggingConfig.useBinaryLogs
         """
         self.name = name
         if log_dir is None:
             self.log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
         else:
             self.log_dir = log_dir
+        config = robot_params.LoggingConfig
+        self.binary = config.useBinaryLogs if binary is None else binary
+        self.max_segment_bytes = config.MAX_SEGMENT_BYTES
+        self.max_segment_s = config.MAX_SEGMENT_S
+        self.index_block_rows = config.INDEX_BLOCK_ROWS
 
         self._file = None
         self._writer = None
         self._filepath = None
         self._row_count = 0
+        self._columns = None
+        self._file_tag = None
+        self._part = 0
+        self._segment_bytes = 0
+        self._segment_deadline = 0.0
+        self._row_bytes = 0
+        self._index = None
+        self._block_rows = 0
 
     @property
     def is_logging(self) -> bool:
@@ -44,49 +93,439 @@ class TelemetryLogger:
 
         columns: ordered list of column header strings, e.g.
                  ["Duty Cycle", "Velocity (RPM)", "Position (ticks)"]
-                 A "Timestamp" column is always prepended automatically.
+                 A "Time (s)" column is always prepended automatically.
         """
         if self._file is not None:
             return  # already logging
 
         os.makedirs(self.log_dir, exist_ok=True)
 
-        file_tag = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"{self.name}_{file_tag}.csv"
-        self._filepath = os.path.join(self.log_dir, filename)
-
-        self._file = open(self._filepath, 'w', newline='', encoding='utf-8')
-        self._writer = csv.writer(self._file)
+        self._columns = list(columns)
+        self._file_tag = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self._part = 0
         self._row_count = 0
-
-        self._writer.writerow(["Timestamp"] + columns)
-        self._file.flush()
+        self._open_segment()
 
         print(f"[{self.name.capitalize()}] Logging started -> {self._filepath}")
 
-    def log_row(self, timestamp: str, values: list):
+    def _open_segment(self):
+        self._part += 1
+        part = f"_part{self._part}" if self._part > 1 else ""
+        filename = f"{self.name}_{self._file_tag}{part}.{'tlog' if self.binary else 'csv'}"
+        self._filepath = os.path.join(self.log_dir, filename)
+        maintenance.opened(self._filepath)
+        self._index = log_index.IndexWriter(self._filepath)
+
+        if self.binary:
+            # Each chunk is an index block, added by the writer thread
+            self._file = open(self._filepath, 'wb')
+            self._writer = _ChunkWriter(self._file, self.name, self._columns, self._index)
+            self._segment_bytes = self._file.tell()
+            self._row_bytes = 8 + 4 * len(self._columns)
+        else:
+            self._file = open(self._filepath, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow([TIME_COLUMN] + self._columns)
+            self._file.flush()
+            self._segment_bytes = self._file.tell() # Bytes, the header isn't ASCII; rows are
+            self._block_rows = 0
+        self._segment_deadline = time.monotonic() + self.max_segment_s
+
+    def _close_segment(self, wait):
+        path = self._filepath
+        if self.binary:
+            # The writer thread writes the last partial chunk and closes the file
+            self._writer.close(wait, on_closed=lambda: maintenance.closed(path))
+        else:
+            self._index.close()
+            self._file.close()
+            maintenance.closed(path)
+        self._file = None
+        self._writer = None
+        self._index = None
+
+    def log_row(self, timestamp, values: list):
         """
-        Write one data row to the CSV log.
+        Write one data row to the log.
 
-        timestamp: string from robot_params.robot_timer.timestamp()
+        timestamp: seconds from robot_params.robot_timer.elapsed() (a string from
+                   robot_params.robot_timer.timestamp() is still accepted)
         values:    list of raw numbers matching the column order from start_logging()
         """
         if self._file is None:
             return
 
-        self._writer.writerow([timestamp] + [str(v) for v in values])
-        self._file.flush()
+        if isinstance(timestamp, str):
+            timestamp = parse_timestamp(timestamp)
+        if self.binary:
+            if self._writer.failed:
+                # Disk full or gone: stop instead of rotating onto it again
+                print(f"[{self.name.capitalize()}] Logging stopped after a write error — {self._filepath} is incomplete")
+                self._close_segment(wait=False)
+                return
+            self._writer.append(timestamp, values)
+            self._segment_bytes += self._row_bytes
+        else:
+            if self._block_rows == 0:
+                self._index.add(timestamp, self._segment_bytes)
+            self._block_rows = (self._block_rows + 1) % self.index_block_rows
+            self._segment_bytes += self._writer.writerow([format_time(timestamp)] + [str(v) for v in values])
+            self._file.flush()
         self._row_count += 1
 
+        if self._segment_bytes >= self.max_segment_bytes or time.monotonic() >= self._segment_deadline:
+            # Rotation only closes and opens a file here; the binary writer finishes the old one
+            self._close_segment(wait=False)
+            self._open_segment()
+
     def stop_logging(self):
         """Finalize the log file and close it."""
         if self._file is None:
             return
 
-        self._file.close()
-        self._file = None
-        self._writer = None
+        self._close_segment(wait=True)
 
-        print(f"[{self.name.capitalize()}] Logging stopped — {self._row_count} rows saved to {self._filepath}")
+        segments = f" in {self._part} segments" if self._part > 1 else ""
+        print(f"[{self.name.capitalize()}] Logging stopped — {self._row_count} rows saved to {self._filepath}{segments}")
         self._filepath = None
         self._row_count = 0
+
+
+class _WriterThread:
+    """
+    Writes and fsyncs the chunks of every binary logger, one segment after another.
+
+    There is one for the whole process, started at import like LogMaintenance's. That is
+    before the realtime profile pins the control thread, so it ends up with default
+    scheduling on the network CPUs. A thread started from the control thread later (at
+    a segment rotation) would inherit its SCHED_FIFO priority and CPUs instead.
+    """
+
+    def __init__(self, name="log-writer"):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, writer, item):
+        self._queue.put((writer, item))
+
+    def _run(self):
+        while True:
+            writer, item = self._queue.get()
+            try:
+                writer._process(item)
+            except Exception as e: # One logger must never stop the others
+                print(f"[{writer.name.capitalize()}] Log writer error: {type(e).__name__}: {e}")
+
+
+_writer_thread = _WriterThread()
+
+
+class _ChunkWriter:
+    """Fills preallocated chunks on the caller's thread; the shared writer thread writes them."""
+
+    POOL_SIZE = 4 # Chunks recycled between the logger and the writer thread
+    MAX_EXTRA_CHUNKS = 16 # Allocated on top of the pool while the writer is behind; rows are dropped beyond that
+
+    def __init__(self, file, name, columns, index=None):
+        config = robot_params.LoggingConfig
+        self.file = file
+        self.index = index # log_index.IndexWriter that gets an entry per chunk
+        self.name = name
+        self.columns = len(columns)
+        self.chunk_rows = config.CHUNK_ROWS
+        self.flush_interval_s = config.FLUSH_INTERVAL_S
+        self.extra_chunks = 0 # Allocated because the writer fell behind the whole pool
+        self.dropped_rows = 0 # Lost to a full pool or a write error
+        self.failed = False # Set by the writer thread when a write fails; rows are dropped from then on
+
+        header = json.dumps({"name": name, "columns": list(columns),
+                             "started": datetime.datetime.now().isoformat()}).encode()
+        file.write(TLOG_MAGIC + _FILE_HEADER.pack(TLOG_VERSION, len(header)) + header)
+
+        self._free = queue.Queue()
+        for _ in range(self.POOL_SIZE):
+            self._free.put(self._new_chunk())
+        self._chunk = self._free.get()
+        self._rows = 0
+        self._chunk_started = None
+        self._on_closed = None
+        self._closed = threading.Event()
+
+    def _new_chunk(self):
+        return np.empty(self.chunk_rows, dtype=np.float64), np.empty((self.columns, self.chunk_rows), dtype=np.float32)
+
+    def append(self, timestamp, values):
+        if self.failed:
+            self.dropped_rows += 1
+            return
+        times, data = self._chunk
+        row = self._rows
+        times[row] = timestamp
+        data[:, row] = values
+        self._rows = row + 1
+
+        now = time.monotonic()
+        if self._chunk_started is None:
+            self._chunk_started = now
+        if self._rows == self.chunk_rows or now - self._chunk_started >= self.flush_interval_s:
+            self._hand_over()
+
+    def _hand_over(self):
+        if self._rows == 0:
+            return
+        try:
+            chunk = self._free.get_nowait()
+        except queue.Empty:
+            if self.failed or self.extra_chunks >= self.MAX_EXTRA_CHUNKS:
+                # Keep memory bounded: reuse this chunk and lose its rows
+                self.dropped_rows += self._rows
+                self._rows = 0
+                self._chunk_started = None
+                return
+            chunk = self._new_chunk()
+            self.extra_chunks += 1
+        _writer_thread.put(self, (self._chunk, self._rows))
+        self._chunk = chunk
+        self._rows = 0
+        self._chunk_started = None
+
+    def _process(self, item):
+        # On the writer thread: one chunk, or None to close the file
+        if item is None:
+            try:
+                if self.index is not None:
+                    self.index.close()
+                self.file.close()
+            except OSError:
+                pass # Already reported, or nothing left to lose
+            self._report()
+            try:
+                if self._on_closed is not None:
+                    self._on_closed() # Even after a failure, so maintenance can still compress or evict it
+            finally:
+                self._closed.set()
+            return
+        (times, data), rows = item
+        if self.failed:
+            self.dropped_rows += rows
+        else:
+            try:
+                self._write_chunk(times, data, rows)
+            except OSError as e:
+                self.failed = True
+                self.dropped_rows += rows
+                print(f"[{self.name.capitalize()}] Log write failed, dropping rows from now on: {e}")
+        self._free.put((times, data))
+
+    def _write_chunk(self, times, data, rows):
+        offset = self.file.tell()
+        self.file.write(_CHUNK_HEADER.pack(rows))
+        self.file.write(times[:rows].tobytes())
+        self.file.write(data[:, :rows].tobytes())
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        if self.index is not None:
+            self.index.add(float(times[0]), offset) # Only once the chunk is on disk
+
+    def close(self, wait=True, on_closed=None):
+        """Write what is left and close the file on the writer thread, then call on_closed there."""
+        self._hand_over()
+        self._on_closed = on_closed
+        _writer_thread.put(self, None)
+        if not wait:
+            return
+        self._closed.wait()
+
+    def _report(self):
+        # On the writer thread once the counts are final, so rotated segments are reported too
+        filename = os.path.basename(self.file.name)
+        if self.extra_chunks:
+            print(f"[{self.name.capitalize()}] Log writer fell behind on {filename}, {self.extra_chunks} extra chunks allocated")
+        if self.dropped_rows:
+            print(f"[{self.name.capitalize()}] {self.dropped_rows} rows of {filename} were dropped")
+
+
+def format_time(seconds):
+    return f"{seconds:.6f}"
+
+
+def parse_timestamp(timestamp):
+    """Seconds from a RobotTimer.timestamp() string like "[T+03:10.25]"."""
+    minutes, seconds = timestamp.strip("[]T+").split(":")
+    return int(minutes) * 60 + float(seconds)
+
+
+def read_binary_log(path):
+    """
+    Read a .tlog file. Returns (header, chunks) where chunks yields (times, values)
+    per chunk: float64 seconds of shape (n,) and float32 values of shape (n, columns).
+    A chunk cut short by a crash ends the iteration. Compressed segments (.tlog.gz) are read too.
+    """
+    f = gzip.open(path, 'rb') if path.endswith(log_maintenance.COMPRESSED_SUFFIX) else open(path, 'rb')
+    if f.read(len(TLOG_MAGIC)) != TLOG_MAGIC:
+        f.close()
+        raise ValueError(f"{path} is not a binary telemetry log")
+    version, header_len = _FILE_HEADER.unpack(f.read(_FILE_HEADER.size))
+    if version != TLOG_VERSION:
+        f.close()
+        raise ValueError(f"{path}: unsupported log version {version}")
+    header = json.loads(f.read(header_len))
+    columns = len(header["columns"])
+
+    def chunks():
+        with f:
+            while True:
+                raw = f.read(_CHUNK_HEADER.size)
+                if len(raw) < _CHUNK_HEADER.size:
+                    return
+                rows, = _CHUNK_HEADER.unpack(raw)
+                times = f.read(rows * 8)
+                values = f.read(rows * columns * 4)
+                if len(times) < rows * 8 or len(values) < rows * columns * 4:
+                    return
+                yield np.frombuffer(times, dtype=np.float64), np.frombuffer(values, dtype=np.float32).reshape(columns, rows).T
+
+    return header, chunks()
+
+
+def binary_log_to_csv(path, csv_path=None):
+    """Convert a .tlog file into the CSV layout TelemetryLogger writes. Returns the CSV path."""
+    if csv_path is None:
+        base = path[:-len(log_maintenance.COMPRESSED_SUFFIX)] if path.endswith(log_maintenance.COMPRESSED_SUFFIX) else path
+        csv_path = os.path.splitext(base)[0] + ".csv"
+    header, chunks = read_binary_log(path)
+    with open(csv_path, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        writer.writerow([TIME_COLUMN] + header["columns"])
+        for times, values in chunks:
+            for t, row in zip(times.tolist(), values.astype(str).tolist()):
+                writer.writerow([format_time(t)] + row)
+    return csv_path
+
+
+def iter_segment(path, block_rows=65536):
+    """
+    Stream a log segment (.csv, .tlog or either .gz) in blocks of at most about block_rows rows.
+    Returns (columns, blocks) where blocks yields (times, values) like read_window(), so memory
+    stays bounded however long the segment is. Old "[T+MM:SS.ss]" CSV timestamps are converted.
+    """
+    compressed = path.endswith(log_maintenance.COMPRESSED_SUFFIX)
+    if (path[:-len(log_maintenance.COMPRESSED_SUFFIX)] if compressed else path).endswith(".tlog"):
+        header, chunks = read_binary_log(path)
+        return header["columns"], chunks
+    f = gzip.open(path, 'rb') if compressed else open(path, 'rb')
+    names = next(csv.reader([f.readline().decode('utf-8')]))[1:]
+
+    def blocks():
+        with f:
+            while True:
+                lines = list(itertools.islice(f, block_rows))
+                if lines and not lines[-1].endswith(b"\n"):
+                    lines.pop() # Torn by a crash
+                if not lines:
+                    return
+                if lines[0].startswith(b"["):
+                    rows = [line.decode('utf-8').rstrip("\r\n").split(",") for line in lines]
+                    times = np.array([parse_timestamp(row[0]) for row in rows], dtype=np.float64)
+                    yield times, np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(names))
+                else:
+                    yield _parse_csv_rows(b"".join(lines), len(names))
+
+    return names, blocks()
+
+
+def read_window(path, start_s=None, end_s=None, columns=None):
+    """
+    Rows of a log segment (.csv, .tlog or either .gz) with start_s <= time <= end_s.
+    Returns (times, {column: values}) as NumPy arrays for the requested columns
+    (default: all); values are float64 from CSV and float32 from .tlog.
+
+    With a time index only the blocks covering the window are read. Segments without
+    one (older logs, "[T+MM:SS.ss]" timestamps) are scanned in full.
+    """
+    compressed = path.endswith(log_maintenance.COMPRESSED_SUFFIX)
+    binary = (path[:-len(log_maintenance.COMPRESSED_SUFFIX)] if compressed else path).endswith(".tlog")
+    index = log_index.read_index(path)
+    if index is None:
+        names, times, values = _read_segment(path, binary)
+    else:
+        block_times, offsets = index
+        first, last = log_index.block_range(block_times, start_s, end_s)
+        with open(path, 'rb') as f:
+            header = log_index.read_span(f, 0, int(offsets[0]) if len(offsets) else None, compressed)
+            data = b""
+            if first < last:
+                data = log_index.read_span(f, int(offsets[first]), int(offsets[last]) if last < len(offsets) else None, compressed)
+        if binary:
+            names = _parse_tlog_header(header, path)["columns"]
+            times, values = _parse_chunks(data, len(names))
+        else:
+            names = next(csv.reader([header.decode('utf-8').splitlines()[0]]))[1:]
+            times, values = _parse_csv_rows(data, len(names))
+
+    mask = np.ones(len(times), dtype=bool)
+    if start_s is not None:
+        mask &= times >= start_s
+    if end_s is not None:
+        mask &= times <= end_s
+    selected = {}
+    for name in (names if columns is None else columns):
+        if name not in names:
+            raise ValueError(f"{path} has no column {name!r}")
+        selected[name] = values[mask, names.index(name)]
+    return times[mask], selected
+
+
+def _parse_tlog_header(data, path):
+    if data[:len(TLOG_MAGIC)] != TLOG_MAGIC:
+        raise ValueError(f"{path} is not a binary telemetry log")
+    version, header_len = _FILE_HEADER.unpack_from(data, len(TLOG_MAGIC))
+    if version != TLOG_VERSION:
+        raise ValueError(f"{path}: unsupported log version {version}")
+    start = len(TLOG_MAGIC) + _FILE_HEADER.size
+    return json.loads(data[start:start + header_len])
+
+
+def _parse_chunks(data, columns):
+    # .tlog chunks back to back in a buffer; a torn last chunk is dropped
+    times, values = [], []
+    offset = 0
+    while offset + _CHUNK_HEADER.size <= len(data):
+        rows, = _CHUNK_HEADER.unpack_from(data, offset)
+        offset += _CHUNK_HEADER.size
+        end = offset + rows * (8 + 4 * columns)
+        if end > len(data):
+            break
+        times.append(np.frombuffer(data, dtype=np.float64, count=rows, offset=offset))
+        values.append(np.frombuffer(data, dtype=np.float32, count=rows * columns, offset=offset + rows * 8).reshape(columns, rows).T)
+        offset = end
+    if not times:
+        return np.empty(0), np.empty((0, columns), dtype=np.float32)
+    return np.concatenate(times), np.concatenate(values)
+
+
+def _parse_csv_rows(data, columns):
+    data = data[:data.rfind(b"\n") + 1] # A row torn by a crash is dropped
+    if not data:
+        return np.empty(0), np.empty((0, columns))
+    rows = np.loadtxt(io.BytesIO(data), delimiter=",", ndmin=2, dtype=np.float64)
+    return rows[:, 0], rows[:, 1:]
+
+
+def _read_segment(path, binary):
+    # Full scan, for segments without an index
+    if binary:
+        header, chunks = read_binary_log(path)
+        parts = list(chunks)
+        times = np.concatenate([t for t, _ in parts]) if parts else np.empty(0)
+        values = np.concatenate([v for _, v in parts]) if parts else np.empty((0, len(header["columns"])), dtype=np.float32)
+        return header["columns"], times, values
+    opener = gzip.open if path.endswith(log_maintenance.COMPRESSED_SUFFIX) else open
+    with opener(path, 'rt', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        names = next(reader)[1:]
+        rows = [row for row in reader if len(row) == len(names) + 1]
+    times = np.array([parse_timestamp(row[0]) if row[0].startswith("[") else float(row[0]) for row in rows], dtype=np.float64)
+    values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(names))
+    return names, times, values
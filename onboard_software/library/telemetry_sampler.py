@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+
+
+class TelemetrySampler:
+    """
+    Snapshots every motor's feedback once per control tick into a preallocated ring.
+
+    The sampler is the only reader of the motor_controller feedback view: console
+    printing, CSV/binary logging, network telemetry and the flight recorder all read
+    the sampler's copy at their own rates, so however many consumers are attached the
+    feedback is read and stored exactly once per tick and they all see the same sample.
+
+    Each slot holds the feedback rows of all motors (FEEDBACK_DTYPE, in feedback table
+    order) and the monotonic-ns time of the snapshot. latest() is the newest sample;
+    consumers that want every sample keep a cursor() and read() what is new since
+    their last call. Everything runs on the control thread, so there is no locking.
+
+    Usage:
+        sampler = TelemetrySampler(mc, capacity=256)
+        tasks.register("telemetry_sample", sampler.sample, 100, critical=True)
+        columns = sampler.columns([7, 1])
+        rows = sampler.latest()[columns].tolist()
+    """
+
+    def __init__(self, mc, capacity=256, name="Sampler"):
+        self.name = name
+        self.capacity = capacity
+
+        # Motors in feedback table order, so a snapshot is one contiguous copy
+        self.motor_ids = sorted(mc.get_initialized_motor_ids(), key=mc.get_feedback_row)
+        rows = [mc.get_feedback_row(motor_id) for motor_id in self.motor_ids]
+        first = rows[0] if rows else 0
+        if rows != list(range(first, first + len(rows))):
+            raise ValueError(f"[{self.name}] Feedback rows {rows} are not contiguous")
+        self._view = mc.get_feedback_view()[first:first + len(rows)]
+        self._column = {motor_id: i for i, motor_id in enumerate(self.motor_ids)}
+
+        self.times_ns = np.zeros(capacity, dtype=np.int64)
+        self.samples = np.zeros((capacity, len(self.motor_ids)), dtype=self._view.dtype)
+        self.count = 0 # Samples taken so far; the newest is in slot (count - 1) % capacity
+
+    def columns(self, motor_ids):
+        """Column of each motor in a sample, for indexing latest() or read() results."""
+        return [self._column[motor_id] for motor_id in motor_ids]
+
+    def sample(self):
+        slot = self.count % self.capacity
+        self.samples[slot] = self._view
+        self.times_ns[slot] = time.monotonic_ns()
+        self.count += 1
+
+    def latest(self):
+        """Newest sample: one FEEDBACK_DTYPE row per motor. A view, valid until the ring wraps onto it."""
+        return self.samples[(self.count - 1) % self.capacity]
+
+    def latest_time_ns(self):
+        return int(self.times_ns[(self.count - 1) % self.capacity]) if self.count else None
+
+    def cursor(self):
+        """A consumer's position in the ring, starting after the newest sample."""
+        return SampleCursor(self)
+
+
+class SampleCursor:
+    """Reads the samples a consumer hasn't seen yet. Samples overwritten before read() are counted in dropped."""
+
+    def __init__(self, sampler):
+        self.sampler = sampler
+        self.next = sampler.count
+        self.dropped = 0
+
+    def read(self):
+        """(times_ns of shape (n,), samples of shape (n, motors)) for the n new samples, oldest first."""
+        sampler = self.sampler
+        oldest = max(self.next, sampler.count - sampler.capacity)
+        self.dropped += oldest - self.next
+        slots = np.arange(oldest, sampler.count) % sampler.capacity
+        self.next = sampler.count
+        return sampler.times_ns[slots], sampler.samples[slots]
@@ -0,0 +1,78 @@
+import threading
+import time
+
+
+class _Subscription:
+    def __init__(self, rate_hz=None, decimation=1):
+        self.period = 1.0 / rate_hz if rate_hz else 0.0
+        self.decimation = max(1, int(decimation))
+        self.next_due = 0.0
+        self.count = 0
+
+    def due(self, now):
+        self.count += 1
+        if self.count % self.decimation != 0:
+            return False
+        if now < self.next_due:
+            return False
+        # Keep a fixed schedule so a 20 Hz topic published at 50 Hz averages 20 Hz
+        self.next_due += self.period
+        if self.next_due < now:
+            self.next_due = now + self.period
+        return True
+
+
+class TopicRegistry:
+    """
+    Publish/subscribe layer on top of the telemetry link.
+
+    Subsystems publish named topics every control tick; mission control subscribes
+    to the ones it wants with a maximum rate and/or a decimation factor (send every
+    Nth publish). Only topics with an active subscription are sampled, serialised
+    and sent, so unused telemetry costs a single dict lookup.
+
+    Usage:
+        topics = TopicRegistry(server.send_telemetry)
+        topics.subscribe("auger", rate_hz=10)           # from the client's request
+        topics.publish("auger", lambda: auger_rows())   # producer only runs when due
+    """
+
+    def __init__(self, send):
+        self._send = send # send(data, topic) - usually Server.send_telemetry
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def subscribe(self, topic, rate_hz=None, decimation=1):
+        with self._lock:
+            self._subscriptions[topic] = _Subscription(rate_hz, decimation)
+        print(f"[Topics] Subscribed to {topic}" + (f" at {rate_hz} Hz" if rate_hz else "")
+              + (f" every {decimation} samples" if decimation and decimation > 1 else ""))
+
+    def unsubscribe(self, topic):
+        with self._lock:
+            if self._subscriptions.pop(topic, None) is not None:
+                print(f"[Topics] Unsubscribed from {topic}")
+
+    def is_subscribed(self, topic):
+        return topic in self._subscriptions
+
+    def subscribed_topics(self):
+        return list(self._subscriptions)
+
+    def publish(self, topic, data, now=None):
+        """
+        Offer a sample for a topic. data may be a callable that produces the sample,
+        so the work of building it is skipped when nobody is listening.
+        Returns True if the sample was sent.
+        """
+        subscription = self._subscriptions.get(topic)
+        if subscription is None:
+            return False
+        if not subscription.due(time.monotonic() if now is None else now):
+            return False
+        if callable(data):
+            data = data()
+        if data is None:
+            return False
+        self._send(data, topic)
+        return True
@@ -0,0 +1,154 @@
+"""
+Benchmark the effect of each real-time setting on control loop tick jitter.
+
+Runs a base-rate control loop (LoopScheduler, like Robot.run) with a synthetic
+tick workload that allocates telemetry-like garbage, next to background threads
+that stand in for the server's network threads. Each configuration runs in its own
+process because the settings are process-wide and can't be undone:
+
+    baseline  default scheduling, no pinning, automatic GC
+    gc        gc.freeze() + collections only in idle slack
+    affinity  control thread and "network" threads on separate CPUs
+    priority  SCHED_FIFO (or nice) for the control thread
+    mlock     mlockall()
+    all       everything from robot_params.RealtimeConfig
+
+Settings that aren't permitted are reported and skipped, so run it as root (or
+with CAP_SYS_NICE/CAP_IPC_LOCK) on the Pi to see all of them.
+
+Usage (on the Pi):
+    sudo python realtime_benchmark.py --duration 30
+    python realtime_benchmark.py --config baseline gc --duration 10
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+import robot_params
+from library import loop_profiler
+from library import loop_scheduler
+from library import realtime
+
+CONFIGS = ["baseline", "gc", "affinity", "priority", "mlock", "all"]
+
+def _profile_for(config):
+    rt = robot_params.RealtimeConfig
+    use = {
+        "baseline": set(),
+        "gc": {"gc"},
+        "affinity": {"affinity"},
+        "priority": {"priority"},
+        "mlock": {"mlock"},
+        "all": {"gc", "affinity", "priority", "mlock"},
+    }[config]
+    return realtime.RealtimeProfile(
+        fifo_priority=rt.FIFO_PRIORITY if "priority" in use and rt.useFifo else None,
+        nice=rt.NICE_VALUE if "priority" in use else None,
+        control_cpus=rt.CONTROL_CPUS if "affinity" in use else None,
+        network_cpus=rt.NETWORK_CPUS if "affinity" in use else None,
+        lock_memory="mlock" in use,
+        freeze_gc="gc" in use,
+    )
+
+def _network_thread(stop):
+    # Ping-pong JSON over a socketpair, roughly what a server thread does per message
+    a, b = socket.socketpair()
+    msg = json.dumps({"type": "telemetry_batch", "data": [[3, 0.25, 1200.0, 40.0, 3.2, 31.0, 12.4]] * 4}).encode()
+    while not stop.is_set():
+        a.sendall(msg)
+        json.loads(b.recv(65536))
+        time.sleep(0.001)
+    a.close()
+    b.close()
+
+def _tick_work(rows):
+    # Telemetry-like rows with reference cycles so the cyclic GC has real work to do
+    samples = []
+    for i in range(200):
+        sample = {"id": i, "row": [i * 0.1] * 7}
+        sample["self"] = sample
+        samples.append(sample)
+    rows.append(samples)
+    if len(rows) > 50:
+        rows.pop(0)
+
+def _run_config(config, duration, results):
+    # Long-lived startup state, so full collections have a heap to scan
+    state = [{"key": i, "value": [i] * 4} for i in range(200_000)]
+
+    stop = threading.Event()
+    workers = [threading.Thread(target=_network_thread, args=(stop,), daemon=True) for _ in range(4)]
+    for w in workers:
+        w.start()
+
+    profile = _profile_for(config).apply()
+    scheduler = loop_scheduler.LoopScheduler(robot_params.LoopConfig.BASE_RATE_HZ, name=config)
+    profiler = loop_profiler.LoopProfiler(config)
+    rows = []
+
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        scheduler.wait()
+        start = time.perf_counter()
+        _tick_work(rows)
+        profiler.record("tick", time.perf_counter() - start)
+        profile.collect_in_slack(scheduler.time_until_deadline())
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+    stop.set()
+
+    s = scheduler.stats()
+    tick = profiler.snapshot(include_buckets=False)["phases"]["tick"]
+    results.put({
+        "config": config,
+        "ticks": s["ticks"],
+        "overruns": s["overruns"],
+        "skipped": s["skipped"],
+        "jitter_mean_ms": s["jitter_mean_ms"],
+        "jitter_p99_ms": s["jitter_p99_ms"],
+        "jitter_max_ms": s["jitter_max_ms"],
+        "work_p99_ms": tick["p99_us"] / 1000.0,
+        "work_max_ms": tick["max_us"] / 1000.0,
+        "minor_faults": usage_end.ru_minflt - usage_start.ru_minflt,
+        "report": profile.report(),
+        "state": len(state),
+    })
+
+def run(config, duration):
+    results = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_run_config, args=(config, duration, results))
+    proc.start()
+    result = results.get(timeout=duration + 60)
+    proc.join(timeout=5)
+    if proc.is_alive():
+        proc.kill()
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", nargs="+", choices=CONFIGS, default=CONFIGS)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to measure per configuration")
+    args = parser.parse_args()
+
+    rows = []
+    for config in args.config:
+        r = run(config, args.duration)
+        print(r["report"])
+        rows.append(r)
+
+    print()
+    print(f"{'config':<10}{'ticks':>8}{'over':>6}{'skip':>6}{'mean ms':>10}{'p99 ms':>10}{'max ms':>10}"
+          f"{'work p99':>10}{'work max':>10}{'faults':>8}")
+    for r in rows:
+        print(f"{r['config']:<10}{r['ticks']:>8}{r['overruns']:>6}{r['skipped']:>6}{r['jitter_mean_ms']:>10.3f}"
+              f"{r['jitter_p99_ms']:>10.3f}{r['jitter_max_ms']:>10.3f}{r['work_p99_ms']:>10.3f}"
+              f"{r['work_max_ms']:>10.3f}{r['minor_faults']:>8}")
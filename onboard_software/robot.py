@@ -1,22 +1,51 @@
 from __future__ import annotations
 import os
 import sys
+import json
 import subprocess
 import server
+import async_server
 import threading
 import time
+from dataclasses import astuple
 import teleOp
 import auto
 from subsystems import drivetrain
 from subsystems import auger
 from library import controller
+from library import flight_recorder
+from library import loop_profiler
+from library import loop_scheduler
+from library import motor_backend
+from library import motor_config
+from library import realtime
+from library import startup
+from library import task_scheduler
+from library import telemetry_logger
+from library import telemetry_sampler
+from library.motor_backend import motor_controller as mc
 import robot_params
 
-sys.path.append(os.path.join(os.path.dirname(__file__), '../library/motor_controller/build'))
-import motor_controller as mc  # type: ignore
+
+def can_bus_ready(interface: str = "can0", bitrate: int = 1_000_000, txqueuelen: int = 1000):
+    """True if the interface is already up as a CAN link at this bitrate and queue length."""
+    try:
+        result = subprocess.run(["ip", "-details", "-json", "link", "show", "dev", interface],
+                                capture_output=True, text=True, timeout=2)
+        link = json.loads(result.stdout)[0] if result.returncode == 0 else {}
+    except (OSError, subprocess.TimeoutExpired, ValueError, IndexError):
+        return False
+    linkinfo = link.get("linkinfo", {})
+    return ("UP" in link.get("flags", []) and linkinfo.get("info_kind") == "can"
+            and linkinfo.get("info_data", {}).get("bittiming", {}).get("bitrate") == bitrate
+            and link.get("txqlen") == txqueuelen)
 
 def init_can_bus(interface: str = "can0", bitrate: int = 1_000_000):
     """Bring up the CAN bus interface. Requires root privileges."""
+    if can_bus_ready(interface, bitrate):
+        # e.g. after a restart of the robot process: reconfiguring would only drop the link
+        print(f"[CAN] {interface} is already up at {bitrate} bps")
+        return
     commands = [
         ["sudo", "ip", "link", "set", interface, "down"],
         ["sudo", "ip", "link", "set", interface, "type", "can", "bitrate", str(bitrate)],
@@ -31,68 +60,266 @@ def init_can_bus(interface: str = "can0", bitrate: int = 1_000_000):
     print(f"[CAN] {interface} is up at {bitrate} bps")
 
 class Robot:
+    STARTUP_TIMEOUT_S = 60 # Wait this long for READY from mission control
+
     def __init__(self):
         self.current_mode = None
         self.running = True
+        self.loop_scheduler = None
+        self.realtime = None
+        self.recorder = None
 
         # Initialize global timer
         robot_params.robot_timer = robot_params.RobotTimer()
 
+        # Independent stages run concurrently, e.g. the server waits for the laptop
+        # while the CAN bus and motors come up
+        self._ready = False
+        self._startup = startup.StartupSequence()
+        self._startup.add("can_bus", self._start_can_bus)
+        self._startup.add("motors", self._start_motors, after=["can_bus"])
+        self._startup.add("motor_verify", self._verify_motors, after=["motors"])
+        self._startup.add("server", self._start_server)
+        self._startup.add("loop_setup", self._setup_loop, after=["motors", "server"])
+        self._startup.add("ready", self._wait_for_ready, after=["server"])
+        try:
+            self._startup.run()
+        except BaseException:
+            if getattr(self, "server", None) is not None:
+                self.server.stop() # Don't leave the server thread running behind a failed startup
+            raise
+        finally:
+            print(self._startup.report())
+
+        if not self._ready:
+            print("[Robot] Timed out waiting for READY from mission control")
+            self.stop()
+            return
+        robot_params.robot_timer.start()
+        print("[Robot] Startup complete!")
+
+    def _start_can_bus(self):
         # Bring up CAN bus before accessing hardware
-        init_can_bus("can0", 1_000_000)
+        if not motor_backend.SIMULATED:
+            init_can_bus("can0", 1_000_000)
 
-        # Initialize hardware
+    def _start_motors(self):
         self.motor_controller = mc.MotorController.get_instance("can0")
         self.drivetrain = drivetrain.Drivetrain(self.motor_controller)
         self.auger = auger.Auger(self.motor_controller)
+        # Feedback is read once per tick into the sampler; every telemetry consumer reads from it
+        self.sampler = telemetry_sampler.TelemetrySampler(self.motor_controller, robot_params.LoggingConfig.SAMPLE_HISTORY)
+        self.drivetrain.attach_sampler(self.sampler)
+        self.auger.attach_sampler(self.sampler)
+        print(motor_config.cache.report())
+
+    def _verify_motors(self):
+        if robot_params.RobotConfig.verifyMotorConfigs:
+            motor_config.ConfigVerifier(self.motor_controller, motor_config.cache).verify(
+                {**self.drivetrain.motor_configs, **self.auger.motor_configs})
 
-        # Initialize server
-        self.server = server.Server()
+    def _start_server(self):
+        if robot_params.NetworkConfig.useAsyncServer:
+            self.server = async_server.AsyncServer()
+        else:
+            self.server = server.Server()
         threading.Thread(target=self.server.start).start()
 
+    def _setup_loop(self):
         # Initialize controller and run modes
         self.controller = controller.Controller(self)
         self.teleop = teleOp.TeleOp(self)
         self.auto = auto.Auto(self)
 
-        startup_timeout = 60 # seconds
-        startup_start = time.monotonic()
-        while self.server.get_command() != "READY":
-            if time.monotonic() - startup_start > startup_timeout:
-                print("[Robot] Timed out waiting for READY from mission control")
-                self.stop()
+        # Per-phase loop timing, available to mission control on request
+        self.profiler = loop_profiler.LoopProfiler("Robot profile")
+        self.profiler.set_budget("tick", 1.0 / robot_params.LoopConfig.BASE_RATE_HZ)
+        self.server.profile_source = self.profile_snapshot
+
+        # Register periodic tasks, each at its own rate
+        self.tasks = task_scheduler.TaskScheduler(robot_params.LoopConfig.BASE_RATE_HZ, profiler=self.profiler)
+        self._register_tasks()
+
+        # Black box: the last minute of ticks, readable after a crash or SIGKILL
+        log_config = robot_params.LoggingConfig
+        if log_config.useFlightRecorder:
+            self.recorder = flight_recorder.FlightRecorder(
+                os.path.join(os.path.dirname(__file__), 'logs', 'flight_recorder.frec'), self.sampler, self.motor_controller,
+                seconds=log_config.FLIGHT_RECORDER_SECONDS, rate_hz=robot_params.LoopConfig.BASE_RATE_HZ,
+                maintenance=telemetry_logger.maintenance)
+
+    def _wait_for_ready(self):
+        # Woken by the mailbox as soon as a command arrives instead of polling
+        mailbox = self.server.mailbox
+        deadline = time.monotonic() + self.STARTUP_TIMEOUT_S
+        while not self._startup.failed.is_set():
+            mailbox.wakeup.clear()
+            if self.server.get_command() == "READY":
+                self._ready = True
                 return
-            time.sleep(0.1)
-        robot_params.robot_timer.start()
-        print("[Robot] Startup complete!")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            mailbox.wakeup.wait(min(remaining, 0.1))
+
+    def _register_tasks(self):
+        loop = robot_params.LoopConfig
+        # Control runs before the motor update so new setpoints go out on the same tick
+        self.tasks.register("control", self._control_step, loop.UPDATE_RATE_HZ, budget_s=0.004)
+        motor_update = self.tasks.register("motor_update", self._motor_update, loop.MOTOR_UPDATE_RATE_HZ, budget_s=0.003, critical=True)
+        # Snapshot the feedback right after each update, on the same ticks
+        self.tasks.register("telemetry_sample", self.sampler.sample, loop.MOTOR_UPDATE_RATE_HZ, budget_s=0.001,
+                            critical=True, phase=motor_update.phase)
+        self.tasks.register("telemetry", self.publish_telemetry, loop.UPDATE_RATE_HZ)
+        self.drivetrain.register_tasks(self.tasks)
+        self.auger.register_tasks(self.tasks)
+
+    def _control_step(self):
+        if self.current_mode == "TELEOP":
+            self.teleop.run_teleOp_step()
+        elif self.current_mode == "AUTO":
+            self.auto.run_auto_step()
+
+    def _motor_update(self):
+        # Motors only get heartbeats once a mode has been selected
+        if self.current_mode is None:
+            return
+        if robot_params.RobotConfig.useMotorUpdateThread:
+            # CAN I/O moves to a native thread; duty cycles and feedback go through its mailbox/snapshots
+            if not self.motor_controller.is_update_thread_running():
+                self.motor_controller.start_update_thread(robot_params.LoopConfig.MOTOR_THREAD_RATE_HZ)
+        # With the thread running this only copies its latest snapshot into the feedback view
+        self.motor_controller.update()
 
     def send_telemetry(self, data):
         self.server.send_telemetry(data)
 
+    def publish_telemetry(self):
+        """Offer this tick's telemetry topics. Only topics mission control subscribed to are built and sent."""
+        topics = self.server.topics
+        topics.publish("motors", self._all_motor_rows)
+        topics.publish("controller", lambda: (self.current_mode, *astuple(self.controller.AxisValues)))
+        self.drivetrain.publish_telemetry(topics)
+        self.auger.publish_telemetry(topics)
+
+    def _all_motor_rows(self):
+        # One (motor_id, duty_cycle, velocity, position, current, temperature, voltage) row per motor
+        # that has been updated (timestamp set)
+        return [row[:7] for row in self.sampler.latest().tolist() if row[7]] or None
+
+    def profile_snapshot(self):
+        profile = self.profiler.snapshot()
+        if self.loop_scheduler is not None:
+            profile["loop"] = self.loop_scheduler.stats()
+        profile["tasks"] = self.tasks.stats()
+        return profile
+
+    def _apply_realtime_profile(self):
+        # Opt-in: scheduling, CPU pinning, locked memory and GC only in idle slack
+        rt = robot_params.RealtimeConfig
+        self.realtime = realtime.RealtimeProfile(
+            fifo_priority=rt.FIFO_PRIORITY if rt.useFifo else None,
+            nice=rt.NICE_VALUE,
+            control_cpus=rt.CONTROL_CPUS,
+            network_cpus=rt.NETWORK_CPUS,
+            lock_memory=rt.lockMemory,
+            freeze_gc=rt.freezeGc,
+        ).apply()
+        print(self.realtime.report())
+
     def run(self):
+        if robot_params.RealtimeConfig.enabled:
+            self._apply_realtime_profile() # Server threads exist by now, so they get pinned too
+
+        # Sleep until each base-rate deadline; incoming button/mode events wake the loop early
+        scheduler = loop_scheduler.LoopScheduler(robot_params.LoopConfig.BASE_RATE_HZ,
+                                                 wakeup=self.server.mailbox.wakeup, name="Robot loop")
+        self.loop_scheduler = scheduler
+        profiler = self.profiler
+        recorder = self.recorder
+        clock = time.perf_counter
+        axes_received = False
 
         while self.running:
 
-            cmd = self.server.get_command()
-            if cmd == "SHUTDOWN":
+            tick = scheduler.wait()
+            tick_start = clock()
+
+            # Handle every queued button/mode event, then only the freshest axis sample
+            events, axes = self.server.get_commands()
+            if recorder is not None:
+                for cmd in events:
+                    recorder.command(cmd)
+            if "SHUTDOWN" in events:
                 self.stop()
                 break
 
-            if cmd is not None:
+            for cmd in events:
                 self.current_mode = cmd[0]
                 self.controller.process_controller_inputs(cmd)
+            if axes is not None:
+                self.current_mode = axes[0]
+                self.controller.process_controller_inputs(axes)
+                axes_received = True
+            commands_end = clock()
+            profiler.record("commands", commands_end - tick_start)
+
+            if not tick:
+                continue
+
+            self.tasks.run_tick()
+            tasks_end = clock()
+            profiler.record("tasks", tasks_end - commands_end)
+
+            if recorder is not None:
+                recorder.record(robot_params.robot_timer.elapsed(), self.current_mode,
+                                self.controller.AxisValues, axes_received)
+                axes_received = False
+                record_end = clock()
+                profiler.record("record", record_end - tasks_end)
+                tasks_end = record_end
+
+            # Everything sent this tick leaves as one telemetry batch
+            self.server.flush_telemetry()
+            tick_end = clock()
+            profiler.record("flush", tick_end - tasks_end)
+            profiler.record("tick", tick_end - tick_start)
 
-            if self.current_mode == "TELEOP":
-                self.teleop.run_teleOp_step()
-            elif self.current_mode == "AUTO":
-                self.auto.run_auto_step()
+            if self.realtime is not None:
+                gc_time = self.realtime.collect_in_slack(scheduler.time_until_deadline())
+                if gc_time:
+                    profiler.record("gc", gc_time)
     
     def stop(self):
         print("[Robot] Stopping robot")
         self.running = False
+        if self.loop_scheduler is not None:
+            print(self.loop_scheduler.report())
+            print(self.tasks.report())
+            print(self.profiler.report())
+            try:
+                self.profiler.dump(extra={"loop": self.loop_scheduler.stats(), "tasks": self.tasks.stats()})
+            except OSError as e:
+                print(f"[Robot] Failed to write loop profile: {e}")
+        if self.realtime is not None:
+            print(self.realtime.report())
+            self.realtime.release()
         self.server.stop()
         self.drivetrain.stop()
         self.auger.stop()
+        if self.motor_controller.is_update_thread_running():
+            self.motor_controller.stop_update_thread() # Final pass sends the zero duty cycles set above
+            try:
+                stats = self.motor_controller.get_update_thread_stats()
+            except RuntimeError as e: # Raised once; shutdown carries on
+                print(f"[Robot] {e}")
+                stats = self.motor_controller.get_update_thread_stats()
+            print(f"[Robot] Motor update thread: {stats}")
+        if self.recorder is not None:
+            # Last record holds the SHUTDOWN command and the zeroed setpoints
+            self.recorder.record(robot_params.robot_timer.elapsed(), self.current_mode, self.controller.AxisValues)
+            self.recorder.close()
+        print(telemetry_logger.maintenance.report())
         
 if __name__ == "__main__":
     Robot().run()
@@ -9,10 +9,52 @@ robot_timer = None
 class RobotConfig:
     useDrivetrain = False
     useAuger = True
+    useSimulatedMotors = False  # True runs without CAN/SPARK MAXes; the MOTOR_BACKEND env variable overrides this
+    useMotorUpdateThread = False  # Native thread runs motor updates at LoopConfig.MOTOR_THREAD_RATE_HZ instead of the loop
+    verifyMotorConfigs = True  # Read every motor's flashed config back at startup and report mismatches
+    useMotorConfigCache = True  # Skip configuring motors whose flashed config is known to match (state/motor_config_cache.json); needs verifyMotorConfigs
+    forceMotorReflash = False  # Configure and flash every motor on this boot; MOTOR_REFLASH=1 does the same
+
+class SimConfig:
+    CAN_LATENCY_S = 0.002  # Command and feedback delay of the simulated CAN bus
+    UPDATE_COST_S = 0.0003  # Time update() spends per motor, like the real CAN transactions
+    BUS_VOLTAGE = 12.6
+
+class NetworkConfig:
+    useAsyncServer = False # Single-thread asyncio server (async_server.py); stays off until server_benchmark.py shows a win on the Pi
 
 class LoopConfig:
-    UPDATE_RATE_HZ = 50  # Change this to adjust loop frequency
+    BASE_RATE_HZ = 100  # Robot.run tick rate; every task rate below must divide it
+    UPDATE_RATE_HZ = 50  # Change this to adjust loop frequency (TeleOp/Auto periodic_loop)
     UPDATE_PERIOD_S = 1.0 / UPDATE_RATE_HZ  # 0.02s at 50Hz
+    MOTOR_UPDATE_RATE_HZ = 100  # motor_controller.update(): heartbeats, duty cycles, feedback
+    MOTOR_THREAD_RATE_HZ = 200  # Rate of the motor_controller background update thread, when enabled
+    LOGGING_RATE_HZ = 10  # Subsystem CSV logging
+    CONSOLE_RATE_HZ = 2  # Subsystem console printing
+
+class RealtimeConfig:
+    enabled = False  # Opt-in real-time profile for the control thread (see library/realtime.py)
+    useFifo = True  # SCHED_FIFO for the control thread; falls back to NICE_VALUE without privileges
+    FIFO_PRIORITY = 40  # 1-99; kept below threaded IRQ handlers (50) so CAN/network interrupts still run
+    NICE_VALUE = -10
+    CONTROL_CPUS = {3}  # Pi 4 cores 0-3: the control loop gets the last core to itself...
+    NETWORK_CPUS = {0, 1, 2}  # ...and the server threads share the others
+    lockMemory = True  # mlockall() so page faults can't stall a tick
+    freezeGc = True  # gc.freeze() after startup and only collect in the loop's idle slack
+
+class LoggingConfig:
+    useBinaryLogs = False  # Columnar .tlog files written by a background thread instead of CSV (tlog_to_csv.py converts)
+    CHUNK_ROWS = 256  # Rows per binary chunk; a chunk is written and fsynced as a whole
+    FLUSH_INTERVAL_S = 1.0  # Hand over a partly filled chunk after this long, bounding what a crash loses
+    MAX_SEGMENT_BYTES = 16 * 1024 * 1024  # Start a new log segment past this size...
+    MAX_SEGMENT_S = 15 * 60  # ...or after this long
+    INDEX_BLOCK_ROWS = 256  # CSV rows per time index block (binary logs index every chunk)
+    compressLogs = True  # gzip closed segments in a low-priority child process (library/log_maintenance.py)
+    LOG_BUDGET_BYTES = 1024 * 1024 * 1024  # Oldest files in logs/ are deleted beyond this; None = no limit
+    logEverySample = False  # Log every sampler tick since the last logging run instead of the newest one at LOGGING_RATE_HZ
+    SAMPLE_HISTORY = 256  # Ticks of motor feedback the telemetry sampler keeps for consumers that read every sample
+    useFlightRecorder = True  # Every tick's commands, setpoints and feedback in a crash-surviving ring (decode_flight_recorder.py)
+    FLIGHT_RECORDER_SECONDS = 60  # Ticks kept in the ring, at LoopConfig.BASE_RATE_HZ
 
 class RobotTimer:
     def __init__(self):
@@ -26,8 +68,17 @@ class RobotTimer:
             return 0.0
         return time.monotonic() - self._start_time
 
+    def elapsed_at(self, monotonic_ns):
+        """Timer seconds at a time.monotonic_ns() reading, e.g. a telemetry sample's time."""
+        if self._start_time is None:
+            return 0.0
+        return monotonic_ns / 1e9 - self._start_time
+
     def timestamp(self):
-        e = self.elapsed()
-        minutes = int(e) // 60
-        seconds = e % 60
+        return self.format(self.elapsed())
+
+    @staticmethod
+    def format(elapsed):
+        minutes = int(elapsed) // 60
+        seconds = elapsed % 60
         return f"[T+{minutes:02d}:{seconds:05.2f}]"
\ No newline at end of file
@@ -1,8 +1,13 @@
 import socket
 import threading
-import json
 import queue
 import time
+from collections import deque
+from library import protocol
+from library import retransmit
+from library import command_mailbox
+from library import telemetry_codec
+from library import topics
 
 class Server: # Robot Server
     def __init__(self):
@@ -15,100 +20,262 @@ class Server: # Robot Server
         self.server_socket.bind((self.host, self.port))
         print("[Server] Socket binded to %s:%d" % (self.host, self.port))
         self.server_socket.listen(1) # Allow only 1 connection
+        # SOCK_DGRAM is used for the latest-value joystick axis stream
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_socket.bind((self.host, self.port))
+        self.udp_socket.settimeout(1) # Wake up once a second to check self.running
         self.client_socket = None
         self.input_queue = queue.Queue() # For incoming commands and ACKs
         self.output_queue = queue.Queue() # For outgoing telemetry and ACKs
-        self.cmd_queue = queue.Queue() # Queue to send incoming commands
+        self.mailbox = command_mailbox.CommandMailbox() # Incoming commands for the control loop
         self.running = True
-        self.pending_acks = {}
         self.ack_timeout = 0.5 # seconds
+        self.retransmit = retransmit.RetransmitScheduler(base_timeout=self.ack_timeout, max_in_flight=32, name="Server")
         self.message_id = -1
+        self.telemetry_seq = 0 # Sequence number of the next telemetry sample
+        self._telemetry_lock = threading.Lock()
+        self._telemetry_batch = [] # Samples collected during the current control tick
+        self._telemetry_frames = {} # frame id -> (first seq, last seq) for unacknowledged batches
+        self._telemetry_encoders = {} # topic -> MotorTelemetryEncoder, so keyframes stay per topic
+        self.topics = topics.TopicRegistry(self.send_telemetry) # What mission control has subscribed to
+        self.profile_source = None # Callable returning the loop timing profile for get_profile requests
+        self._profile_requests = deque(maxlen=16) # Recently answered get_profile ids, to skip resent requests
+        self.wire_format = protocol.FORMAT_JSON
+        self._stream = None
+        self.client_ip = None
+        self.udp_enabled = False
 
     def start(self):
         print("[Server] Waiting for client...")
         self.client_socket, addr = self.server_socket.accept()
         print("[Server] Got connection from", addr)
+        self.client_ip = addr[0]
+        self._negotiate_format()
 
         threading.Thread(target=self._receiver_thread).start()
+        if self.udp_enabled:
+            threading.Thread(target=self._udp_receiver_thread).start()
         threading.Thread(target=self._sender_thread).start()
         threading.Thread(target=self._ack_monitor_thread).start()
 
         while self.running:
             try:
                 msg = self.input_queue.get(timeout=1)  # Wait up to 1 second for a message
-                if msg.get('type') == 'command':
-                    self.cmd_queue.put(msg)
-                    # Send ACK for received command
-                    ack = {"type": "ack", "id": msg.get('id')}
-                    self.output_queue.put(ack)
-                elif msg.get('type') == 'ack':
-                    # Handle ACK: Remove from pending
-                    msg_id = msg.get('id')
-                    if msg_id in self.pending_acks:
-                        del self.pending_acks[msg_id]
+                for reply in self._dispatch(msg):
+                    self.output_queue.put(reply)
             except queue.Empty:
                 continue
 
-    def get_command(self):
+    def _dispatch(self, msg):
+        """Handle one incoming message, returning the messages to send back."""
+        if msg.get('type') == 'command':
+            self.mailbox.put(msg.get('data'))
+            # Send ACK for received command
+            return [{"type": "ack", "id": msg.get('id')}]
+        elif msg.get('type') == 'ack':
+            # Handle ACK: Remove from pending, which may free window space for queued messages
+            return self.retransmit.ack(msg.get('id'))
+        elif msg.get('type') == 'sack':
+            return self._handle_sack(msg.get('cum', -1), msg.get('ranges', []))
+        elif msg.get('type') == 'subscribe':
+            self.topics.subscribe(msg.get('topic'), msg.get('rate_hz'), msg.get('decimation', 1))
+            return [{"type": "ack", "id": msg.get('id')}]
+        elif msg.get('type') == 'unsubscribe':
+            self.topics.unsubscribe(msg.get('topic'))
+            return [{"type": "ack", "id": msg.get('id')}]
+        elif msg.get('type') == 'get_profile':
+            return [{"type": "ack", "id": msg.get('id')}] + self._profile_reply(msg.get('id'))
+        return []
+
+    def _profile_reply(self, request_id):
+        # A resent request (our ACK was lost) only needs the ACK again, not a second profile
+        if request_id in self._profile_requests:
+            return []
+        self._profile_requests.append(request_id)
+        profile = self.profile_source() if self.profile_source is not None else None
+        reply = {"type": "profile", "id": request_id, "data": profile}
+        if self._fits_in_frame(reply):
+            return [reply]
+        # Histogram buckets are what grows; percentiles and counts still fit
+        for phase in profile.get("phases", {}).values():
+            phase.pop("buckets", None)
+        profile["buckets_omitted"] = True
+        if self._fits_in_frame(reply):
+            return [reply]
+        return [{"type": "profile", "id": request_id, "data": None, "error": "profile too large to send"}]
+
+    def _fits_in_frame(self, msg):
         try:
-            msg = self.cmd_queue.get_nowait()  # Get the full message
-            print(f"[Server] Sent to robot: {msg}")
-            return msg.get('data')  # Return only the 'data' part
-        except queue.Empty:
-            return None  # No command available
+            protocol.encode_message(msg, self.wire_format)
+        except protocol.ENCODE_ERRORS:
+            return False
+        return True
+
+    def _handle_sack(self, cum, ranges):
+        # One SACK can acknowledge many telemetry batches
+        with self._telemetry_lock:
+            acked = [frame_id for frame_id, (first, last) in self._telemetry_frames.items()
+                     if retransmit.sack_covers(cum, ranges, first, last) or frame_id not in self.retransmit]
+            for frame_id in acked:
+                del self._telemetry_frames[frame_id]
+        return self.retransmit.ack_many(acked)
+
+    def _negotiate_format(self):
+        # The first line from the client is either a hello or (old clients) a JSON message
+        self._stream = self.client_socket.makefile('rb')
+        try:
+            first = protocol.read_message(self._stream, protocol.FORMAT_JSON)
+        except protocol.MalformedMessage as e:
+            print(f"[Server] Skipping message: {e}")
+            first = {} # Not a hello, so an old client: stay on JSON
+        if first is None:
+            return
+        reply = self._handle_hello(first)
+        if reply is not None:
+            self.client_socket.sendall(reply)
+        else:
+            self.input_queue.put(first)
+        self.client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _handle_hello(self, first):
+        """Pick the wire format from the client's first message. Returns the encoded reply, or None for old clients."""
+        reply = None
+        if first.get('type') == 'hello':
+            self.wire_format = protocol.choose_format(first)
+            self.udp_enabled = bool(first.get('udp'))
+            udp_port = self.port if self.udp_enabled else None
+            reply = protocol.encode_line(protocol.hello_reply(self.wire_format, udp_port))
+        print(f"[Server] Using {self.wire_format} wire format" + (" with UDP axes" if self.udp_enabled else ""))
+        return reply
+
+    def get_command(self):
+        """Next command event, or the newest axis sample if there are no events (None if empty)."""
+        return self.mailbox.get()
+
+    def get_commands(self):
+        """All pending command events in order, plus the newest axis sample (or None)."""
+        return self.mailbox.drain()
+
+    def _udp_receiver_thread(self):
+        # Axis samples are unreliable and unacknowledged: only the newest one matters
+        while self.running:
+            try:
+                datagram, addr = self.udp_socket.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self._on_axis_datagram(datagram, addr)
+
+    def _on_axis_datagram(self, datagram, addr):
+        if addr[0] != self.client_ip:
+            return
+        decoded = protocol.decode_axis_datagram(datagram)
+        if decoded is None:
+            return
+        seq, axes = decoded
+        self.mailbox.put_axes(axes, seq)
 
     def _receiver_thread(self):
-        stream = self.client_socket.makefile('r')
         try:
             while self.running:
-                raw = stream.readline() # Read a line from the stream
-                if not raw: # If no data is read (connection closed)
+                try:
+                    msg = protocol.read_message(self._stream, self.wire_format)
+                except ConnectionError:
+                    msg = None
+                except protocol.MalformedMessage as e:
+                    print(f"[Server] Skipping message: {e}")
+                    continue
+                if msg is None: # If no data is read (connection closed)
                     print("[Server] Connection closed by controller.")
                     self.stop()
                     break
-                raw = raw.strip()
-                if not raw: # If the string is empty
-                    continue
-                msg = json.loads(raw)
                 self.input_queue.put(msg)
                 #print(f"[Server] Received: {msg}")
         finally:
-            stream.close()
+            self._stream.close()
 
-    def send_telemetry(self, data):
-        msg = {"type": "telemetry", "id": self.message_id, "data": data}
-        self.output_queue.put(msg)
-        self.pending_acks[self.message_id] = (msg, time.time())
-        self.message_id -= 1
+    def send_telemetry(self, data, topic=None):
+        """Queue a telemetry sample. It is sent with the rest of the tick's samples by flush_telemetry()."""
+        if self.wire_format == protocol.FORMAT_BINARY and protocol.is_motor_rows(data):
+            encoder = self._telemetry_encoders.get(topic)
+            if encoder is None:
+                encoder = self._telemetry_encoders[topic] = telemetry_codec.MotorTelemetryEncoder()
+            data = encoder.encode(data) # Keyframe + quantized deltas, column-wise
+        with self._telemetry_lock:
+            self._telemetry_batch.append((topic, data))
+
+    def flush_telemetry(self):
+        """Pack this tick's telemetry samples into one batch frame. Call once per control tick."""
+        with self._telemetry_lock:
+            if not self._telemetry_batch:
+                return
+            samples = self._telemetry_batch
+            self._telemetry_batch = []
+            first = self.telemetry_seq
+            self.telemetry_seq += len(samples)
+            self._prune_telemetry_frames()
+            # Oldest sequence still worth resending, so the client can skip gaps from dropped batches
+            base = min((f for f, _ in self._telemetry_frames.values()), default=first)
+            msg = {"type": "telemetry_batch", "id": self.message_id, "base": base, "seq": first, "data": samples}
+            self._telemetry_frames[self.message_id] = (first, self.telemetry_seq - 1)
+            self.message_id -= 1
+        # Telemetry is droppable: skipped when the window is full and never resent once stale
+        sent = self.retransmit.track(msg, droppable=True)
+        if not sent:
+            self._replace_dropped_keyframes(samples)
+        for m in sent:
+            self._enqueue(m)
+
+    def _replace_dropped_keyframes(self, samples):
+        # Deltas after a dropped keyframe can't be decoded, so start a new one next tick
+        for topic, data in samples:
+            if isinstance(data, telemetry_codec.EncodedMotorFrame) and data.keyframe:
+                self._telemetry_encoders[topic].request_keyframe()
 
+    def _prune_telemetry_frames(self):
+        # Batches the scheduler dropped, gave up on or saw ACKed (old clients ACK instead of
+        # SACKing) will never be SACKed, so forget them here. That keeps the dict, and the
+        # base scan above, within the retransmit window however long the link has no SACKs.
+        for frame_id in [frame_id for frame_id in self._telemetry_frames if frame_id not in self.retransmit]:
+            del self._telemetry_frames[frame_id]
+        while len(self._telemetry_frames) >= self.retransmit.max_in_flight:
+            del self._telemetry_frames[next(iter(self._telemetry_frames))] # Oldest first
+
+    def _enqueue(self, msg):
+        self.output_queue.put(msg)
 
     def _sender_thread(self):
-        stream = self.client_socket.makefile('w')
-        try:
-            while self.running:
-                try:
-                    msg = self.output_queue.get(timeout=1) # Wait up to 1 second for a message
-                    json_str = json.dumps(msg) + '\n'
-                    stream.write(json_str)
-                    stream.flush() # Flush the stream to ensure data is sent immediately
-                    #print(f"[Server] Sent: {msg}")
-                except queue.Empty:
-                    continue
-        finally:
-            stream.close()
+        while self.running:
+            try:
+                msg = self.output_queue.get(timeout=1) # Wait up to 1 second for a message
+            except queue.Empty:
+                continue
+            try:
+                data = protocol.encode_message(msg, self.wire_format)
+            except protocol.ENCODE_ERRORS as e:
+                self._drop_unencodable(msg, e)
+                continue
+            try:
+                self.client_socket.sendall(data)
+                #print(f"[Server] Sent: {msg}")
+            except OSError:
+                break
+
+    def _drop_unencodable(self, msg, error):
+        # It would fail the same way on every resend, so stop tracking it as well
+        print(f"[Server] Dropping unsendable {msg.get('type')} message {msg.get('id')}: {type(error).__name__}: {error}")
+        if msg.get('type') not in ('ack', 'sack'):
+            for m in self.retransmit.ack(msg.get('id')):
+                self._enqueue(m)
 
     def _ack_monitor_thread(self):
         while self.running:
-            current_time = time.time()
-            to_resend = []
-            for msg_id, (msg, sent_time) in self.pending_acks.items():
-                if current_time - sent_time > self.ack_timeout:
-                    to_resend.append(msg)
-            for msg in to_resend:
+            for msg in self.retransmit.due():
                 print(f"[Server] Resending unacknowledged message: {msg}")
                 self.output_queue.put(msg)
-                self.pending_acks[msg['id']] = (msg, time.time()) # Update the timestamp in pending ACKs
-            time.sleep(0.5)  # Check every 0.5 seconds
+            # Sleep until the earliest resend deadline instead of rescanning every message
+            time.sleep(min(self.retransmit.time_until_next(default=self.ack_timeout), self.ack_timeout))
 
     def stop(self):
         self.running = False
@@ -117,3 +284,4 @@ class Server: # Robot Server
         except OSError:
             pass
         self.server_socket.close()
+        self.udp_socket.close()
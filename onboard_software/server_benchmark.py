@@ -0,0 +1,134 @@
+"""
+Benchmark the threaded Server against the asyncio AsyncServer.
+
+Runs a 50 Hz control loop (the same get_command / send_telemetry pattern as
+Robot.run) next to each server while a simulated mission control client streams
+axis commands at 20 Hz, button events and ACKs. Reports control loop jitter and
+CPU time of the robot process for each implementation.
+
+Usage (on the Pi):
+    python server_benchmark.py --duration 30
+    python server_benchmark.py --impl async --duration 60
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../mission_control'))
+
+import robot_params
+
+def _quiet():
+    import builtins
+    builtins.print = lambda *args, **kwargs: None # Per-message logging would dominate the numbers
+
+def _robot_process(impl, duration, results):
+    import server
+    import async_server
+
+    _quiet()
+
+    srv = async_server.AsyncServer() if impl == "async" else server.Server()
+    threading.Thread(target=srv.start, daemon=True).start()
+
+    # Wait for the client before measuring
+    while srv.get_command() != "READY":
+        time.sleep(0.01)
+
+    period = robot_params.LoopConfig.UPDATE_PERIOD_S
+    lateness = []
+    commands = 0
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.monotonic()
+    next_tick = start + period
+
+    while time.monotonic() - start < duration:
+        now = time.monotonic()
+        if now < next_tick:
+            time.sleep(next_tick - now)
+        woke = time.monotonic()
+        lateness.append(woke - next_tick)
+        next_tick += period
+
+        while srv.get_command() is not None:
+            commands += 1
+        srv.send_telemetry([(3, 0.25, 1200.0, 40.0, 3.2, 31.0, 12.4)])
+        srv.flush_telemetry()
+
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+    srv.stop()
+
+    lateness_ms = sorted(v * 1000.0 for v in lateness)
+    results.put({
+        "impl": impl,
+        "ticks": len(lateness_ms),
+        "commands": commands,
+        "cpu_percent": 100.0 * cpu / duration,
+        "jitter_mean_ms": statistics.fmean(lateness_ms),
+        "jitter_stdev_ms": statistics.pstdev(lateness_ms),
+        "jitter_p99_ms": lateness_ms[min(len(lateness_ms) - 1, math.ceil(0.99 * len(lateness_ms)) - 1)],
+        "jitter_max_ms": lateness_ms[-1],
+    })
+
+def _client_process(duration):
+    import client
+
+    _quiet()
+    c = client.Client("127.0.0.1")
+    threading.Thread(target=c.connect, daemon=True).start()
+    while not c.connected.wait(timeout=0.1):
+        c = client.Client("127.0.0.1")
+        threading.Thread(target=c.connect, daemon=True).start()
+    c.send_command("READY")
+
+    start = time.monotonic()
+    i = 0
+    while time.monotonic() - start < duration + 1.0:
+        t = time.monotonic() - start
+        c.send_command(("TELEOP", math.sin(t), math.cos(t), 0.1, 0.0, -1.0, -1.0))
+        if i % 20 == 0:
+            c.send_command(("TELEOP", "A", "PRESSED" if i % 40 == 0 else "RELEASED"))
+        c.get_telemetry()
+        i += 1
+        time.sleep(0.05) # 20 Hz like Control.run
+    os._exit(0)
+
+def run(impl, duration):
+    results = multiprocessing.Queue()
+    robot = multiprocessing.Process(target=_robot_process, args=(impl, duration, results))
+    robot.start()
+    time.sleep(0.5) # Let the server bind
+    controller = multiprocessing.Process(target=_client_process, args=(duration,))
+    controller.start()
+    result = results.get(timeout=duration + 30)
+    robot.join(timeout=5)
+    if robot.is_alive():
+        robot.kill()
+    controller.join(timeout=5)
+    if controller.is_alive():
+        controller.kill()
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--impl", choices=["threaded", "async", "both"], default="both")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to measure per implementation")
+    args = parser.parse_args()
+
+    impls = ["threaded", "async"] if args.impl == "both" else [args.impl]
+    rows = [run(impl, args.duration) for impl in impls]
+
+    print()
+    print(f"{'impl':<10}{'ticks':>8}{'cmds':>8}{'CPU %':>8}{'mean ms':>10}{'stdev ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for r in rows:
+        print(f"{r['impl']:<10}{r['ticks']:>8}{r['commands']:>8}{r['cpu_percent']:>8.1f}"
+              f"{r['jitter_mean_ms']:>10.3f}{r['jitter_stdev_ms']:>10.3f}{r['jitter_p99_ms']:>10.3f}{r['jitter_max_ms']:>10.3f}")
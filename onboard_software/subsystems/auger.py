@@ -1,19 +1,18 @@
 import os
 import sys
-import time
 import robot_params
 from library import telemetry_logger
 
-sys.path.append(os.path.join(os.path.dirname(__file__), '../library/motor_controller/build'))
-import motor_controller  # type: ignore
+from library.motor_backend import motor_controller
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from library import motor_config
 from library import telemetry_logger
 
 # Subsystem Parameters
 logTelemetryData = False
 
-# Note: if this is changed, update print data on line 86 as well
+# Note: if this is changed, update log_row data in log_telemetry as well
 _LOG_COLUMNS = ["Duty Cycle", "Velocity (RPM)", "Position (ticks)", "Current (A)", "Temp (°C)", "Bus Voltage (V)"]
 
 class Auger:
@@ -21,7 +20,6 @@ class Auger:
     def __init__(self, mc):
         self.mc = mc
         self.motor_id = 3
-        self._last_telemetry_time = 0.0
         self._logger = telemetry_logger.TelemetryLogger("auger")
 
         config = motor_controller.MotorConfig()
@@ -34,10 +32,22 @@ class Auger:
         config.smart_current_free_limit = 20.0
         config.smart_current_stall_limit = 80.0
 
-        self.mc.initialize_motor(self.motor_id, config)
+        self.motor_configs = {self.motor_id: config}
+        motor_config.cache.initialize_motor(self.mc, self.motor_id, config)
         self.mc.reset_motor_position(self.motor_id)
+        self._sampler = None
         self.start_logging()
 
+    def attach_sampler(self, sampler):
+        """Read feedback from the robot's TelemetrySampler, which snapshots every motor once per tick."""
+        self._sampler = sampler
+        self._column, = sampler.columns([self.motor_id])
+        self._log_cursor = sampler.cursor()
+
+    def _feedback(self):
+        # (motor_id, duty_cycle, velocity, position, current, temperature, voltage, timestamp)
+        return self._sampler.latest()[self._column].tolist()
+
     def set_power(self, power):
         self.mc.set_motor_duty_cycle(self.motor_id, power)
 
@@ -57,36 +67,44 @@ class Auger:
         self.set_power(0.0)
         self.stop_logging()
 
-    def print_telemetry(self, duty_cycle=True, velocity=True, position=True, current=True, temperature=False, voltage=True, interval=1):
-        now = time.monotonic()
-        if now - self._last_telemetry_time < interval:
+    def publish_telemetry(self, topics):
+        topics.publish("auger", lambda: [self._feedback()[:7]])
+
+    def register_tasks(self, tasks):
+        loop = robot_params.LoopConfig
+        tasks.register("auger_log", self.log_telemetry, loop.LOGGING_RATE_HZ)
+        # Debug: print auger current and bus voltage to check if motor responds on CAN
+        tasks.register("auger_console", lambda: self.print_telemetry(False, False, False, True, False, True),
+                       loop.CONSOLE_RATE_HZ)
+
+    def log_telemetry(self):
+        if not self._logger.is_logging:
+            return
+        if robot_params.LoggingConfig.logEverySample:
+            times_ns, samples = self._log_cursor.read()
+            for time_ns, motor in zip(times_ns.tolist(), samples[:, self._column].tolist()):
+                self._logger.log_row(robot_params.robot_timer.elapsed_at(time_ns), list(motor[1:7]))
             return
-        self._last_telemetry_time = now
+        self._logger.log_row(robot_params.robot_timer.elapsed(), list(self._feedback()[1:7]))
 
-        feedback = self.mc.get_motor_feedback(self.motor_id)
+    def print_telemetry(self, duty_cycle=True, velocity=True, position=True, current=True, temperature=False, voltage=True):
+        _, fb_duty_cycle, fb_velocity, fb_position, fb_current, fb_temperature, fb_voltage, _ = self._feedback()
 
         parts = []
         if duty_cycle:
-            parts.append(f"Duty Cycle: {feedback.duty_cycle:.4f}")
+            parts.append(f"Duty Cycle: {fb_duty_cycle:.4f}")
         if velocity:
-            parts.append(f"Velocity: {feedback.velocity:.2f} RPM")
+            parts.append(f"Velocity: {fb_velocity:.2f} RPM")
         if position:
-            parts.append(f"Position: {feedback.position:.1f} ticks")
+            parts.append(f"Position: {fb_position:.1f} ticks")
         if current:
-            parts.append(f"Current: {feedback.current:.2f} A")
+            parts.append(f"Current: {fb_current:.2f} A")
         if temperature:
-            parts.append(f"Temp: {feedback.temperature:.1f} °C")
+            parts.append(f"Temp: {fb_temperature:.1f} °C")
         if voltage:
-            parts.append(f"Bus: {feedback.voltage:.2f} V")
+            parts.append(f"Bus: {fb_voltage:.2f} V")
 
         if not parts:
             return
 
         print(f"{robot_params.robot_timer.timestamp()} [Auger] " + ", ".join(parts))
-
-        if self._logger.is_logging:
-            self._logger.log_row(
-                robot_params.robot_timer.timestamp(),
-                [feedback.duty_cycle, feedback.velocity, feedback.position,
-                 feedback.current, feedback.temperature, feedback.voltage]
-            )
@@ -1,20 +1,20 @@
 import os
 import sys
-import time
 from library.util import Util
 import robot_params
 import math
+import numpy as np
 
-sys.path.append(os.path.join(os.path.dirname(__file__), '../library/motor_controller/build'))
-import motor_controller  # type: ignore
+from library.motor_backend import motor_controller
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from library import motor_config
 from library import telemetry_logger
 
 # Subsystem Parameters
 logTelemetryData = False
 
-# Note: if this is changed, update log_row data in print_telemetry as well
+# Note: if this is changed, update log_row data in log_telemetry as well
 _LOG_COLUMNS = [
     "FL Duty Cycle", "FL Velocity (RPM)", "FL Position (ticks)", "FL Current (A)", "FL Temp (°C)", "FL Bus Voltage (V)",
     "BL Duty Cycle", "BL Velocity (RPM)", "BL Position (ticks)", "BL Current (A)", "BL Temp (°C)", "BL Bus Voltage (V)",
@@ -27,13 +27,19 @@ class Drivetrain:
     def __init__(self, mc):
         self.slow_turning = True
         self.max_speed = 0.2
-        self._last_telemetry_time = 0.0
 
         self.mc = mc
         self._logger = telemetry_logger.TelemetryLogger("drivetrain")
         self.left_motor_ids = [7, 1] #front left, back left
         self.right_motor_ids = [4, 2] #front right, back right
 
+        # Batched motor calls: one crossing into motor_controller per set_power / feedback read
+        self._power_ids = np.array([self.right_motor_ids[0], self.left_motor_ids[0],
+                                    self.right_motor_ids[1], self.left_motor_ids[1]], dtype=np.int32)
+        self._powers = np.zeros(4, dtype=np.float32)
+        self._feedback_labels = ["FL", "BL", "FR", "BR"]
+        self._feedback_ids = np.array(self.left_motor_ids + self.right_motor_ids, dtype=np.int32)
+
         # This config is the same as default so technically it is not needed.
         configL = motor_controller.MotorConfig() # left motors
         configL.idle_mode = motor_controller.IdleMode.BRAKE
@@ -55,10 +61,22 @@ class Drivetrain:
         configR.smart_current_free_limit = 20.0
         configR.smart_current_stall_limit = 80.0
 
-        self.mc.initialize_motors(self.left_motor_ids, configL)
-        self.mc.initialize_motors(self.right_motor_ids, configR)
+        self.motor_configs = {**dict.fromkeys(self.left_motor_ids, configL), **dict.fromkeys(self.right_motor_ids, configR)}
+        motor_config.cache.initialize_motors(self.mc, self.left_motor_ids, configL)
+        motor_config.cache.initialize_motors(self.mc, self.right_motor_ids, configR)
         for motor_id in self.left_motor_ids + self.right_motor_ids:
             self.mc.reset_motor_position(motor_id)
+        self._sampler = None
+
+    def attach_sampler(self, sampler):
+        """Read feedback from the robot's TelemetrySampler, which snapshots every motor once per tick."""
+        self._sampler = sampler
+        self._columns = sampler.columns(self._feedback_ids.tolist()) # FL, BL, FR, BR
+        self._log_cursor = sampler.cursor()
+
+    def _feedback(self):
+        # (motor_id, duty_cycle, velocity, position, current, temperature, voltage, timestamp) per motor
+        return self._sampler.latest()[self._columns].tolist()
 
     def start_logging(self):
         self._logger.start_logging(_LOG_COLUMNS)
@@ -73,10 +91,12 @@ class Drivetrain:
         self.max_speed = max_speed
 
     def set_power(self, front_right_power, front_left_power, back_right_power, back_left_power):
-        self.mc.set_motor_duty_cycle(self.right_motor_ids[0], Util.clip(front_right_power, -self.max_speed, self.max_speed))
-        self.mc.set_motor_duty_cycle(self.left_motor_ids[0], Util.clip(front_left_power, -self.max_speed, self.max_speed))
-        self.mc.set_motor_duty_cycle(self.right_motor_ids[1], Util.clip(back_right_power, -self.max_speed, self.max_speed))
-        self.mc.set_motor_duty_cycle(self.left_motor_ids[1], Util.clip(back_left_power, -self.max_speed, self.max_speed))
+        powers = self._powers
+        powers[0] = Util.clip(front_right_power, -self.max_speed, self.max_speed)
+        powers[1] = Util.clip(front_left_power, -self.max_speed, self.max_speed)
+        powers[2] = Util.clip(back_right_power, -self.max_speed, self.max_speed)
+        powers[3] = Util.clip(back_left_power, -self.max_speed, self.max_speed)
+        self.mc.set_duty_cycles_array(self._power_ids, powers)
 
     def drive_task(self, y_axis, x_axis, turning_axis):
         y = -(math.atan(5 * y_axis) / math.atan(5)) #Note: negative
@@ -97,40 +117,39 @@ class Drivetrain:
     def stop(self):
         self.set_power(0, 0, 0, 0)
 
-    def print_telemetry(self, duty_cycle=True, velocity=True, position=True, current=True, temperature=False, voltage=True, interval=1):
-        now = time.monotonic()
-        if now - self._last_telemetry_time < interval:
-            return
-        self._last_telemetry_time = now
+    def publish_telemetry(self, topics):
+        topics.publish("drivetrain", lambda: [row[:7] for row in self._feedback()])
 
-        motors = [
-            ("FL", self.left_motor_ids[0]),
-            ("BL", self.left_motor_ids[1]),
-            ("FR", self.right_motor_ids[0]),
-            ("BR", self.right_motor_ids[1]),
-        ]
+    def register_tasks(self, tasks):
+        tasks.register("drivetrain_log", self.log_telemetry, robot_params.LoopConfig.LOGGING_RATE_HZ)
 
-        feedbacks = [(label, self.mc.get_motor_feedback(motor_id)) for label, motor_id in motors]
+    def log_telemetry(self):
+        if not self._logger.is_logging:
+            return
+        # FL, BL, FR, BR rows flattened in _LOG_COLUMNS order
+        if robot_params.LoggingConfig.logEverySample:
+            times_ns, samples = self._log_cursor.read()
+            for time_ns, motors in zip(times_ns.tolist(), samples[:, self._columns].tolist()):
+                self._logger.log_row(robot_params.robot_timer.elapsed_at(time_ns),
+                                     [value for motor in motors for value in motor[1:7]])
+            return
+        row = [value for motor in self._feedback() for value in motor[1:7]]
+        self._logger.log_row(robot_params.robot_timer.elapsed(), row)
 
-        for label, feedback in feedbacks:
+    def print_telemetry(self, duty_cycle=True, velocity=True, position=True, current=True, temperature=False, voltage=True):
+        for label, (_, fb_duty_cycle, fb_velocity, fb_position, fb_current, fb_temperature, fb_voltage, _) in zip(self._feedback_labels, self._feedback()):
             parts = []
             if duty_cycle:
-                parts.append(f"Duty Cycle: {feedback.duty_cycle:.4f}")
+                parts.append(f"Duty Cycle: {fb_duty_cycle:.4f}")
             if velocity:
-                parts.append(f"Velocity: {feedback.velocity:.2f} RPM")
+                parts.append(f"Velocity: {fb_velocity:.2f} RPM")
             if position:
-                parts.append(f"Position: {feedback.position:.1f} ticks")
+                parts.append(f"Position: {fb_position:.1f} ticks")
             if current:
-                parts.append(f"Current: {feedback.current:.2f} A")
+                parts.append(f"Current: {fb_current:.2f} A")
             if temperature:
-                parts.append(f"Temp: {feedback.temperature:.1f} °C")
+                parts.append(f"Temp: {fb_temperature:.1f} °C")
             if voltage:
-                parts.append(f"Bus: {feedback.voltage:.2f} V")
+                parts.append(f"Bus: {fb_voltage:.2f} V")
             if parts:
                 print(f"{robot_params.robot_timer.timestamp()} [Drivetrain {label}] " + ", ".join(parts))
-
-        if self._logger.is_logging:
-            row = []
-            for _, fb in feedbacks:
-                row.extend([fb.duty_cycle, fb.velocity, fb.position, fb.current, fb.temperature, fb.voltage])
-            self._logger.log_row(robot_params.robot_timer.timestamp(), row)
@@ -1,5 +1,4 @@
 from __future__ import annotations
-import time
 import robot_params
 from typing import TYPE_CHECKING
 
@@ -10,7 +9,6 @@ class TeleOp:
 
     def __init__(self, robot: robot.Robot):
         self.robot = robot
-        self._last_update_time = time.monotonic()
 
     # Called only when there is a button event
     def on_button_event(self, button, is_pressed):
@@ -64,26 +62,15 @@ class TeleOp:
                 #Off Auger
                 self.robot.auger.stop()
 
-    """Called at 50Hz — put all periodic tasks here."""
+    """Called from the "control" task each control tick, inside its 4 ms budget — only
+    quick per-tick mode logic belongs here. Work with its own rate or cost (logging,
+    telemetry, console output) gets its own task: robot.tasks.register(name, fn, rate_hz)."""
     def periodic_loop(self):
+        # Motor updates, telemetry, logging and console output are separate tasks in Robot.tasks
         #if robot_params.RobotConfig.useDrivetrain:
         #    self.robot.drivetrain.drive_task(self.robot.controller.AxisValues['LY'], self.robot.controller.AxisValues['LX'], self.robot.controller.AxisValues['RX'])
-        
-        # Update motor controller
-        try:
-            self.robot.motor_controller.update()
-        except RuntimeError as e:
-            print(f"[TeleOp] motor_controller.update() error: {e}")
-
-        # Debug: print auger telemetry to check if motor responds on CAN
-        self.robot.auger.print_telemetry(False, False, False, True, False, True, interval=0.2)
-        #self.robot.drivetrain.print_telemetry()
+        pass
 
     def run_teleOp_step(self):
-
-        # Update periodic loop
-        now = time.monotonic()
-        elapsed = now - self._last_update_time
-        if elapsed >= robot_params.LoopConfig.UPDATE_PERIOD_S:
-            self.periodic_loop()
-            self._last_update_time = now
+        # Robot's "control" task calls this at LoopConfig.UPDATE_RATE_HZ
+        self.periodic_loop()
@@ -0,0 +1,29 @@
+"""
+Convert binary telemetry logs (.tlog, written when robot_params.LoggingConfig.useBinaryLogs
+is set) into the CSV layout TelemetryLogger writes in CSV mode.
+
+Usage:
+    python tlog_to_csv.py logs/auger_2026-03-02_19-30-55.tlog
+    python tlog_to_csv.py logs/*.tlog
+    python tlog_to_csv.py logs/drivetrain_2026-03-02_19-30-55.tlog -o drivetrain.csv
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+
+from library import telemetry_logger
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="+", help=".tlog files to convert")
+    parser.add_argument("-o", "--output", help="CSV path (only with a single input; default: next to the input)")
+    args = parser.parse_args()
+    if args.output and len(args.logs) > 1:
+        parser.error("--output needs exactly one input file")
+
+    for path in args.logs:
+        csv_path = telemetry_logger.binary_log_to_csv(path, args.output)
+        print(f"[Convert] {path} -> {csv_path}")